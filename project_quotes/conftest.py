@@ -0,0 +1,15 @@
+import pytest
+from quotes.quotes.infrastructure.QuoteRepository import DatabaseManager
+
+
+@pytest.fixture
+def make_manager(tmp_path):
+    """
+    Fábrica de gestores sobre el mismo fichero SQLite temporal (sin conectar todavía).
+
+    Varios gestores sobre el mismo fichero hacen de varios workers; cada prueba llama a
+    init_db dentro de su propio event loop.
+    """
+    def make(**kwargs):
+        return DatabaseManager("test", "test", "test", db_url=f"sqlite:///{tmp_path / 'quotes.db'}", **kwargs)
+    return make
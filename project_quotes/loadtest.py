@@ -0,0 +1,480 @@
+"""Pruebas de carga del servicio de citas.
+
+Lanza peticiones concurrentes contra /schedule (GET y POST), /reschedule, /cancel
+y /send con distintas mezclas de tráfico y saca un informe con el throughput, los
+percentiles de latencia (p50/p95/p99) por endpoint y el desglose de errores.
+
+Mezclas disponibles (--mix):
+  read       consultas de disponibilidad con alguna reserva suelta (90/10)
+  burst      muchas reservas a la vez para el MISMO hueco (solo una debería entrar)
+  lifecycle  reservar -> reprogramar -> enviar correo -> cancelar
+  mixed      una combinación de las tres anteriores
+
+Con --start-server el propio script arranca el servicio (main.py) contra una base de
+datos SQLite temporal (o la de --database-url) y un servidor SMTP falso, así que no
+hace falta Docker ni acceso a internet. Como /send solo encola el correo, al terminar
+espera a que el worker de la bandeja de salida los entregue y muestra cuántos correos
+y cuántas conexiones SMTP han llegado:
+
+    python loadtest.py --start-server --mix mixed --journeys 500 --concurrency 32
+
+Sin --start-server se ataca a un servicio ya levantado (--url). Con --slo-p95-ms,
+--slo-p99-ms y --max-error-rate el script termina con código 1 si no se cumplen,
+para poder usarlo en CI y comparar cambios del backend.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from urllib.parse import urlencode, urlsplit
+
+SLOT_HOURS = [f"{h:02d}:{m:02d}" for h in range(8, 17) for m in (0, 30)]
+
+
+# ---------------------------------------------------------------------------
+# Servidor SMTP falso
+# ---------------------------------------------------------------------------
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Habla lo justo de SMTP para que smtplib pueda enviar un correo."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        delivered = 0
+        self.reply("220 loadtest ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith("EHLO"):
+                self.reply("250-loadtest")
+                self.reply("250 SIZE 10485760")
+            elif command.startswith("DATA"):
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                self.server.messages += 1
+                delivered += 1
+                self.reply("250 OK")
+                if self.server.drop_after and delivered >= self.server.drop_after:
+                    # Corta la conexión sin QUIT, como un servidor que cierra las conexiones largas
+                    return
+            elif command.startswith("RCPT") and any(r in command for r in self.server.refused):
+                self.reply("550 Mailbox unavailable")
+            elif command.startswith("QUIT"):
+                self.reply("221 Bye")
+                return
+            else:
+                # HELO, MAIL FROM, RCPT TO, RSET, NOOP...
+                self.reply("250 OK")
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    """Servidor SMTP en un hilo que acepta y cuenta todos los correos."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0, drop_after=None, refused=()):
+        """Escucha en `host`:`port` (0 elige un puerto libre); hay que llamar a start().
+
+        Para probar los fallos, `drop_after` corta cada conexión tras ese número de correos
+        y los destinatarios de `refused` se rechazan con un 550.
+        """
+        super().__init__((host, port), _SMTPHandler)
+        self.messages = 0
+        self.connections = 0  # con la bandeja de salida, muchos correos por conexión
+        self.drop_after = drop_after
+        self.refused = {recipient.upper() for recipient in refused}
+
+    @property
+    def port(self):
+        """Puerto en el que escucha el servidor."""
+        return self.server_address[1]
+
+    def start(self):
+        """Método para atender conexiones en un hilo en segundo plano."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def wait_for(self, expected, timeout=30.0):
+        """Espera a que lleguen `expected` correos (el envío es en segundo plano); devuelve los recibidos."""
+        deadline = time.monotonic() + timeout
+        while self.messages < expected and time.monotonic() < deadline:
+            time.sleep(0.1)
+        return self.messages
+
+
+# ---------------------------------------------------------------------------
+# Tráfico
+# ---------------------------------------------------------------------------
+
+class Request:
+    """Una petición HTTP del escenario; `label` agrupa las métricas por endpoint."""
+
+    def __init__(self, label, method, path, params=None, body=None):
+        """Guarda el método, la ruta y los parámetros o el cuerpo JSON de la petición."""
+        self.label = label
+        self.method = method
+        self.path = path
+        self.params = params or {}
+        self.body = body
+
+
+def _day(rng, days_ahead=365):
+    """Un día laborable en el futuro para que las validaciones de fecha pasen."""
+    day = date.today() + timedelta(days=rng.randint(7, days_ahead))
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+def _slot(day, rng):
+    hour = rng.choice(SLOT_HOURS)
+    return datetime.fromisoformat(f"{day.isoformat()}T{hour}:00")
+
+
+def _availability(day):
+    return Request("GET /schedule", "GET", "/schedule", {"date": f"{day.isoformat()}T00:00:00"})
+
+
+def _book(gmail, when):
+    body = {"name": "Carga", "gmail": gmail, "date": when.isoformat()}
+    return Request("POST /schedule", "POST", "/schedule", body=body)
+
+
+def read_journey(index, rng):
+    """Método para generar 9 consultas de disponibilidad y 1 reserva."""
+    requests = [_availability(_day(rng)) for _ in range(9)]
+    requests.append(_book(f"read-{index}@loadtest.dev", _slot(_day(rng), rng)))
+    return requests
+
+
+def burst_journeys(count, rng):
+    """Método para generar `count` reservas simultáneas del mismo hueco."""
+    when = _slot(_day(rng), rng)
+    return [[_book(f"burst-{i}@loadtest.dev", when)] for i in range(count)]
+
+
+def lifecycle_journey(index, rng):
+    """Método para generar el ciclo completo de una cita."""
+    gmail = f"life-{index}@loadtest.dev"
+    day = _day(rng)
+    first, second = rng.sample(SLOT_HOURS, 2)
+    return [
+        _availability(day),
+        _book(gmail, datetime.fromisoformat(f"{day}T{first}:00")),
+        Request("PUT /reschedule", "PUT", "/reschedule",
+                {"gmail": gmail, "new_date": f"{day}T{second}:00"}),
+        Request("POST /send", "POST", "/send", {"gmail": gmail}),
+        Request("PUT /cancel", "PUT", "/cancel", {"gmail": gmail}),
+    ]
+
+
+def build_journeys(mix, count, seed):
+    """Método para generar la lista de recorridos de la mezcla pedida."""
+    rng = random.Random(seed)
+    run = f"{seed}-{int(time.time())}"
+    if mix == "read":
+        return [read_journey(f"{run}-{i}", rng) for i in range(count)]
+    if mix == "burst":
+        return burst_journeys(count, rng)
+    if mix == "lifecycle":
+        return [lifecycle_journey(f"{run}-{i}", rng) for i in range(count)]
+    journeys = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.6:
+            journeys.append(read_journey(f"{run}-{i}", rng))
+        elif roll < 0.9:
+            journeys.append(lifecycle_journey(f"{run}-{i}", rng))
+        else:
+            journeys.extend(burst_journeys(5, rng))
+    return journeys
+
+
+# ---------------------------------------------------------------------------
+# Ejecución
+# ---------------------------------------------------------------------------
+
+class Results:
+    """Latencias y respuestas por endpoint, seguras entre hilos."""
+
+    def __init__(self):
+        """Empieza sin ninguna respuesta apuntada."""
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = Counter()
+
+    def add(self, label, status, latency_ms, detail=""):
+        """Método para apuntar una respuesta (status 0 si no hubo respuesta)."""
+        with self.lock:
+            self.latencies[label].append(latency_ms)
+            self.statuses[label][status] += 1
+            if status == 0 or status >= 400:
+                self.errors[(label, status, detail[:80])] += 1
+
+
+class Client:
+    """Conexión keep-alive por hilo contra el servicio."""
+
+    def __init__(self, base_url, timeout):
+        """Prepara las conexiones contra `base_url`; cada hilo abre la suya al usarla."""
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            connection.connect()
+            # Cabeceras y cuerpo van en dos escrituras: sin esto Nagle añade ~40 ms por petición
+            connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.local.connection = connection
+        return connection
+
+    def send(self, request):
+        """Método para enviar una petición; devuelve (status, detalle)."""
+        path = self.prefix + request.path
+        if request.params:
+            path += "?" + urlencode(request.params)
+        body = json.dumps(request.body) if request.body is not None else None
+        headers = {"Content-Type": "application/json"} if body else {}
+        try:
+            connection = self._connection()
+            connection.request(request.method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            if getattr(self.local, "connection", None) is not None:
+                self.local.connection.close()
+            self.local.connection = None
+            return 0, type(e).__name__
+        detail = ""
+        if response.status >= 400:
+            try:
+                detail = str(json.loads(payload).get("detail", ""))
+            except (ValueError, AttributeError):
+                detail = payload[:80].decode(errors="replace")
+        return response.status, detail
+
+
+def run(client, journeys, concurrency):
+    """Método para ejecutar los recorridos con `concurrency` hilos."""
+    results = Results()
+
+    def journey(requests):
+        for request in requests:
+            started = time.perf_counter()
+            status, detail = client.send(request)
+            results.add(request.label, status, (time.perf_counter() - started) * 1000, detail)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(journey, journeys))
+    return results, time.perf_counter() - started
+
+
+# ---------------------------------------------------------------------------
+# Informe
+# ---------------------------------------------------------------------------
+
+def percentile(samples, q):
+    """Percentil por rango más cercano, como react_agent.metrics."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return round(ordered[int(rank) - 1], 2)
+
+
+def summarize(results, seconds):
+    """Método para reducir los resultados a throughput, percentiles y errores."""
+    endpoints = {}
+    for label, samples in sorted(results.latencies.items()):
+        statuses = results.statuses[label]
+        endpoints[label] = {
+            "requests": len(samples),
+            "rps": round(len(samples) / seconds, 1),
+            "p50_ms": percentile(samples, 50),
+            "p95_ms": percentile(samples, 95),
+            "p99_ms": percentile(samples, 99),
+            "ok": sum(n for s, n in statuses.items() if 200 <= s < 400),
+            # 4xx son rechazos de negocio (hueco ocupado, cita inexistente...)
+            "rejected": sum(n for s, n in statuses.items() if 400 <= s < 500),
+            # 5xx y fallos de conexión son errores del servicio
+            "failed": sum(n for s, n in statuses.items() if s == 0 or s >= 500),
+        }
+    everything = [ms for samples in results.latencies.values() for ms in samples]
+    total = len(everything)
+    failed = sum(e["failed"] for e in endpoints.values())
+    return {
+        "seconds": round(seconds, 2),
+        "requests": total,
+        "rps": round(total / seconds, 1) if seconds else 0.0,
+        "p50_ms": percentile(everything, 50),
+        "p95_ms": percentile(everything, 95),
+        "p99_ms": percentile(everything, 99),
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "endpoints": endpoints,
+        "errors": [
+            {"endpoint": label, "status": status, "detail": detail, "count": count}
+            for (label, status, detail), count in results.errors.most_common()
+        ],
+    }
+
+
+def format_report(summary):
+    """Método para convertir el resumen en un informe de texto."""
+    lines = [
+        f"{summary['requests']} peticiones en {summary['seconds']}s "
+        f"({summary['rps']} req/s), p50 {summary['p50_ms']} ms, "
+        f"p95 {summary['p95_ms']} ms, p99 {summary['p99_ms']} ms, "
+        f"tasa de error {summary['error_rate']:.2%}",
+        "",
+        f"{'endpoint':<16} {'reqs':>6} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} "
+        f"{'ok':>6} {'4xx':>6} {'fallos':>6}",
+    ]
+    for label, e in summary["endpoints"].items():
+        lines.append(
+            f"{label:<16} {e['requests']:>6} {e['rps']:>7} {e['p50_ms']:>8} {e['p95_ms']:>8} "
+            f"{e['p99_ms']:>8} {e['ok']:>6} {e['rejected']:>6} {e['failed']:>6}"
+        )
+    if summary["errors"]:
+        lines += ["", "errores:"]
+        lines += [
+            f"  {e['count']:>5} x {e['endpoint']} {e['status']} {e['detail']}"
+            for e in summary["errors"]
+        ]
+    if "emails_received" in summary:
+        lines += ["", f"correos entregados: {summary['emails_received']} "
+                      f"en {summary['smtp_connections']} conexiones SMTP"]
+    return "\n".join(lines)
+
+
+def check_slo(summary, args):
+    """Método para devolver la lista de SLO incumplidos."""
+    broken = []
+    if args.slo_p95_ms and summary["p95_ms"] > args.slo_p95_ms:
+        broken.append(f"p95 {summary['p95_ms']} ms > {args.slo_p95_ms} ms")
+    if args.slo_p99_ms and summary["p99_ms"] > args.slo_p99_ms:
+        broken.append(f"p99 {summary['p99_ms']} ms > {args.slo_p99_ms} ms")
+    if args.max_error_rate is not None and summary["error_rate"] > args.max_error_rate:
+        broken.append(f"tasa de error {summary['error_rate']} > {args.max_error_rate}")
+    return broken
+
+
+# ---------------------------------------------------------------------------
+# Servicio local
+# ---------------------------------------------------------------------------
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_service(database_url, smtp_port):
+    """Método para arrancar main.py con SQLite/Postgres y el SMTP falso; devuelve (proceso, url)."""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "PORT": str(port),
+        "DATABASE_URL": database_url,
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(smtp_port),
+        "SMTP_STARTTLS": "false",
+        "SMTP_PASSWORD": "",
+    }
+    here = os.path.dirname(os.path.abspath(__file__))
+    process = subprocess.Popen([sys.executable, "main.py"], cwd=here, env=env)
+    url = f"http://127.0.0.1:{port}/quotes"
+    client = Client(url, timeout=2)
+    probe = _availability(date.today() + timedelta(days=7))
+    for _ in range(100):
+        if process.poll() is not None:
+            raise RuntimeError("El servicio no ha arrancado, revisa la salida de main.py.")
+        if client.send(probe)[0]:
+            return process, url
+        time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("El servicio no responde tras 10 segundos.")
+
+
+def main(argv=None):
+    """Método para lanzar la prueba de carga desde la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Pruebas de carga del servicio de citas")
+    parser.add_argument("--url", default="http://localhost:8001/quotes")
+    parser.add_argument("--mix", choices=["read", "burst", "lifecycle", "mixed"], default="mixed")
+    parser.add_argument("--journeys", type=int, default=200, help="recorridos a ejecutar")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start-server", action="store_true",
+                        help="arrancar main.py con una base de datos local y SMTP falso")
+    parser.add_argument("--database-url", help="por defecto, un SQLite temporal")
+    parser.add_argument("--json", help="guardar el informe en este fichero")
+    parser.add_argument("--slo-p95-ms", type=float)
+    parser.add_argument("--slo-p99-ms", type=float)
+    parser.add_argument("--max-error-rate", type=float)
+    args = parser.parse_args(argv)
+
+    process = smtp = None
+    url = args.url
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            if args.start_server:
+                smtp = FakeSMTPServer().start()
+                database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'loadtest.db')}"
+                process, url = start_service(database_url, smtp.port)
+            journeys = build_journeys(args.mix, args.journeys, args.seed)
+            results, seconds = run(Client(url, args.timeout), journeys, args.concurrency)
+            if smtp is not None:
+                # /send solo encola: esperar a que el worker vacíe la bandeja de salida
+                smtp.wait_for(results.statuses["POST /send"][200])
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+            if smtp is not None:
+                smtp.shutdown()
+
+    summary = summarize(results, seconds)
+    summary["mix"] = args.mix
+    summary["concurrency"] = args.concurrency
+    if smtp is not None:
+        summary["emails_received"] = smtp.messages
+        summary["smtp_connections"] = smtp.connections
+    sys.stdout.write(format_report(summary) + "\n")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(summary, handle, indent=2, ensure_ascii=False)
+
+    broken = check_slo(summary, args)
+    if broken:
+        sys.stdout.write("\nSLO incumplido: " + "; ".join(broken) + "\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
+import os
 import uvicorn
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from quotes.quotes.application.quotes_controller import quotes_endpoint
 from quotes.quotes.infrastructure.QuoteRepository import db_manager
 from quotes.emails.application.emails_controller import emails_endpoint
+from quotes.emails.domain.outbox_worker import outbox_worker
+from quotes.common.tracing import parse_traceparent, span
 
 # from fastapi_utilities import repeat_at
 # from datetime import datetime, time
@@ -40,9 +44,22 @@ from quotes.emails.application.emails_controller import emails_endpoint
 #     yield
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Crea el engine asíncrono (y las tablas) y arranca el worker de correos al arrancar.
+
+    Al parar, detiene el worker y cierra el pool.
+    """
+    await db_manager.init_db()
+    outbox_worker.start()
+    yield
+    await outbox_worker.stop()
+    await db_manager.close()
+
+
 app = FastAPI(title="Quotes API",
               description="API for managing quotes",
-            #   lifespan=lifespan,
+              lifespan=lifespan,
               docs_url="/docs",
               redoc_url="/redocs",
               root_path="/quotes")
@@ -57,9 +74,26 @@ app.add_middleware(
     max_age=3600,
 )
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Traza cada petición; si el agente envía `traceparent`, el span cuelga de su traza."""
+    parent = parse_traceparent(request.headers.get("traceparent"))
+    with span(f"api:{request.method} {request.url.path}", kind="server", parent=parent) as current:
+        response = await call_next(request)
+        if current is not None:
+            current["attributes"]["status_code"] = response.status_code
+        return response
+
+@app.get("/health/db", tags=["health"])
+async def database_health():
+    """Estado del pool de conexiones (tamaño, en uso, libres, overflow) y del índice de disponibilidad."""
+    return {"pool": db_manager.pool_stats(), "availability_index": db_manager.availability.stats(),
+            "email_outbox": {"sent": outbox_worker.sent, "failed": outbox_worker.failed}}
+
 app.include_router(quotes_endpoint)
 app.include_router(emails_endpoint)
 
 if __name__ == "__main__":
-    db_manager.init_db()
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    # Cada worker tiene su propio pool: conexiones máximas = WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    uvicorn.run("main:app", host="0.0.0.0", port=int(os.environ.get("PORT", "8001")),
+                workers=int(os.environ.get("WEB_CONCURRENCY", "1")))
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""Trazas en JSONL con el mismo formato que escribe el agente (react_agent.tracing).
+
+Así se puede sacar el informe de ambos ficheros juntos con `react-agent-trace report`.
+Si QUOTES_TRACE_PATH no está definida no se escribe nada.
+"""
+
+import functools
+import inspect
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+TRACE_PATH = os.environ.get("QUOTES_TRACE_PATH", "")
+
+_current = ContextVar("quotes_span", default=None)
+_lock = threading.Lock()
+_file = None
+
+
+def _write(record):
+    """Método para añadir una línea al fichero de trazas."""
+    global _file
+    line = json.dumps(record, default=str) + "\n"
+    with _lock:
+        if _file is None:
+            _file = open(TRACE_PATH, "a", encoding="utf-8")
+        _file.write(line)
+        _file.flush()
+
+
+def parse_traceparent(header):
+    """Método para leer (trace_id, span_id) de una cabecera W3C `traceparent`."""
+    parts = (header or "").split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+@contextmanager
+def span(name, kind="internal", parent=None, **attributes):
+    """Método para medir un bloque como span hijo del span actual (o de `parent`)."""
+    if not TRACE_PATH:
+        yield None
+        return
+    current = _current.get()
+    if parent is None and current is not None:
+        parent = (current["trace_id"], current["span_id"])
+    record = {
+        "trace_id": parent[0] if parent else secrets.token_hex(16),
+        "span_id": secrets.token_hex(8),
+        "parent_id": parent[1] if parent else None,
+        "name": name,
+        "kind": kind,
+        "start": time.time(),
+        "status": "ok",
+        "attributes": attributes,
+    }
+    token = _current.set(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["status"] = "error"
+        record["attributes"]["error"] = repr(e)
+        raise
+    finally:
+        _current.reset(token)
+        record["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        _write(record)
+
+
+def traced(name, kind="internal"):
+    """Decorador para trazar cada llamada a una función (síncrona o asíncrona)."""
+
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, kind):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name, kind):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import JSONResponse
 from quotes.emails.domain.emails_service import EmailsService
 from datetime import datetime
+from quotes.quotes.infrastructure.QuoteRepository import get_session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 endpoint_emails = "/emails"
 
@@ -10,9 +12,15 @@ emails_endpoint = APIRouter()
 Emails_service = EmailsService()
 
 @emails_endpoint.post("/send",tags=["emails"])
-async def send_email( gmail: str):
+async def send_email( gmail: str, session: AsyncSession = Depends(get_session)):
     """
     Schedule a quote for a specific date.
     """
-    response = await Emails_service.send_email(gmail=gmail)
+    response = await Emails_service.send_email(gmail=gmail, session=session)
+    return response
+
+@emails_endpoint.get("/send/{email_id}", tags=["emails"])
+async def email_status(email_id: int, session: AsyncSession = Depends(get_session)):
+    """Get the delivery status of a queued email."""
+    response = await Emails_service.email_status(email_id, session=session)
     return response
\ No newline at end of file
@@ -1,27 +1,27 @@
 from pydantic import BaseModel
 from quotes.quotes.models.quote_entity import QuoteEntity
 from quotes.quotes.infrastructure.QuoteRepository import db_manager, DatabaseManager
+from quotes.emails.infrastructure.EmailRepository import email_outbox, EmailOutbox
+from quotes.emails.domain.outbox_worker import outbox_worker, OutboxWorker, email_emisor
 from datetime import datetime, timedelta, time
 from fastapi import HTTPException
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
-email_emisor = 'quotestest123@gmail.com'
-contraseña = 'gczo vnzc jwhk ppzm'
-
 class EmailsService(BaseModel):
     """
     Service class for managing quotes.
     """
     db_manager: DatabaseManager = db_manager
+    email_outbox: EmailOutbox = email_outbox
+    outbox_worker: OutboxWorker = outbox_worker
 
-    async def send_email(self, gmail):
+    async def send_email(self, gmail, session=None):
         """
         Schedule a quote for a specific date.
         """
 
-        quote = self.db_manager.find(gmail=gmail)
+        quote = await self.db_manager.find(gmail=gmail, session=session)
         if not quote:
             raise HTTPException(status_code=404, detail="No se encontró la cita.")
         email_receptor = gmail
@@ -35,15 +35,20 @@ Tu cita está programada para el {quote[0].date}.
 
 Saludos."""
         message.attach(MIMEText(body, 'plain'))
-        try:
-            with smtplib.SMTP('smtp.gmail.com', 587) as server:
-                server.starttls()
-                server.login(email_emisor, contraseña)
-                server.sendmail(email_emisor, email_receptor, message.as_string())
-                server.quit()
-            return "Email sent successfully"
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error sending email: {str(e)}")
+
+        # Se guarda en la bandeja de salida y el worker lo envía en segundo plano
+        email = await self.email_outbox.enqueue(email_receptor, message['Subject'], message.as_string(),
+                                                session=session)
+        self.outbox_worker.notify()
+        return {"detail": "Email queued", "id": email.id, "status": email.status}
+
+    async def email_status(self, email_id: int, session=None):
+        """Get the delivery status of a queued email."""
+        email = await self.email_outbox.get(email_id, session=session)
+        if email is None:
+            raise HTTPException(status_code=404, detail="No se encontró el correo.")
+        return {"id": email.id, "status": email.status, "attempts": email.attempts,
+                "last_error": email.last_error, "sent_at": email.sent_at}
     
     class Config:
         arbitrary_types_allowed = True
@@ -0,0 +1,159 @@
+"""Worker que envía por SMTP los correos de la bandeja de salida."""
+
+import asyncio
+import logging
+import os
+import smtplib
+import time
+
+from quotes.common.tracing import span
+from quotes.emails.infrastructure.EmailRepository import email_outbox
+
+logger = logging.getLogger(__name__)
+
+# El servidor SMTP se puede cambiar por entorno (p. ej. un SMTP falso en las pruebas de carga)
+SMTP_HOST = os.environ.get("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.environ.get("SMTP_STARTTLS", "true").lower() == "true"
+SMTP_TIMEOUT = 30  # segundos por operación SMTP
+
+email_emisor = os.environ.get("SMTP_USER", 'quotestest123@gmail.com')
+contraseña = os.environ.get("SMTP_PASSWORD", 'gczo vnzc jwhk ppzm')
+
+
+class OutboxWorker:
+    """Worker en segundo plano que vacía la bandeja de salida de correos.
+
+    Reclama lotes de `batch_size` correos y los envía por una única conexión SMTP que se
+    mantiene abierta entre lotes (STARTTLS y login solo al conectar) y se cierra tras
+    `idle_timeout` segundos sin uso. Si el servidor corta la conexión, se reconecta y se
+    reintenta el correo una vez; cualquier otro fallo queda apuntado en el correo y la
+    bandeja lo reintenta más tarde con espera exponencial.
+
+    smtplib es bloqueante, así que los envíos van en un hilo y no paran el event loop.
+
+    Por defecto el plazo de la reclamación cubre el peor caso del lote (dos intentos por correo,
+    cada uno hasta `SMTP_TIMEOUT`), para que otro worker no lo reclame mientras se envía.
+    """
+
+    def __init__(self, outbox, batch_size=20, poll_interval=5.0, lease_seconds=None, idle_timeout=60.0):
+        """Worker sobre `outbox`; no hace nada hasta que se llama a start()."""
+        self.outbox = outbox
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval  # espera máxima entre vueltas si nadie avisa con notify()
+        if lease_seconds is None:
+            lease_seconds = batch_size * 2 * SMTP_TIMEOUT + 60
+        self.lease_seconds = lease_seconds
+        self.idle_timeout = idle_timeout
+        self._connection = None
+        self._last_used = 0.0
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.sent = 0
+        self.failed = 0
+
+    def start(self):
+        """Método para arrancar el worker como tarea del event loop actual."""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Método para parar el worker y cerrar la conexión SMTP."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self._disconnect)
+
+    def notify(self):
+        """Avisa al worker de que hay correos nuevos para no esperar al siguiente sondeo."""
+        self._wakeup.set()
+
+    async def run(self):
+        """Bucle principal: envía lotes mientras haya trabajo y después espera un aviso o el sondeo."""
+        while True:
+            try:
+                claimed = await self.drain_once()
+            except Exception:
+                logger.exception("Error en el worker de correos")
+                claimed = 0
+            if claimed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except TimeoutError:
+                    await asyncio.to_thread(self._disconnect_if_idle)
+                self._wakeup.clear()
+
+    async def drain_once(self):
+        """Método para enviar un lote de la bandeja; devuelve cuántos correos se reclamaron."""
+        token, emails = await self.outbox.claim(self.batch_size, self.lease_seconds)
+        if not emails:
+            return 0
+        results = await asyncio.to_thread(self._send_batch, emails)
+        await self.outbox.record(results, token)
+        for _, error in results:
+            if error is None:
+                self.sent += 1
+            else:
+                self.failed += 1
+        return len(emails)
+
+    def _send_batch(self, emails):
+        results = []
+        with span("smtp:batch", kind="smtp", size=len(emails)):
+            for email in emails:
+                results.append((email.id, self._send(email)))
+        return results
+
+    def _send(self, email):
+        # Dos intentos solo si la conexión reutilizada estaba cerrada por el servidor
+        for attempt in range(2):
+            reused = self._connection is not None
+            try:
+                connection = self._connect()
+                with span("smtp:send", kind="smtp", payload_bytes=len(email.payload.encode())):
+                    connection.sendmail(email_emisor, email.recipient, email.payload)
+                self._last_used = time.monotonic()
+                return None
+            except smtplib.SMTPServerDisconnected as e:
+                self._connection = None
+                if not reused or attempt:
+                    return f"SMTPServerDisconnected: {e}"
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                # El servidor rechaza este correo, pero la conexión sigue sirviendo para los demás
+                return f"{type(e).__name__}: {e}"
+            except (smtplib.SMTPException, OSError) as e:
+                self._disconnect()
+                return f"{type(e).__name__}: {e}"
+
+    def _connect(self):
+        if self._connection is None:
+            with span("smtp:connect", kind="smtp", host=SMTP_HOST, port=SMTP_PORT):
+                connection = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+                if SMTP_STARTTLS:
+                    connection.starttls()
+                if contraseña:
+                    connection.login(email_emisor, contraseña)
+            self._connection = connection
+        return self._connection
+
+    def _disconnect_if_idle(self):
+        if self._connection is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self._disconnect()
+
+    def _disconnect(self):
+        if self._connection is not None:
+            try:
+                self._connection.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._connection = None
+
+
+outbox_worker = OutboxWorker(email_outbox,
+                             batch_size=int(os.environ.get("OUTBOX_BATCH_SIZE", "20")),
+                             poll_interval=float(os.environ.get("OUTBOX_POLL_INTERVAL", "5")))
@@ -0,0 +1,134 @@
+"""Bandeja de salida de correos (outbox) guardada en la base de datos."""
+
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from quotes.common.tracing import traced
+from quotes.quotes.infrastructure.QuoteRepository import Base, db_manager
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, select
+
+# Estados de un correo en la bandeja de salida
+PENDING = "pending"  # esperando a que el worker lo envíe (o a su siguiente reintento)
+SENDING = "sending"  # reclamado por un worker; si el worker muere, vuelve a estar disponible al vencer el plazo
+SENT = "sent"
+FAILED = "failed"  # agotó los reintentos
+
+
+class EmailOutbox:
+    """Bandeja de salida de correos guardada en la base de datos.
+
+    El endpoint solo encola el correo y responde; un worker en segundo plano reclama lotes
+    (`claim`), los envía y apunta el resultado de cada uno (`record`).
+    """
+
+    def __init__(self, db_manager, max_attempts=5, backoff_base=2.0, backoff_max=300.0):
+        """Bandeja sobre `db_manager`; tras `max_attempts` envíos fallidos el correo queda en 'failed'."""
+        self.db_manager = db_manager
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base  # segundos: 2, 4, 8, 16... hasta backoff_max
+        self.backoff_max = backoff_max
+
+    @traced("db:outbox_enqueue", kind="db")
+    async def enqueue(self, recipient: str, subject: str, payload: str, session=None):
+        """Método para encolar un correo; devuelve el registro creado."""
+        now = datetime.now()
+        email = OutboxEmail(recipient=recipient, subject=subject, payload=payload, status=PENDING,
+                            attempts=0, created_at=now, next_attempt_at=now)
+        async with self.db_manager.session_scope(session) as session:
+            session.add(email)
+            await session.commit()
+            return email
+
+    @traced("db:outbox_get", kind="db")
+    async def get(self, email_id: int, session=None):
+        """Método para consultar el estado de un correo encolado."""
+        async with self.db_manager.session_scope(session) as session:
+            return await session.get(OutboxEmail, email_id)
+
+    @traced("db:outbox_claim", kind="db")
+    async def claim(self, limit: int, lease_seconds: float):
+        """Método para reclamar hasta `limit` correos listos para enviar; devuelve (token, correos).
+
+        Quedan en 'sending' durante `lease_seconds` y marcados con un token nuevo; con FOR UPDATE
+        SKIP LOCKED (Postgres) varios workers pueden vaciar la bandeja a la vez sin enviar dos veces
+        el mismo correo. Si el plazo vence, otro worker puede reclamarlos con otro token.
+        """
+        now = datetime.now()
+        token = uuid.uuid4().hex
+        async with self.db_manager.Session() as session:
+            emails = (await session.execute(
+                select(OutboxEmail).where(
+                    OutboxEmail.status.in_((PENDING, SENDING)),
+                    OutboxEmail.next_attempt_at <= now
+                ).order_by(OutboxEmail.id).limit(limit).with_for_update(skip_locked=True)
+            )).scalars().all()
+            for email in emails:
+                email.status = SENDING
+                email.claim_token = token
+                email.next_attempt_at = now + timedelta(seconds=lease_seconds)
+            await session.commit()
+            return token, emails
+
+    @traced("db:outbox_record", kind="db")
+    async def record(self, results, token: str):
+        """Método para guardar el resultado de cada envío: lista de (id, error o None).
+
+        Solo se actualizan los correos que siguen reclamados con `token`; si el plazo venció y
+        otro worker los reclamó, el resultado de este se descarta. Devuelve cuántos se guardaron.
+        """
+        now = datetime.now()
+        errors = dict(results)
+        async with self.db_manager.Session() as session:
+            emails = (await session.execute(
+                select(OutboxEmail).where(
+                    OutboxEmail.id.in_(errors),
+                    OutboxEmail.status == SENDING,
+                    OutboxEmail.claim_token == token
+                ).with_for_update()
+            )).scalars().all()
+            for email in emails:
+                error = errors[email.id]
+                email.attempts += 1
+                email.claim_token = None
+                if error is None:
+                    email.status = SENT
+                    email.sent_at = now
+                    email.last_error = None
+                elif email.attempts >= self.max_attempts:
+                    email.status = FAILED
+                    email.last_error = error[:500]
+                else:
+                    # Reintento con espera exponencial
+                    delay = min(self.backoff_max, self.backoff_base ** email.attempts)
+                    email.status = PENDING
+                    email.last_error = error[:500]
+                    email.next_attempt_at = now + timedelta(seconds=delay)
+            await session.commit()
+            return len(emails)
+
+
+class OutboxEmail(Base):
+    """Correo encolado con su estado de envío."""
+
+    __tablename__ = 'email_outbox'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    recipient = Column(String(50), nullable=False)
+    subject = Column(String(200), nullable=False)
+    payload = Column(Text, nullable=False)  # mensaje MIME ya montado
+    status = Column(String(20), nullable=False, default=PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String(500))
+    claim_token = Column(String(32))  # worker que tiene reclamado el correo mientras está en 'sending'
+    created_at = Column(DateTime, default=datetime.now)
+    next_attempt_at = Column(DateTime, default=datetime.now)
+    sent_at = Column(DateTime)
+
+    __table_args__ = (
+        # El worker busca siempre por estado y fecha del siguiente intento
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+
+email_outbox = EmailOutbox(db_manager, max_attempts=int(os.environ.get("OUTBOX_MAX_ATTEMPTS", "5")))
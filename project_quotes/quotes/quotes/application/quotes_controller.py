@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import JSONResponse
 from quotes.quotes.domain.quotes_service import QuotesService
-from datetime import datetime
+from datetime import date, datetime
 from quotes.quotes.application.dto.quotes_dto import QuoteDTO
+from quotes.quotes.infrastructure.QuoteRepository import get_session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 endpoint_quotes = "/quotes"
 
@@ -11,11 +13,11 @@ quotes_endpoint = APIRouter()
 Quotes_service = QuotesService()
 
 @quotes_endpoint.post("/schedule",tags=["quotes"])
-async def schedule_quote(data: QuoteDTO):
+async def schedule_quote(data: QuoteDTO, session: AsyncSession = Depends(get_session)):
     """
     Schedule a quote for a specific date.
     """
-    response = await Quotes_service.schedule_quote(**data.model_dump())
+    response = await Quotes_service.schedule_quote(**data.model_dump(), session=session)
     return response
 
 @quotes_endpoint.get("/schedule",tags=["quotes"])
@@ -27,22 +29,29 @@ async def check_availability(date: datetime):
     
     return response
 
+@quotes_endpoint.get("/schedule/range", tags=["quotes"])
+async def check_availability_range(start: date, end: date):
+    """Check availability for every day between start and end in a single response."""
+    response = await Quotes_service.check_availability_range(start, end)
+
+    return response
+
 @quotes_endpoint.put("/reschedule", tags=["quotes"])
-async def reschedule_quote(gmail: str, new_date: datetime):
+async def reschedule_quote(gmail: str, new_date: datetime, session: AsyncSession = Depends(get_session)):
     """
     Reschedule a quote to a new date.
     """
-    result = await Quotes_service.reschedule_quote(gmail, new_date)
+    result = await Quotes_service.reschedule_quote(gmail, new_date, session=session)
     if result is True:
         return "Cita reprogramada con éxito"
     raise HTTPException(status_code=404, detail=result)
 
 @quotes_endpoint.put("/cancel", tags=["quotes"])
-async def cancel_quote(gmail: str):
+async def cancel_quote(gmail: str, session: AsyncSession = Depends(get_session)):
     """
     Cancel a scheduled quote.
     """
-    result = await Quotes_service.cancel_quote(gmail)
+    result = await Quotes_service.cancel_quote(gmail, session=session)
     if result is True:
         return "Cita cancelada con éxito"
     raise HTTPException(status_code=404, detail=result)
\ No newline at end of file
@@ -1,16 +1,20 @@
 from pydantic import BaseModel
 from quotes.quotes.models.quote_entity import QuoteEntity
 from quotes.quotes.infrastructure.QuoteRepository import db_manager, DatabaseManager
-from datetime import datetime, timedelta, time
+from quotes.quotes.infrastructure.availability_index import FULL_DAY, SLOT_TIMES, daily_slot_times
+from datetime import date as Date, datetime, time
 from fastapi import HTTPException
 
+# Máximo de días que se pueden consultar de una vez en check_availability_range
+MAX_RANGE_DAYS = 62
+
 class QuotesService(BaseModel):
     """
     Service class for managing quotes.
     """
     db_manager: DatabaseManager = db_manager
 
-    async def schedule_quote(self, name, gmail, date):
+    async def schedule_quote(self, name, gmail, date, session=None):
         """
         Schedule a quote for a specific date.
         """
@@ -27,18 +31,16 @@ class QuotesService(BaseModel):
 
         if not (start_time <= date < end_time):
             raise HTTPException(status_code=400, detail= "La cita debe estar entre las 08:00 y las 17:00.")
-        
-        available_slots = await self.check_availability(date)
-        if date not in available_slots:
-            raise HTTPException(status_code=400, detail= "Ya hay citas programadas para esa fecha y hora.")
-        
+
+        # Sin comprobar antes el índice de disponibilidad: con varios workers cada uno tiene el suyo
+        # y podría rechazar un hueco ya libre. El índice único de la tabla decide (SLOT_TAKEN).
         entity = QuoteEntity(
             name=name,
             gmail=gmail,
             date=date
         )
 
-        self.db_manager.insert(entity)
+        await self.db_manager.insert(entity, session=session)
         return "Quote scheduled successfully"
 
     async def check_availability(self, date: datetime):
@@ -51,10 +53,8 @@ class QuotesService(BaseModel):
         if date.date() < now.date():
             raise HTTPException(status_code=400, detail="No se puede revisar disponibilidad pasada.")
         
-        slots = await self.generate_daily_slots(date)
-        booked_slots = self.db_manager.find_active_quotes_by_date(date)
-        booked_slots = [slot.date for slot in booked_slots]
-        available_slots = [slot for slot in slots if slot not in booked_slots]
+        # Los huecos ocupados salen del índice en memoria (bitmap por día), no de la base de datos
+        available_slots = await self.db_manager.availability.available_slots(date.date())
 
         if date.date() == now.date():
             available_slots = [slot for slot in available_slots if slot > now]
@@ -64,18 +64,44 @@ class QuotesService(BaseModel):
         
         return available_slots
 
+    async def check_availability_range(self, start: Date, end: Date):
+        """Check availability for every day between start and end (both included).
+
+        Returns the slot start times and, per day, a bitmask where bit i set means slots[i] is free.
+        """
+        now = datetime.now()
+
+        if end < start:
+            raise HTTPException(status_code=400, detail="La fecha final no puede ser anterior a la inicial.")
+
+        if end < now.date():
+            raise HTTPException(status_code=400, detail="No se puede revisar disponibilidad pasada.")
+
+        # Los días pasados del rango no tienen huecos que ofrecer
+        start = max(start, now.date())
+        if (end - start).days >= MAX_RANGE_DAYS:
+            raise HTTPException(status_code=400, detail=f"El rango no puede superar los {MAX_RANGE_DAYS} días.")
+
+        # Una sola consulta para todos los días que no estén ya en el índice
+        booked = await self.db_manager.availability.booked_masks(start, end)
+
+        free = {}
+        for day, mask in booked.items():
+            free_mask = FULL_DAY & ~mask
+            if day == now.date():
+                # Quitar los huecos de hoy que ya han pasado
+                for index, slot in enumerate(SLOT_TIMES):
+                    if datetime.combine(day, slot) <= now:
+                        free_mask &= ~(1 << index)
+            free[day.isoformat()] = free_mask
+
+        return {"slots": [slot.strftime("%H:%M") for slot in SLOT_TIMES], "free": free}
+
     async def generate_daily_slots(self, date: datetime, start="08:00", end="17:00", duration_minutes=30):
-        start_time = datetime.combine(date.date(), datetime.strptime(start, "%H:%M").time())
-        end_time = datetime.combine(date.date(), datetime.strptime(end, "%H:%M").time())
-        
-        slots = []
-        while start_time < end_time:
-            slots.append(start_time)
-            start_time += timedelta(minutes=duration_minutes)
-        
-        return slots
+        # Las horas de cada horario se calculan una vez y se reutilizan (sin strptime por llamada)
+        return [datetime.combine(date.date(), slot) for slot in daily_slot_times(start, end, duration_minutes)]
     
-    async def reschedule_quote(self, gmail: str, new_date: datetime):
+    async def reschedule_quote(self, gmail: str, new_date: datetime, session=None):
         """
         Reschedule a quote to a new date.
         """
@@ -89,22 +115,18 @@ class QuotesService(BaseModel):
 
         if not (datetime.combine(new_date.date(), time(8, 0)) <= new_date < datetime.combine(new_date.date(), time(17, 0))):
             raise HTTPException(status_code=400, detail="La cita debe estar entre las 08:00 y las 17:00.")
-        
-        available_slots = await self.check_availability(new_date)
-        if new_date not in available_slots:
-            raise HTTPException(status_code=400, detail="Ya hay citas programadas para esa fecha y hora.")
 
-        result = self.db_manager.update(gmail=gmail, new_date=new_date)
+        result = await self.db_manager.update(gmail=gmail, new_date=new_date, session=session)
         if result:
             return True
         raise HTTPException(status_code=400, detail="No se encontró la cita para reprogramar.")
     
-    async def cancel_quote(self, gmail: str):
+    async def cancel_quote(self, gmail: str, session=None):
         """
         Cancel a scheduled quote.
         """
 
-        result = self.db_manager.cancel(gmail=gmail)
+        result = await self.db_manager.cancel(gmail=gmail, session=session)
         if result:
             return True
         raise HTTPException(status_code=400, detail="No se encontró la cita para cancelar.")
@@ -1,27 +1,71 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from sqlalchemy import Column, Integer, String, DateTime, Index, delete, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from psycopg2 import connect, sql
 import psycopg2
-from sqlalchemy.orm import sessionmaker
-from datetime import datetime, timedelta, time
+from datetime import date, datetime, timedelta, time
 from enum import Enum
 from fastapi import HTTPException
+from quotes.common.tracing import traced
+from quotes.quotes.infrastructure.availability_index import AvailabilityIndex
 
 Base = declarative_base()
 
+# Drivers asíncronos para cada tipo de URL (postgresql:// -> asyncpg, sqlite:// -> aiosqlite)
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+# INSERT ... ON CONFLICT de cada dialecto
+DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+GMAIL_TAKEN = "Ya existe una cita activa para este correo electrónico."
+SLOT_TAKEN = "Ya hay citas programadas para esa fecha y hora."
+
 class DatabaseManager:
-    def __init__(self, db_user, db_password, db_name, db_host="db"):
+    def __init__(self, db_user, db_password, db_name, db_host="db", db_url=None,
+                 pool_size=10, max_overflow=20, pool_timeout=30, pool_pre_ping=True, pool_recycle=1800,
+                 availability_ttl=60.0):
         self.db_user = db_user
         self.db_password = db_password
         self.db_name = db_name
         self.db_host = db_host
-        self.db_url = f"postgresql://{self.db_user}:{self.db_password}@{self.db_host}:5432/{self.db_name}"
+        # Una URL completa (p. ej. sqlite:///quotes.db para pruebas de carga) sustituye a la de Postgres
+        self.db_url = db_url or f"postgresql://{self.db_user}:{self.db_password}@{self.db_host}:5432/{self.db_name}"
+        # Pool de conexiones: las peticiones concurrentes ya no comparten una única sesión
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout  # segundos esperando una conexión libre antes de fallar
+        self.pool_pre_ping = pool_pre_ping
+        self.pool_recycle = pool_recycle
         self.engine = None
         self.Session = None
-        self.session = None
+        # Bitmap en memoria de huecos ocupados por día; insert/update/cancel lo mantienen al día
+        self.availability = AvailabilityIndex(self.find_booked_slots_between, ttl=availability_ttl)
 
-    def init_db(self):
-        """Método para inicializar la base de datos y crear la tabla 'Quote'."""
+    @classmethod
+    def from_env(cls):
+        """Método para crear el gestor con la URL y el pool configurados por variables de entorno."""
+        return cls(db_user="admin", db_password="admin1234", db_name="quotes",
+                   db_url=os.environ.get("DATABASE_URL"),
+                   pool_size=int(os.environ.get("DB_POOL_SIZE", "10")),
+                   max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", "20")),
+                   pool_timeout=float(os.environ.get("DB_POOL_TIMEOUT", "30")),
+                   pool_pre_ping=os.environ.get("DB_POOL_PRE_PING", "1").lower() not in ("0", "false", "no"),
+                   pool_recycle=int(os.environ.get("DB_POOL_RECYCLE", "1800")),
+                   availability_ttl=float(os.environ.get("AVAILABILITY_TTL", "60")))
+
+    @property
+    def async_url(self):
+        """URL de la base de datos con el driver asíncrono correspondiente."""
+        scheme, rest = self.db_url.split("://", 1)
+        return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+    def create_database(self):
+        """Método para crear la base de datos en Postgres si todavía no existe."""
         conn = psycopg2.connect(
             dbname='postgres',
             user=self.db_user,
@@ -45,74 +89,176 @@ class DatabaseManager:
         cursor.close()
         conn.close()
 
-        # Ahora que la base de datos existe, conectar a la base de datos 'quotes'
-        self.engine = create_engine(self.db_url)
-        self.Session = sessionmaker(bind=self.engine)
-        self.session = self.Session()
+    async def init_db(self):
+        """Método para inicializar la base de datos y crear la tabla 'Quote'."""
+        # La base de datos solo se crea a mano en Postgres; SQLite crea el fichero al conectar
+        if self.db_url.startswith("postgresql"):
+            await asyncio.to_thread(self.create_database)
+
+        # Ahora que la base de datos existe, crear el engine asíncrono con su pool
+        options = {"pool_pre_ping": self.pool_pre_ping, "pool_recycle": self.pool_recycle}
+        if not self.db_url.startswith("sqlite"):
+            options.update(pool_size=self.pool_size, max_overflow=self.max_overflow,
+                           pool_timeout=self.pool_timeout)
+        self.engine = create_async_engine(self.async_url, **options)
+        # Cada operación abre su propia AsyncSession a partir de esta fábrica
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
 
         # Crear las tablas definidas en los modelos de SQLAlchemy (si no existen)
-        Base.metadata.create_all(self.engine)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            # create_all no añade índices a una tabla que ya existía; los únicos fallan si
+            # quedan citas activas duplicadas de antes y hay que limpiarlas a mano
+            for index in Quote.__table__.indexes:
+                await conn.run_sync(index.create, checkfirst=True)
 
-    def find(self, gmail: str):
+    async def close(self):
+        """Método para cerrar las conexiones del pool."""
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.engine = None
+
+    def pool_stats(self):
+        """Método para consultar el estado del pool de conexiones."""
+        if self.engine is None:
+            return {"status": "closed"}
+        pool = self.engine.pool
+        stats = {"status": "open", "pool": type(pool).__name__, "description": pool.status()}
+        # Solo los pools con cola (Postgres) llevan la cuenta de conexiones
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            if hasattr(pool, name):
+                stats[name] = getattr(pool, name)()
+        stats["max_overflow"] = self.max_overflow
+        stats["timeout"] = self.pool_timeout
+        return stats
+
+    @asynccontextmanager
+    async def session_scope(self, session=None):
+        """Usa la sesión de la petición si la hay; si no, abre una propia para la operación."""
+        if session is not None:
+            yield session
+        else:
+            async with self.Session() as own_session:
+                yield own_session
+
+    @traced("db:find", kind="db")
+    async def find(self, gmail: str, session=None):
         """Busca todas las citas activas para un correo electrónico específico."""
-        return self.session.query(Quote).filter(
-            Quote.gmail == gmail,
-            Quote.type == 'active'
-        ).all()
-    def find_active_quotes_by_date(self, date: datetime):
+        async with self.session_scope(session) as session:
+            result = await session.execute(select(Quote).where(
+                Quote.gmail == gmail,
+                Quote.type == 'active'
+            ))
+            return result.scalars().all()
+
+    @traced("db:find_active_quotes_by_date", kind="db")
+    async def find_active_quotes_by_date(self, date: datetime, session=None):
         """Método para encontrar citas ACTIVAS por fecha."""
         # Convertir la fecha a solo la parte de la fecha (sin hora)
         start_of_day = datetime.combine(date.date(), datetime.min.time())  # 00:00 de esa fecha
         end_of_day = start_of_day + timedelta(days=1)  # 23:59 de esa fecha
-        
+
         # Filtrar por tipo 'ACTIVE' y que la fecha esté dentro de ese día
-        return self.session.query(Quote).filter(
-            Quote.type == 'active',
-            Quote.date >= start_of_day,
-            Quote.date < end_of_day
-        ).all()
+        async with self.session_scope(session) as session:
+            result = await session.execute(select(Quote).where(
+                Quote.type == 'active',
+                Quote.date >= start_of_day,
+                Quote.date < end_of_day
+            ))
+            return result.scalars().all()
 
-    def insert(self, entity):
-        """Método para insertar un nuevo registro."""
+    @traced("db:find_booked_slots_between", kind="db")
+    async def find_booked_slots_between(self, start_day: date, end_day: date):
+        """Método para obtener en una sola consulta los huecos ocupados (día y hora) de un rango de días."""
+        start = datetime.combine(start_day, datetime.min.time())
+        end = datetime.combine(end_day, datetime.min.time()) + timedelta(days=1)
 
-        existing_active_quote = self.session.query(Quote).filter(Quote.gmail == entity.gmail, Quote.type == 'active').first()
-    
-        if existing_active_quote:
-            raise HTTPException(status_code=400, detail="Ya existe una cita activa para este correo electrónico.")
+        # Agrupar las citas activas por fecha y hora: una fila por hueco ocupado, sin recorrer día a día
+        async with self.Session() as session:
+            result = await session.execute(select(Quote.date).where(
+                Quote.type == 'active',
+                Quote.date >= start,
+                Quote.date < end
+            ).group_by(Quote.date))
+            return result.scalars().all()
 
+    @traced("db:insert", kind="db")
+    async def insert(self, entity, session=None):
+        """Método para insertar un nuevo registro."""
         # Convertir el modelo Pydantic en un diccionario excluyendo los valores None
         model_dict = entity.model_dump(exclude_none=True)
         if isinstance(model_dict.get("type"), Enum):
             model_dict["type"] = model_dict["type"].value
-        
-        # Usar el diccionario para crear una nueva instancia de SQLAlchemy
-        new_record = Quote(**model_dict)
-        self.session.add(new_record)
-        self.session.commit()
-        return new_record
-
-    def update(self, gmail: str, new_date: datetime):
+
+        # Una sola sentencia: los índices únicos parciales impiden dos citas activas en el
+        # mismo hueco o para el mismo correo, también con reservas concurrentes
+        statement = (DIALECT_INSERTS[self.engine.dialect.name](Quote)
+                     .values(**model_dict)
+                     .on_conflict_do_nothing()
+                     .returning(Quote.id))
+        async with self.session_scope(session) as session:
+            new_id = (await session.execute(statement)).scalar()
+            await session.commit()
+
+            if new_id is None:
+                # Solo en caso de conflicto: averiguar cuál de los dos índices ha saltado
+                gmail_taken = (await session.execute(
+                    select(Quote.id).where(Quote.gmail == entity.gmail, Quote.type == 'active').limit(1)
+                )).scalar()
+                if gmail_taken is None:
+                    self.availability.invalidate(entity.date.date())
+                raise HTTPException(status_code=400, detail=GMAIL_TAKEN if gmail_taken else SLOT_TAKEN)
+
+        self.availability.book(entity.date)
+        return Quote(id=new_id, **model_dict)
+
+    @traced("db:update", kind="db")
+    async def update(self, gmail: str, new_date: datetime, session=None):
         """Método para reprogramar una cita activa (actualizarla con una nueva fecha)."""
-        # Buscar la cita activa más reciente asociada al 'gmail'
-        quote = self.session.query(Quote).filter(Quote.gmail == gmail, Quote.type == 'active').order_by(Quote.date.desc()).first()
-        
-        if not quote:
+        # Con el índice único por correo solo puede haber una cita activa para 'gmail'
+        active = select(Quote.id, Quote.date.label("old_date")).where(
+            Quote.gmail == gmail, Quote.type == 'active'
+        ).subquery()
+        if self.engine.dialect.name == "postgresql":
+            # UPDATE ... FROM ... RETURNING devuelve también la fecha anterior
+            statement = update(Quote).where(Quote.id == active.c.id).values(date=new_date).returning(active.c.old_date)
+        else:
+            # SQLite no deja devolver columnas de la subconsulta en RETURNING
+            statement = update(Quote).where(Quote.gmail == gmail, Quote.type == 'active').values(date=new_date).returning(Quote.id)
+
+        async with self.session_scope(session) as session:
+            try:
+                returned = (await session.execute(statement)).first()
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()
+                self.availability.invalidate(new_date.date())
+                raise HTTPException(status_code=400, detail=SLOT_TAKEN)
+
+        if returned is None:
             raise HTTPException(status_code=400, detail="No se encontró una cita activa para reprogramar.")
 
-        # Actualizar la fecha de la cita
-        quote.date = new_date
-        self.session.commit()
+        if self.engine.dialect.name == "postgresql":
+            self.availability.release(returned.old_date)
+        else:
+            # Sin la fecha anterior no se sabe qué día liberar; se recargan todos
+            self.availability.invalidate()
+        self.availability.book(new_date)
         return True
-    
-    def cancel(self, gmail: str):
+
+    @traced("db:cancel", kind="db")
+    async def cancel(self, gmail: str, session=None):
         """Método para cancelar una cita programada."""
-        quote = self.session.query(Quote).filter(Quote.gmail == gmail, Quote.type == 'active').first()
+        statement = delete(Quote).where(Quote.gmail == gmail, Quote.type == 'active').returning(Quote.date)
+        async with self.session_scope(session) as session:
+            cancelled = (await session.execute(statement)).scalars().all()
+            await session.commit()
 
-        if not quote:
+        if not cancelled:
             raise HTTPException(status_code=400, detail="No se encontró la cita para cancelar.")
 
-        self.session.delete(quote)
-        self.session.commit()
+        for quote_date in cancelled:
+            self.availability.release(quote_date)
         return True
 
     # def delete(self, model, record_id):
@@ -126,11 +272,28 @@ class DatabaseManager:
 
 class Quote(Base):
     __tablename__ = 'quotes'
-    
+
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(100), nullable=False)
     gmail = Column(String(50), nullable=False)
     date = Column(DateTime, default=datetime.now)
     type = Column(String(50), nullable=False)
 
-db_manager = DatabaseManager(db_user="admin", db_password="admin1234", db_name="quotes")
\ No newline at end of file
+    __table_args__ = (
+        # Búsquedas por correo y por día, siempre filtradas por tipo
+        Index("ix_quotes_gmail_type", "gmail", "type"),
+        Index("ix_quotes_date_type", "date", "type"),
+        # Como mucho una cita activa por hueco y una por correo
+        Index("uq_quotes_active_date", "date", unique=True,
+              postgresql_where=text("type = 'active'"), sqlite_where=text("type = 'active'")),
+        Index("uq_quotes_active_gmail", "gmail", unique=True,
+              postgresql_where=text("type = 'active'"), sqlite_where=text("type = 'active'")),
+    )
+
+db_manager = DatabaseManager.from_env()
+
+
+async def get_session():
+    """Dependencia de FastAPI: una AsyncSession por petición, que se cierra al terminar la respuesta."""
+    async with db_manager.Session() as session:
+        yield session
\ No newline at end of file
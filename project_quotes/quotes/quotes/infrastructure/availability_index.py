@@ -0,0 +1,158 @@
+"""Índice en memoria de la disponibilidad de citas: un bitmap de huecos ocupados por día."""
+
+import time as clock
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+# Horario de citas: huecos de 30 minutos entre las 08:00 y las 17:00 (18 huecos por día)
+SLOT_START = "08:00"
+SLOT_END = "17:00"
+SLOT_MINUTES = 30
+
+
+@lru_cache(maxsize=16)
+def daily_slot_times(start=SLOT_START, end=SLOT_END, duration_minutes=SLOT_MINUTES):
+    """Método para calcular (una sola vez por horario) las horas de inicio de cada hueco."""
+    current = datetime.combine(date.min, datetime.strptime(start, "%H:%M").time())
+    last = datetime.combine(date.min, datetime.strptime(end, "%H:%M").time())
+    times = []
+    while current < last:
+        times.append(current.time())
+        current += timedelta(minutes=duration_minutes)
+    return tuple(times)
+
+
+SLOT_TIMES = daily_slot_times()
+_SLOT_BY_TIME = {slot: index for index, slot in enumerate(SLOT_TIMES)}
+FULL_DAY = (1 << len(SLOT_TIMES)) - 1
+
+
+def slot_index(when: datetime):
+    """Posición del hueco de `when` en el bitmap del día, o None si no es un hueco válido."""
+    return _SLOT_BY_TIME.get(when.time())
+
+
+class AvailabilityIndex:
+    """Índice en memoria de los huecos ocupados de cada día.
+
+    Cada día se guarda como un entero donde el bit i indica que el hueco SLOT_TIMES[i]
+    está ocupado. El día se carga de la base de datos la primera vez que se consulta
+    (con `loader`, que recibe un rango de días para poder cargar varios en una sola
+    consulta) y después se mantiene al día con `book`/`release` cada vez que el
+    repositorio inserta, reprograma o cancela una cita, así que consultar disponibilidad
+    no cuesta ninguna consulta a la base de datos y reservar solo mira un bit.
+
+    Las entradas caducan a los `ttl` segundos (por si otro worker ha escrito en la base de
+    datos) y los días pasados se descartan.
+    """
+
+    def __init__(self, loader, ttl=60.0):
+        """Crea el índice vacío; los días se cargan con `loader` al consultarlos."""
+        self.loader = loader  # async (primer día, último día) -> datetimes de las citas activas
+        self.ttl = ttl
+        self._days = {}  # date -> (bitmap, momento de carga)
+        # Cada escritura sube la generación del día; una carga que se solapa con una
+        # escritura no guarda su resultado, porque podría no incluirla.
+        self._generation = defaultdict(int)
+        self._last_sweep = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    async def booked_mask(self, day: date) -> int:
+        """Método para obtener el bitmap de huecos ocupados de `day`."""
+        return (await self.booked_masks(day, day))[day]
+
+    async def booked_masks(self, start: date, end: date):
+        """Método para obtener los bitmaps de todos los días entre `start` y `end` (incluidos).
+
+        Los días que no están en memoria se cargan juntos con una sola llamada a `loader`.
+        """
+        now = clock.monotonic()
+        self._evict(now)
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        masks = {}
+        missing = []
+        for day in days:
+            entry = self._days.get(day)
+            if entry is not None and now - entry[1] < self.ttl:
+                self.hits += 1
+                masks[day] = entry[0]
+            else:
+                self.misses += 1
+                missing.append(day)
+
+        if missing:
+            generations = {day: self._generation[day] for day in missing}
+            loaded = dict.fromkeys(missing, 0)
+            for booked in await self.loader(missing[0], missing[-1]):
+                index = slot_index(booked)
+                if index is not None and booked.date() in loaded:
+                    loaded[booked.date()] |= 1 << index
+            loaded_at = clock.monotonic()
+            for day, mask in loaded.items():
+                if self._generation[day] == generations[day]:
+                    self._days[day] = (mask, loaded_at)
+            masks.update(loaded)
+        return {day: masks[day] for day in days}
+
+    async def is_free(self, when: datetime) -> bool:
+        """Método para saber si el hueco que empieza en `when` está libre."""
+        index = slot_index(when)
+        if index is None:
+            return False
+        return not (await self.booked_mask(when.date())) >> index & 1
+
+    async def available_slots(self, day: date):
+        """Método para listar los huecos libres de `day` como datetimes."""
+        mask = await self.booked_mask(day)
+        return [
+            datetime.combine(day, slot)
+            for index, slot in enumerate(SLOT_TIMES)
+            if not mask >> index & 1
+        ]
+
+    def book(self, when: datetime):
+        """Marca como ocupado el hueco de `when` (después de guardar la cita)."""
+        self._write(when, True)
+
+    def release(self, when: datetime):
+        """Marca como libre el hueco de `when` (después de cancelar o mover la cita)."""
+        self._write(when, False)
+
+    def invalidate(self, day: date = None):
+        """Olvida un día (o todos) para que se vuelva a cargar de la base de datos."""
+        if day is None:
+            for known in list(self._days):
+                self._generation[known] += 1
+            self._days.clear()
+        else:
+            self._generation[day] += 1
+            self._days.pop(day, None)
+
+    def stats(self):
+        """Aciertos, fallos y días cargados del índice."""
+        return {"hits": self.hits, "misses": self.misses, "days": len(self._days)}
+
+    def _write(self, when, booked):
+        day = when.date()
+        self._generation[day] += 1
+        index = slot_index(when)
+        entry = self._days.get(day)
+        if index is None or entry is None:
+            return
+        mask, loaded_at = entry
+        mask = mask | (1 << index) if booked else mask & ~(1 << index)
+        self._days[day] = (mask, loaded_at)
+
+    def _evict(self, now):
+        # Como mucho un barrido por minuto: quita días pasados y entradas caducadas
+        if now - self._last_sweep < 60:
+            return
+        self._last_sweep = now
+        today = date.today()
+        for day, (_, loaded_at) in list(self._days.items()):
+            if day < today or now - loaded_at >= self.ttl:
+                del self._days[day]
+        for day in [d for d in self._generation if d < today]:
+            del self._generation[day]
@@ -0,0 +1,89 @@
+import asyncio
+from datetime import date, datetime, time
+
+from quotes.quotes.infrastructure.availability_index import (
+    SLOT_TIMES,
+    AvailabilityIndex,
+    slot_index,
+)
+
+DAY = date(2030, 5, 10)
+NINE = datetime.combine(DAY, time(9, 0))
+
+
+class FakeLoader:
+    """Loader en memoria que apunta cada rango de días que se le pide."""
+
+    def __init__(self, booked=()):
+        self.booked = list(booked)
+        self.calls = []
+
+    async def __call__(self, start, end):
+        self.calls.append((start, end))
+        return [when for when in self.booked if start <= when.date() <= end]
+
+
+def test_slot_index_only_accepts_slot_starts():
+    assert slot_index(datetime.combine(DAY, SLOT_TIMES[0])) == 0
+    assert slot_index(NINE) == 2
+    assert slot_index(datetime.combine(DAY, time(9, 15))) is None
+    assert slot_index(datetime.combine(DAY, time(17, 0))) is None
+
+
+def test_missing_days_are_loaded_with_one_query():
+    loader = FakeLoader([NINE, datetime(2030, 5, 12, 8, 0)])
+    index = AvailabilityIndex(loader)
+
+    masks = asyncio.run(index.booked_masks(DAY, date(2030, 5, 12)))
+    assert masks == {DAY: 1 << 2, date(2030, 5, 11): 0, date(2030, 5, 12): 1}
+    assert loader.calls == [(DAY, date(2030, 5, 12))]
+
+    assert asyncio.run(index.is_free(NINE)) is False
+    assert asyncio.run(index.is_free(datetime.combine(DAY, time(9, 30)))) is True
+    assert len(loader.calls) == 1
+    assert index.stats() == {"hits": 2, "misses": 3, "days": 3}
+
+
+def test_book_and_release_update_a_loaded_day():
+    index = AvailabilityIndex(FakeLoader())
+    assert len(asyncio.run(index.available_slots(DAY))) == len(SLOT_TIMES)
+
+    index.book(NINE)
+    slots = asyncio.run(index.available_slots(DAY))
+    assert NINE not in slots and len(slots) == len(SLOT_TIMES) - 1
+
+    index.release(NINE)
+    assert asyncio.run(index.is_free(NINE)) is True
+
+
+def test_load_overlapping_a_write_is_not_cached():
+    index = AvailabilityIndex(None)
+    calls = []
+
+    async def loader(start, end):
+        calls.append((start, end))
+        if len(calls) == 1:
+            # La reserva se guarda mientras la carga está en vuelo y la carga no la ve
+            index.book(NINE)
+            return []
+        return [NINE]
+
+    index.loader = loader
+    assert asyncio.run(index.booked_mask(DAY)) == 0
+    assert asyncio.run(index.booked_mask(DAY)) == 1 << 2
+    assert len(calls) == 2
+
+
+def test_entries_expire_after_ttl():
+    loader = FakeLoader([NINE])
+    index = AvailabilityIndex(loader, ttl=0)
+    asyncio.run(index.is_free(NINE))
+    loader.booked = []
+    assert asyncio.run(index.is_free(NINE)) is True
+    assert len(loader.calls) == 2
+
+    index = AvailabilityIndex(FakeLoader(), ttl=60)
+    asyncio.run(index.booked_mask(DAY))
+    index.invalidate(DAY)
+    asyncio.run(index.booked_mask(DAY))
+    assert len(index.loader.calls) == 2
@@ -0,0 +1,87 @@
+import asyncio
+
+from quotes.emails.infrastructure.EmailRepository import (
+    FAILED,
+    PENDING,
+    SENDING,
+    SENT,
+    EmailOutbox,
+)
+
+
+def run_with(manager, scenario, **outbox_options):
+    """Inicializa `manager` y ejecuta `scenario(outbox)` en el mismo event loop."""
+    async def main():
+        await manager.init_db()
+        try:
+            return await scenario(EmailOutbox(manager, **outbox_options))
+        finally:
+            await manager.close()
+    return asyncio.run(main())
+
+
+def test_claim_leases_ready_emails_once(make_manager):
+    async def scenario(outbox):
+        first = await outbox.enqueue("ana@example.org", "Cita", "payload")
+        second = await outbox.enqueue("luis@example.org", "Cita", "payload")
+
+        token, claimed = await outbox.claim(1, lease_seconds=60)
+        assert [email.id for email in claimed] == [first.id]
+        assert claimed[0].status == SENDING and claimed[0].claim_token == token
+
+        # El primero sigue reclamado hasta que venza el plazo
+        other_token, claimed = await outbox.claim(10, lease_seconds=60)
+        assert [email.id for email in claimed] == [second.id]
+        assert other_token != token
+
+        assert await outbox.record([(first.id, None)], token) == 1
+        sent = await outbox.get(first.id)
+        assert (sent.status, sent.attempts, sent.claim_token) == (SENT, 1, None)
+        assert sent.sent_at is not None
+
+    run_with(make_manager(), scenario)
+
+
+def test_record_ignores_results_from_an_expired_lease(make_manager):
+    async def scenario(outbox):
+        email = await outbox.enqueue("ana@example.org", "Cita", "payload")
+        stale_token, _ = await outbox.claim(10, lease_seconds=0)
+        token, claimed = await outbox.claim(10, lease_seconds=60)
+        assert [e.id for e in claimed] == [email.id]
+
+        # El worker que perdió el plazo no puede pisar el resultado del que lo reclamó después
+        assert await outbox.record([(email.id, "SMTPServerDisconnected: timeout")], stale_token) == 0
+        current = await outbox.get(email.id)
+        assert (current.status, current.attempts, current.claim_token) == (SENDING, 0, token)
+
+        assert await outbox.record([(email.id, None)], token) == 1
+        assert await outbox.record([(email.id, None)], token) == 0
+        assert (await outbox.get(email.id)).attempts == 1
+
+    run_with(make_manager(), scenario)
+
+
+def test_failures_back_off_and_give_up_after_max_attempts(make_manager):
+    async def scenario(outbox):
+        email = await outbox.enqueue("ana@example.org", "Cita", "payload")
+
+        token, _ = await outbox.claim(10, lease_seconds=60)
+        await outbox.record([(email.id, "SMTPDataError: busy")], token)
+        retry = await outbox.get(email.id)
+        assert (retry.status, retry.attempts, retry.last_error) == (PENDING, 1, "SMTPDataError: busy")
+        assert retry.next_attempt_at > retry.created_at
+        # Todavía en espera: no se vuelve a reclamar
+        assert (await outbox.claim(10, lease_seconds=60))[1] == []
+
+        # Adelantar el reintento en lugar de esperar a que pase la espera
+        retry.next_attempt_at = retry.created_at
+        async with outbox.db_manager.Session() as session:
+            await session.merge(retry)
+            await session.commit()
+
+        token, claimed = await outbox.claim(10, lease_seconds=60)
+        assert [e.id for e in claimed] == [email.id]
+        await outbox.record([(email.id, "SMTPDataError: busy")], token)
+        assert (await outbox.get(email.id)).status == FAILED
+
+    run_with(make_manager(), scenario, max_attempts=2)
@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+from loadtest import FakeSMTPServer
+from quotes.emails.domain import outbox_worker
+from quotes.emails.domain.outbox_worker import OutboxWorker
+from quotes.emails.infrastructure.EmailRepository import (
+    FAILED,
+    PENDING,
+    SENT,
+    EmailOutbox,
+)
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    """Arranca un SMTP falso y apunta el worker a él, sin STARTTLS ni login."""
+    servers = []
+
+    def start(**options):
+        server = FakeSMTPServer(**options).start()
+        servers.append(server)
+        monkeypatch.setattr(outbox_worker, "SMTP_HOST", "127.0.0.1")
+        monkeypatch.setattr(outbox_worker, "SMTP_PORT", server.port)
+        return server
+
+    monkeypatch.setattr(outbox_worker, "SMTP_STARTTLS", False)
+    monkeypatch.setattr(outbox_worker, "contraseña", "")
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def run_with(manager, scenario, **outbox_options):
+    """Inicializa `manager` y ejecuta `scenario(outbox)` en el mismo event loop."""
+    async def main():
+        await manager.init_db()
+        try:
+            return await scenario(EmailOutbox(manager, **outbox_options))
+        finally:
+            await manager.close()
+    return asyncio.run(main())
+
+
+async def enqueue(outbox, *recipients):
+    return [await outbox.enqueue(recipient, "Cita", "Subject: Cita\r\n\r\nHola") for recipient in recipients]
+
+
+async def statuses(outbox, emails):
+    return [(await outbox.get(email.id)).status for email in emails]
+
+
+def test_batches_reuse_one_connection(make_manager, smtp_server):
+    server = smtp_server()
+
+    async def scenario(outbox):
+        worker = OutboxWorker(outbox, batch_size=10)
+        try:
+            emails = await enqueue(outbox, "ana@example.org", "luis@example.org", "eva@example.org")
+            assert await worker.drain_once() == 3
+            emails += await enqueue(outbox, "sara@example.org")
+            assert await worker.drain_once() == 1
+            assert await worker.drain_once() == 0
+        finally:
+            await worker.stop()
+
+        assert await statuses(outbox, emails) == [SENT] * 4
+        assert (worker.sent, worker.failed) == (4, 0)
+        assert (server.messages, server.connections) == (4, 1)
+
+    run_with(make_manager(), scenario)
+
+
+def test_reconnects_once_when_the_server_drops_a_reused_connection(make_manager, smtp_server):
+    # El servidor corta cada conexión tras dos correos, a mitad del lote
+    server = smtp_server(drop_after=2)
+
+    async def scenario(outbox):
+        worker = OutboxWorker(outbox, batch_size=10)
+        try:
+            emails = await enqueue(outbox, *(f"user{i}@example.org" for i in range(5)))
+            assert await worker.drain_once() == 5
+        finally:
+            await worker.stop()
+
+        assert await statuses(outbox, emails) == [SENT] * 5
+        assert [(await outbox.get(email.id)).attempts for email in emails] == [1] * 5
+        assert (worker.sent, worker.failed) == (5, 0)
+        assert (server.messages, server.connections) == (5, 3)
+
+    run_with(make_manager(), scenario)
+
+
+def test_rejected_recipient_is_retried_later_and_then_failed(make_manager, smtp_server):
+    server = smtp_server(refused=["luis@example.org"])
+
+    async def scenario(outbox):
+        worker = OutboxWorker(outbox, batch_size=10)
+        try:
+            ana, luis, eva = await enqueue(outbox, "ana@example.org", "luis@example.org", "eva@example.org")
+            assert await worker.drain_once() == 3
+            assert await statuses(outbox, [ana, luis, eva]) == [SENT, PENDING, SENT]
+            retry = await outbox.get(luis.id)
+            assert retry.attempts == 1 and retry.last_error.startswith("SMTPRecipientsRefused")
+
+            # Adelantar el reintento en lugar de esperar a que pase la espera
+            retry.next_attempt_at = retry.created_at
+            async with outbox.db_manager.Session() as session:
+                await session.merge(retry)
+                await session.commit()
+            assert await worker.drain_once() == 1
+        finally:
+            await worker.stop()
+
+        failed = await outbox.get(luis.id)
+        assert (failed.status, failed.attempts) == (FAILED, 2)
+        assert (worker.sent, worker.failed) == (2, 2)
+        # El rechazo no tira la conexión
+        assert (server.messages, server.connections) == (2, 1)
+
+    run_with(make_manager(), scenario, max_attempts=2)
+
+
+def test_a_new_connection_that_fails_is_not_retried(make_manager, smtp_server):
+    server = smtp_server()
+    server.shutdown()
+    server.server_close()
+
+    async def scenario(outbox):
+        worker = OutboxWorker(outbox, batch_size=10)
+        try:
+            (email,) = await enqueue(outbox, "ana@example.org")
+            assert await worker.drain_once() == 1
+        finally:
+            await worker.stop()
+
+        retry = await outbox.get(email.id)
+        assert (retry.status, retry.attempts) == (PENDING, 1)
+        assert retry.last_error.startswith("ConnectionRefusedError")
+        assert (worker.sent, worker.failed) == (0, 1)
+        assert worker._connection is None
+
+    run_with(make_manager(), scenario)
@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from quotes.quotes.domain.quotes_service import QuotesService
+from quotes.quotes.infrastructure import QuoteRepository
+from quotes.quotes.infrastructure.QuoteRepository import GMAIL_TAKEN, SLOT_TAKEN
+from quotes.quotes.models.quote_entity import QuoteEntity
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NINE = datetime(2030, 5, 10, 9, 0)
+TEN = datetime(2030, 5, 10, 10, 0)
+
+
+def quote(gmail, date, name="Ana"):
+    return QuoteEntity(name=name, gmail=gmail, date=date)
+
+
+def run_with(manager, scenario):
+    """Inicializa `manager`, ejecuta `scenario(manager)` y cierra el pool, todo en el mismo event loop."""
+    async def main():
+        await manager.init_db()
+        try:
+            return await scenario(manager)
+        finally:
+            await manager.close()
+    return asyncio.run(main())
+
+
+def test_insert_update_and_cancel_keep_the_index_in_sync(make_manager):
+    async def scenario(db):
+        inserted = await db.insert(quote("ana@example.org", NINE))
+        assert inserted.id is not None
+        assert [q.date for q in await db.find("ana@example.org")] == [NINE]
+        assert not await db.availability.is_free(NINE)
+
+        assert await db.update("ana@example.org", TEN) is True
+        assert await db.availability.is_free(NINE)
+        assert not await db.availability.is_free(TEN)
+
+        assert await db.cancel("ana@example.org") is True
+        assert await db.availability.is_free(TEN)
+        assert await db.find("ana@example.org") == []
+        with pytest.raises(HTTPException):
+            await db.cancel("ana@example.org")
+
+    run_with(make_manager(), scenario)
+
+
+def test_conflicts_map_to_gmail_and_slot_errors(make_manager):
+    async def scenario(db):
+        await db.insert(quote("ana@example.org", NINE))
+        await db.insert(quote("luis@example.org", TEN, name="Luis"))
+
+        with pytest.raises(HTTPException) as taken:
+            await db.insert(quote("ana@example.org", datetime(2030, 5, 11, 9, 0)))
+        assert taken.value.detail == GMAIL_TAKEN
+
+        with pytest.raises(HTTPException) as taken:
+            await db.insert(quote("eva@example.org", NINE, name="Eva"))
+        assert taken.value.detail == SLOT_TAKEN
+
+        with pytest.raises(HTTPException) as taken:
+            await db.update("luis@example.org", NINE)
+        assert taken.value.detail == SLOT_TAKEN
+        assert [q.date for q in await db.find("luis@example.org")] == [TEN]
+
+    run_with(make_manager(), scenario)
+
+
+def test_stale_index_in_another_worker_does_not_reject_a_free_slot(make_manager):
+    first, second = make_manager(), make_manager()
+    service = QuotesService(db_manager=first)
+
+    async def scenario(db):
+        await second.init_db()
+        try:
+            await second.insert(quote("luis@example.org", NINE, name="Luis"))
+            # El primer worker carga el día con el hueco ocupado...
+            assert not await first.availability.is_free(NINE)
+            # ...y el segundo lo libera sin que el índice del primero se entere
+            await second.cancel("luis@example.org")
+        finally:
+            await second.close()
+
+        assert await service.schedule_quote("Ana", "ana@example.org", NINE) == "Quote scheduled successfully"
+        with pytest.raises(HTTPException) as taken:
+            await service.schedule_quote("Eva", "eva@example.org", NINE)
+        assert taken.value.detail == SLOT_TAKEN
+
+    run_with(first, scenario)
+
+
+def test_get_session_yields_a_session_per_request(make_manager, monkeypatch):
+    manager = make_manager()
+    monkeypatch.setattr(QuoteRepository, "db_manager", manager)
+
+    async def scenario(db):
+        await db.insert(quote("ana@example.org", NINE))
+        sessions = []
+        for _ in range(2):
+            dependency = QuoteRepository.get_session()
+            session = await anext(dependency)
+            assert isinstance(session, AsyncSession)
+            assert [q.gmail for q in await db.find("ana@example.org", session=session)] == ["ana@example.org"]
+            sessions.append(session)
+            await dependency.aclose()
+        assert sessions[0] is not sessions[1]
+
+    run_with(manager, scenario)
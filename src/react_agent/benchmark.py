@@ -0,0 +1,553 @@
+"""Offline benchmark of the agent graphs.
+
+Runs `graph`, `graph_pokemon` and `graph_appointment` end to end without any
+network access: the chat model is replaced by `ScriptedChatModel`, a fake that
+answers after a configurable delay and calls the same tools a real model would
+for each scenario, and the quotes API and PokéAPI are served by local stubs
+(`StubServices`). What is left is the cost of the orchestration itself
+(graph steps, prompt building, tool execution, HTTP round-trips, state
+updates), measured at increasing numbers of concurrent conversations:
+
+    react-agent-bench --concurrency 1 10 100 1000 --model-latency 0.05
+
+For every scenario and concurrency level it reports the throughput (runs per
+second), the latency of a whole run and of every graph step (p50/p95), and the
+memory allocated per concurrent conversation. Use `--json` to keep the results
+and compare them between commits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import itertools
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from typing import Any, Callable, Iterator, Sequence
+
+from aiohttp import web
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    ToolMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph.state import CompiledStateGraph
+
+from react_agent.configuration import Configuration
+from react_agent.http_client import close_http_sessions
+from react_agent.metrics import percentile
+from react_agent.routing import EMAIL_RE, extract_dates
+from react_agent.state import State
+from react_agent.utils import get_message_text, load_chat_model, model_registry
+
+FAKE_MODEL = "fake/scripted"
+
+STUB_POKEMON = ("pikachu", "raichu", "bulbasaur", "charmander", "squirtle", "eevee")
+
+_ANSWER = "Esta es una respuesta de prueba del modelo simulado. " * 4
+
+
+def _tool_name(tool: Any) -> str:
+    if isinstance(tool, dict):
+        return str(tool.get("name") or tool.get("function", {}).get("name", ""))
+    return str(getattr(tool, "name", None) or getattr(tool, "__name__", ""))
+
+
+def _tool_call(name: str, args: dict[str, Any], index: int) -> AIMessage:
+    return AIMessage(
+        content="",
+        tool_calls=[{"name": name, "args": args, "id": f"call_{name}_{index}"}],
+    )
+
+
+def script(messages: Sequence[BaseMessage], tool_names: Sequence[str]) -> AIMessage:
+    """Return what a well-behaved model would answer to `messages`.
+
+    A new user request is answered with the tool call the scenario needs
+    (`search_pokemon_by_name`, `schedule_quote`) when that tool is bound;
+    tool results and everything else get a plain text answer.
+    """
+    last = messages[-1] if messages else None
+    if isinstance(last, ToolMessage):
+        return AIMessage(content=f"Listo: {get_message_text(last)[:80]}")
+    if isinstance(last, HumanMessage):
+        text = get_message_text(last)
+        if "search_pokemon_by_name" in tool_names:
+            name = text.split()[-1].strip("?!.,¿¡")
+            return _tool_call("search_pokemon_by_name", {"name": name}, len(messages))
+        email, dates = EMAIL_RE.search(text), extract_dates(text)
+        if "schedule_quote" in tool_names and email and dates:
+            args = {"name": "Ana", "gmail": email.group(0), "date": dates[0]}
+            return _tool_call("schedule_quote", args, len(messages))
+    return AIMessage(content=_ANSWER)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Fake chat model that answers with `script` after `latency` seconds."""
+
+    latency: float = 0.0
+    tool_names: tuple[str, ...] = ()
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> ScriptedChatModel:
+        """Return a copy of the model that knows which tools it may call."""
+        return self.model_copy(
+            update={"tool_names": tuple(_tool_name(t) for t in tools)}
+        )
+
+    def _result(self, messages: list[BaseMessage]) -> ChatResult:
+        message = script(messages, self.tool_names)
+        input_tokens = sum(len(get_message_text(m)) for m in messages) // 4
+        output_tokens = len(get_message_text(message)) // 4 + len(message.tool_calls)
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        return self._result(messages)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._result(messages)
+
+
+@contextmanager
+def scripted_models(latency: float = 0.0) -> Iterator[None]:
+    """Serve `fake/...` model names from `ScriptedChatModel` while active."""
+    original = model_registry.loader
+
+    def loader(fully_specified_name: str, **model_kwargs: Any) -> BaseChatModel:
+        if fully_specified_name.startswith("fake/"):
+            return ScriptedChatModel(latency=latency)
+        return load_chat_model(fully_specified_name, **model_kwargs)
+
+    model_registry.clear()
+    model_registry.loader = loader
+    try:
+        yield
+    finally:
+        model_registry.loader = original
+        model_registry.clear()
+
+
+def _pokemon_document(name: str) -> dict[str, Any]:
+    def named(value: str) -> dict[str, str]:
+        return {"name": value, "url": ""}
+
+    return {
+        "id": STUB_POKEMON.index(name) + 1,
+        "is_default": True,
+        "name": name,
+        "height": 4,
+        "weight": 60,
+        "abilities": [{"ability": named("static"), "is_hidden": False, "slot": 1}],
+        "stats": [
+            {"base_stat": 50, "effort": 0, "stat": named(stat)}
+            for stat in ("hp", "attack", "defense", "speed")
+        ],
+        "types": [{"slot": 1, "type": named("electric")}],
+        "moves": [
+            {"move": named(f"move-{n}"), "version_group_details": []} for n in range(20)
+        ],
+    }
+
+
+class StubServices:
+    """Local stand-ins for the quotes API and PokéAPI, served by aiohttp.
+
+    Every response is delayed by `latency` seconds to model a remote service.
+    Use `quotes_url` and `pokeapi_url` as `quotes_api_url` and `pokeapi_url`.
+    """
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0
+    ) -> None:
+        """Prepare the stubs; they listen once `start` is awaited."""
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.active: dict[str, dict[str, Any]] = {}
+        self.emails: list[str] = []
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def base_url(self) -> str:
+        """Root URL the stubs listen on."""
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def quotes_url(self) -> str:
+        """Base URL of the quotes API stub."""
+        return f"{self.base_url}/quotes"
+
+    @property
+    def pokeapi_url(self) -> str:
+        """Base URL of the PokéAPI stub."""
+        return f"{self.base_url}/api/v2"
+
+    async def start(self) -> StubServices:
+        """Start listening; with port 0 a free port is picked."""
+        app = web.Application()
+        app.router.add_get("/api/v2/pokemon", self._pokemon_list)
+        app.router.add_get("/api/v2/pokemon/{name}", self._pokemon)
+        app.router.add_post("/quotes/schedule", self._schedule)
+        app.router.add_get("/quotes/schedule", self._availability)
+        app.router.add_get("/quotes/schedule/range", self._availability_range)
+        app.router.add_put("/quotes/reschedule", self._reschedule)
+        app.router.add_put("/quotes/cancel", self._cancel)
+        app.router.add_post("/quotes/send", self._send)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        return self
+
+    async def close(self) -> None:
+        """Stop listening."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> StubServices:
+        """Start the stubs for the duration of an `async with` block."""
+        return await self.start()
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Stop the stubs."""
+        await self.close()
+
+    async def _delay(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def _pokemon_list(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return web.json_response({"results": [{"name": n} for n in STUB_POKEMON]})
+
+    async def _pokemon(self, request: web.Request) -> web.Response:
+        await self._delay()
+        name = request.match_info["name"]
+        if name not in STUB_POKEMON:
+            return web.Response(status=404)
+        return web.json_response(_pokemon_document(name))
+
+    async def _schedule(self, request: web.Request) -> web.Response:
+        await self._delay()
+        data = await request.json()
+        if data["gmail"] in self.active:
+            return web.json_response(
+                {"detail": "Ya existe una cita activa para este correo electrónico."},
+                status=400,
+            )
+        self.active[data["gmail"]] = data
+        return web.json_response("Quote scheduled successfully")
+
+    async def _availability(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return web.json_response([f"{hour:02d}:00" for hour in range(9, 18)])
+
+    async def _availability_range(self, request: web.Request) -> web.Response:
+        await self._delay()
+        start = date.fromisoformat(request.query["start"])
+        end = date.fromisoformat(request.query["end"])
+        days = (start + timedelta(days=n) for n in range((end - start).days + 1))
+        return web.json_response(
+            {
+                "slots": [f"{hour:02d}:00" for hour in range(9, 18)],
+                "free": {day.isoformat(): (1 << 9) - 1 for day in days},
+            }
+        )
+
+    async def _reschedule(self, request: web.Request) -> web.Response:
+        await self._delay()
+        data = await request.json()
+        if data["gmail"] not in self.active:
+            return web.json_response({"detail": "No se encontró la cita."}, status=404)
+        self.active[data["gmail"]]["date"] = data["new_date"]
+        return web.json_response("Cita reprogramada con éxito")
+
+    async def _cancel(self, request: web.Request) -> web.Response:
+        await self._delay()
+        data = await request.json()
+        if self.active.pop(data["gmail"], None) is None:
+            return web.json_response({"detail": "No se encontró la cita."}, status=404)
+        return web.json_response("Cita cancelada con éxito")
+
+    async def _send(self, request: web.Request) -> web.Response:
+        await self._delay()
+        self.emails.append(request.query["gmail"])
+        return web.json_response(
+            {"detail": "Email queued", "id": len(self.emails), "status": "pending"}
+        )
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One conversation shape: which graph runs and what the user writes."""
+
+    graph: str
+    message: Callable[[int], str]
+
+
+_conversations = itertools.count()
+
+SCENARIOS: dict[str, Scenario] = {
+    "general": Scenario("graph", lambda i: "¿Qué es LangGraph y para qué sirve?"),
+    "pokemon": Scenario("graph_pokemon", lambda i: "Háblame de pikachu"),
+    "appointment": Scenario(
+        "graph_appointment",
+        lambda i: (
+            "Quiero agendar una cita el 2030-05-10 a las 10:00, "
+            f"mi correo es user{i}@example.org"
+        ),
+    ),
+}
+
+
+@dataclass
+class LevelResult:
+    """Measurements of one scenario at one concurrency level."""
+
+    scenario: str
+    concurrency: int
+    runs: int
+    errors: int
+    seconds: float
+    run_ms: list[float] = field(default_factory=list, repr=False)
+    step_ms: dict[str, list[float]] = field(default_factory=dict, repr=False)
+    memory_per_thread_kb: float | None = None
+
+    @property
+    def runs_per_second(self) -> float:
+        """Completed runs per wall-clock second."""
+        return self.runs / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        """Return the result with latency samples reduced to percentiles."""
+        data = asdict(self)
+        del data["run_ms"], data["step_ms"]
+        data["runs_per_second"] = round(self.runs_per_second, 2)
+        data["run_p50_ms"] = percentile(self.run_ms, 50)
+        data["run_p95_ms"] = percentile(self.run_ms, 95)
+        data["steps"] = {
+            step: {
+                "p50_ms": percentile(samples, 50),
+                "p95_ms": percentile(samples, 95),
+            }
+            for step, samples in self.step_ms.items()
+        }
+        return data
+
+
+async def _conversation(
+    graph: CompiledStateGraph[State, Configuration, Any, Any],
+    scenario: Scenario,
+    configurable: dict[str, Any],
+    result: LevelResult,
+) -> None:
+    index = next(_conversations)
+    config: RunnableConfig = {
+        "configurable": {**configurable, "thread_id": f"bench-{index}"}
+    }
+    inputs = {"messages": [HumanMessage(content=scenario.message(index))]}
+    started = last = time.perf_counter()
+    async for update in graph.astream(inputs, config, stream_mode="updates"):
+        now = time.perf_counter()
+        # Steps of these graphs run one after another, so the time since the
+        # previous update is the step plus the scheduling overhead before it.
+        for step in update:
+            result.step_ms.setdefault(step, []).append((now - last) * 1000)
+        last = now
+    result.run_ms.append((time.perf_counter() - started) * 1000)
+
+
+async def _run_level(
+    graph: CompiledStateGraph[State, Configuration, Any, Any],
+    name: str,
+    concurrency: int,
+    runs_per_thread: int,
+    configurable: dict[str, Any],
+) -> LevelResult:
+    result = LevelResult(name, concurrency, runs=0, errors=0, seconds=0.0)
+    scenario = SCENARIOS[name]
+
+    async def thread() -> None:
+        for _ in range(runs_per_thread):
+            try:
+                await _conversation(graph, scenario, configurable, result)
+                result.runs += 1
+            except Exception:
+                result.errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(thread() for _ in range(concurrency)))
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+async def run_benchmark(
+    scenarios: Sequence[str] = tuple(SCENARIOS),
+    concurrency: Sequence[int] = (1, 10, 100, 1000),
+    *,
+    runs_per_thread: int = 1,
+    model_latency: float = 0.05,
+    service_latency: float = 0.0,
+    measure_memory: bool = True,
+    configurable: dict[str, Any] | None = None,
+) -> list[LevelResult]:
+    """Run every scenario at every concurrency level and return the results.
+
+    Args:
+        scenarios: Names from `SCENARIOS`.
+        concurrency: Numbers of conversations running at the same time.
+        runs_per_thread: Conversations each concurrent thread runs in a row.
+        model_latency: Seconds the fake model takes per call.
+        service_latency: Seconds the stub services take per request.
+        measure_memory: Repeat each level under `tracemalloc` to measure the
+            memory allocated per concurrent conversation (slower).
+        configurable: Extra configuration for the runs.
+    """
+    graphs = importlib.import_module("react_agent.graph")
+    results: list[LevelResult] = []
+    with scripted_models(model_latency):
+        async with StubServices(latency=service_latency) as stubs:
+            base = {
+                "model": FAKE_MODEL,
+                "response_cache": False,
+                "pokeapi_url": stubs.pokeapi_url,
+                "pokeapi_cache_dir": "",
+                "quotes_api_url": stubs.quotes_url,
+                **(configurable or {}),
+            }
+            try:
+                for name in scenarios:
+                    graph = getattr(graphs, SCENARIOS[name].graph)
+                    # Warm up models, HTTP pools and caches before measuring.
+                    await _run_level(graph, name, 1, 1, base)
+                    for level in concurrency:
+                        result = await _run_level(
+                            graph, name, level, runs_per_thread, base
+                        )
+                        if measure_memory:
+                            result.memory_per_thread_kb = await _memory_per_thread(
+                                graph, name, level, base
+                            )
+                        results.append(result)
+            finally:
+                await close_http_sessions()
+    return results
+
+
+async def _memory_per_thread(
+    graph: CompiledStateGraph[State, Configuration, Any, Any],
+    name: str,
+    concurrency: int,
+    configurable: dict[str, Any],
+) -> float:
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await _run_level(graph, name, concurrency, 1, configurable)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round((peak - baseline) / 1024 / concurrency, 1)
+
+
+def format_results(results: Sequence[LevelResult]) -> str:
+    """Render results as a table, followed by the step latencies of each level."""
+    lines = [
+        f"{'scenario':<12} {'threads':>7} {'runs':>6} {'errors':>6} {'runs/s':>9} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'KB/thread':>10}"
+    ]
+    steps: list[str] = []
+    for result in results:
+        row = result.summary()
+        memory = row["memory_per_thread_kb"]
+        lines.append(
+            f"{result.scenario:<12} {result.concurrency:>7} {result.runs:>6} "
+            f"{result.errors:>6} {row['runs_per_second']:>9.1f} "
+            f"{row['run_p50_ms']:>9.1f} {row['run_p95_ms']:>9.1f} "
+            f"{'-' if memory is None else f'{memory:.1f}':>10}"
+        )
+        steps.append(
+            f"{result.scenario} x{result.concurrency}: "
+            + ", ".join(
+                f"{step} {values['p50_ms']:.1f}/{values['p95_ms']:.1f}"
+                for step, values in row["steps"].items()
+            )
+        )
+    return "\n".join([*lines, "", "step latency p50/p95 ms:", *steps])
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command line entry point: `react-agent-bench [options]`."""
+    parser = argparse.ArgumentParser(prog="react-agent-bench")
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument(
+        "--concurrency", nargs="+", type=int, default=[1, 10, 100, 1000]
+    )
+    parser.add_argument("--runs-per-thread", type=int, default=1)
+    parser.add_argument("--model-latency", type=float, default=0.05)
+    parser.add_argument("--service-latency", type=float, default=0.0)
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip the tracemalloc pass"
+    )
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(
+        run_benchmark(
+            args.scenarios,
+            args.concurrency,
+            runs_per_thread=args.runs_per_thread,
+            model_latency=args.model_latency,
+            service_latency=args.service_latency,
+            measure_memory=not args.no_memory,
+        )
+    )
+    sys.stdout.write(format_results(results) + "\n")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump([r.summary() for r in results], handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Small caching primitives shared by the agent's tools.
+
+- `TTLCache`: a thread-safe in-memory LRU whose entries expire after a TTL.
+- `DiskCache`: a directory of JSON documents with the same TTL semantics, used
+  to persist raw API responses across processes.
+- `SingleFlight`: de-duplicates concurrent async loads of the same key so only
+  one of them does the work.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar
+from urllib.parse import quote
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+T = TypeVar("T")
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a cache tier."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered by this tier."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class TTLCache(Generic[K, V]):
+    """In-memory LRU cache with per-entry time-to-live."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 3600.0) -> None:
+        """Create a cache holding at most `maxsize` entries for `ttl` seconds each."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K, default: Any = None) -> Any:
+        """Return the live value for `key`, or `default` if absent or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.stats.hits += 1
+                    return value
+                del self._data[key]
+            self.stats.misses += 1
+            return default
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """Store `value` under `key`, evicting the least recently used entries if full."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        """Return the number of stored (possibly expired) entries."""
+        return len(self._data)
+
+
+class DiskCache:
+    """A directory of JSON documents keyed by string, each with a TTL.
+
+    Every entry is a single file so reads and writes never need a global lock;
+    writes go through a temporary file and `os.replace` to stay atomic. The
+    directory size is checked every `prune_every` writes and, once past
+    `max_entries`, the oldest files are removed.
+    """
+
+    prune_every = 32
+
+    def __init__(
+        self, directory: str | os.PathLike[str], max_entries: int = 2000
+    ) -> None:
+        """Use `directory` (created on demand) to store at most `max_entries` documents."""
+        self.directory = Path(directory).expanduser()
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._writes = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{quote(key, safe='')}.json"
+
+    def get(self, key: str, ttl: float) -> Any:
+        """Return the stored document for `key`, or `None` if absent or older than `ttl`."""
+        path = self._path(key)
+        try:
+            with path.open(encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.stats.misses += 1
+            return None
+        if time.time() - entry.get("stored_at", 0) > ttl:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return entry.get("value")
+
+    def set(self, key: str, value: Any) -> None:
+        """Persist `value` (which must be JSON serializable) under `key`."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"stored_at": time.time(), "value": value}, f)
+        os.replace(tmp, path)
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            self.prune()
+
+    def prune(self) -> None:
+        """Remove the oldest documents until at most `max_entries` remain."""
+        files = list(self.directory.glob("*.json"))
+        excess = len(files) - self.max_entries
+        if excess <= 0:
+            return
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files[:excess]:
+            path.unlink(missing_ok=True)
+            self.stats.evictions += 1
+
+
+class SingleFlight(Generic[T]):
+    """Collapse concurrent async loads of the same key into one call.
+
+    The first caller for a key runs the loader; callers that arrive while it is
+    in flight await the same future and share its result (or exception).
+    """
+
+    def __init__(self) -> None:
+        """Create an empty in-flight table (one per event loop)."""
+        self._inflight: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[Hashable, asyncio.Future[T]]
+        ] = weakref.WeakKeyDictionary()
+        self.shared = 0
+
+    async def do(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        """Run `loader` for `key` unless a call for the same key is already running."""
+        inflight = self._inflight.setdefault(asyncio.get_running_loop(), {})
+        future = inflight.get(key)
+        if future is not None:
+            self.shared += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        inflight[key] = future
+        try:
+            result = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved when nobody else was waiting.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            inflight.pop(key, None)
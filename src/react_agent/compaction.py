@@ -0,0 +1,150 @@
+"""Compaction of the conversation history sent to the model.
+
+`State.messages` grows without bound, and every node sends the whole history
+to the model on every step. Before a model call the nodes pass the history
+through `compact_messages`, which applies the strategy named by
+`Configuration.compaction_strategy`. The state itself is never modified: the
+checkpointed thread keeps the full transcript, only the prompt is compacted.
+
+Strategies are plain functions registered with `register_strategy`:
+
+- `none`: send the history unchanged.
+- `truncate_tool_results`: shorten the content of tool results that are
+  older than the most recent `compaction_keep_recent` messages.
+- `sliding_window` (default): truncate old tool results, then keep the
+  newest messages that fit in `compaction_max_tokens`.
+
+Token counts are approximate and cached per message, so checking the budget
+on every step costs a dictionary lookup for messages that were already seen.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Sequence
+
+from langchain_core.messages import AnyMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+from react_agent.cache import TTLCache
+from react_agent.configuration import Configuration
+
+Strategy = Callable[[Sequence[AnyMessage], Configuration], list[AnyMessage]]
+
+STRATEGIES: dict[str, Strategy] = {}
+
+# Messages are immutable once added to the state, so their count never goes
+# stale; the TTL only bounds how long ids of finished threads are kept.
+_token_counts: TTLCache[str, int] = TTLCache(maxsize=10_000, ttl=24 * 3600)
+
+
+def register_strategy(name: str) -> Callable[[Strategy], Strategy]:
+    """Register a compaction strategy under `name` (usable as a decorator)."""
+
+    def decorator(strategy: Strategy) -> Strategy:
+        STRATEGIES[name] = strategy
+        return strategy
+
+    return decorator
+
+
+def count_tokens(message: AnyMessage) -> int:
+    """Return the approximate token count of `message`, cached by message id."""
+    if message.id is None:
+        return count_tokens_approximately([message])
+    count: int | None = _token_counts.get(message.id)
+    if count is None:
+        count = count_tokens_approximately([message])
+        _token_counts.set(message.id, count)
+    return count
+
+
+def compact_messages(
+    messages: Sequence[AnyMessage], configuration: Configuration
+) -> list[AnyMessage]:
+    """Return the history to send to the model under the configured strategy."""
+    try:
+        strategy = STRATEGIES[configuration.compaction_strategy]
+    except KeyError:
+        raise ValueError(
+            f"Unknown compaction strategy {configuration.compaction_strategy!r}. "
+            f"Expected one of: {', '.join(sorted(STRATEGIES))}."
+        ) from None
+    return strategy(messages, configuration)
+
+
+@register_strategy("none")
+def _no_compaction(
+    messages: Sequence[AnyMessage], configuration: Configuration
+) -> list[AnyMessage]:
+    return list(messages)
+
+
+@register_strategy("truncate_tool_results")
+def truncate_tool_results(
+    messages: Sequence[AnyMessage], configuration: Configuration
+) -> list[AnyMessage]:
+    """Shorten tool results older than the most recent `compaction_keep_recent` messages.
+
+    The ToolMessage itself (and its `tool_call_id`) is kept so every tool call
+    in the history still has a matching result.
+    """
+    limit = configuration.compaction_tool_result_chars
+    cutoff = len(messages) - configuration.compaction_keep_recent
+    compacted: list[AnyMessage] = []
+    for i, message in enumerate(messages):
+        if (
+            i < cutoff
+            and isinstance(message, ToolMessage)
+            and isinstance(message.content, str)
+            and len(message.content) > limit
+        ):
+            dropped = len(message.content) - limit
+            message = message.model_copy(
+                update={
+                    "content": f"{message.content[:limit]}… [{dropped} characters omitted]",
+                    # Give the shortened copy its own cache entry.
+                    "id": f"{message.id}:truncated:{limit}" if message.id else None,
+                }
+            )
+        compacted.append(message)
+    return compacted
+
+
+@register_strategy("sliding_window")
+def sliding_window(
+    messages: Sequence[AnyMessage], configuration: Configuration
+) -> list[AnyMessage]:
+    """Keep the newest messages that fit in `compaction_max_tokens`.
+
+    The window always starts on a HumanMessage, so a tool result is never sent
+    without the AIMessage that requested it and the model never sees a turn
+    without its question. When the budget cuts into the middle of a turn, the
+    window moves forward to the next HumanMessage; when the current turn alone
+    does not fit (e.g. an oversized tool result), it moves back to the start
+    of that turn and goes over budget instead.
+    """
+    compacted = truncate_tool_results(messages, configuration)
+    budget = configuration.compaction_max_tokens
+    start = len(compacted)
+    used = 0
+    while start > 0:
+        cost = count_tokens(compacted[start - 1])
+        if used + cost > budget and start < len(compacted):
+            break
+        used += cost
+        start -= 1
+    if start < len(compacted) and not isinstance(compacted[start], HumanMessage):
+        later = next(
+            (
+                i
+                for i in range(start + 1, len(compacted))
+                if isinstance(compacted[i], HumanMessage)
+            ),
+            None,
+        )
+        if later is not None:
+            start = later
+        else:
+            while start > 0 and not isinstance(compacted[start], HumanMessage):
+                start -= 1
+    return compacted[start:]
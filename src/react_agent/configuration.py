@@ -24,13 +24,149 @@ class Configuration:
     )
 
     model: Annotated[str, {"__template_metadata__": {"kind": "llm"}}] = field(
-        default="anthropic/claude-3-5-sonnet-20240620",
+        default="fireworks/accounts/fireworks/models/llama-v3p1-405b-instruct",
         metadata={
             "description": "The name of the language model to use for the agent's main interactions. "
             "Should be in the form: provider/model-name."
         },
     )
 
+    route_models: dict[str, str] = field(
+        default_factory=dict,
+        metadata={
+            "description": "Model used by each sub-agent, keyed by route ('general', 'pokemon', "
+            "'appointment'). Routes not listed use `model`."
+        },
+    )
+
+    router_model: str = field(
+        default="",
+        metadata={
+            "description": "Small, fast model the router asks when the keyword classifier is "
+            "inconclusive, in the form provider/model-name. Leave empty to route with "
+            "keywords only (inconclusive requests go to the general agent)."
+        },
+    )
+
+    model_call: str = field(
+        default="",
+        metadata={
+            "description": "Model for the `call_model` node. Empty falls back to the route's "
+            "model in `route_models`, then to `model`."
+        },
+    )
+
+    model_pokemon: str = field(
+        default="",
+        metadata={
+            "description": "Model for the `pokemon_expert` node. Empty falls back to the route's "
+            "model in `route_models`, then to `model`."
+        },
+    )
+
+    model_fun_facts: str = field(
+        default="",
+        metadata={
+            "description": "Model for the `fun_facts` node. Empty falls back to the route's "
+            "model in `route_models`, then to `model`."
+        },
+    )
+
+    model_appointments: str = field(
+        default="",
+        metadata={
+            "description": "Model for the `appointment_manager` node. Empty falls back to the "
+            "route's model in `route_models`, then to `model`."
+        },
+    )
+
+    fast_model: str = field(
+        default="",
+        metadata={
+            "description": "Cheaper model used instead of the node's model for low-complexity "
+            "turns. Leave empty to never downgrade."
+        },
+    )
+
+    fast_model_max_tokens: int = field(
+        default=300,
+        metadata={
+            "description": "A turn is low-complexity when it fits in this many approximate tokens, "
+            "counted from the last user message."
+        },
+    )
+
+    fast_model_excluded_nodes: list[str] = field(
+        default_factory=list,
+        metadata={
+            "description": "Nodes that always use their configured model, even on "
+            "low-complexity turns."
+        },
+    )
+
+    model_timeout: float = field(
+        default=120.0,
+        metadata={
+            "description": "Deadline, in seconds, for one model call attempt (including its "
+            "hedge). Use 0 to wait indefinitely."
+        },
+    )
+
+    model_max_retries: int = field(
+        default=2,
+        metadata={
+            "description": "How many times a model call is retried after a timeout or a "
+            "transient provider error (rate limit, 5xx, dropped connection)."
+        },
+    )
+
+    model_retry_backoff: float = field(
+        default=0.5,
+        metadata={
+            "description": "Base delay, in seconds, of the exponential backoff between retries."
+        },
+    )
+
+    model_hedge_after: float = field(
+        default=0.0,
+        metadata={
+            "description": "Send a second, hedged request when the first token has not arrived "
+            "after this many seconds; the first to answer wins. Use 0 to disable hedging."
+        },
+    )
+
+    model_hedge_percentile: float = field(
+        default=95.0,
+        metadata={
+            "description": "Once enough calls were observed, hedge after this percentile of the "
+            "node's time to first token instead of `model_hedge_after`."
+        },
+    )
+
+    model_hedge_fallback: str = field(
+        default="",
+        metadata={
+            "description": "Model that receives hedged requests, in the form provider/model-name. "
+            "Empty sends the hedge to the node's own model."
+        },
+    )
+
+    trace_path: str = field(
+        default="",
+        metadata={
+            "description": "JSONL file that node, model, tool and HTTP spans are appended to. "
+            "Empty falls back to the REACT_AGENT_TRACE_PATH environment variable; "
+            "tracing is off when both are empty."
+        },
+    )
+
+    trace_otel: bool = field(
+        default=False,
+        metadata={
+            "description": "Also send spans to the OpenTelemetry tracer, when opentelemetry is installed."
+        },
+    )
+
     max_search_results: int = field(
         default=10,
         metadata={
@@ -38,6 +174,242 @@ class Configuration:
         },
     )
 
+    http_pool_limit: int = field(
+        default=100,
+        metadata={
+            "description": "The maximum number of open connections in each shared HTTP pool."
+        },
+    )
+
+    public_http_limit_per_host: int = field(
+        default=10,
+        metadata={
+            "description": "The maximum number of connections per host in the pool used "
+            "for public APIs (PokéAPI, pokemondb)."
+        },
+    )
+
+    quotes_http_limit_per_host: int = field(
+        default=20,
+        metadata={
+            "description": "The maximum number of connections per host in the pool used "
+            "for the quotes API."
+        },
+    )
+
+    http_dns_cache_ttl: int = field(
+        default=300,
+        metadata={
+            "description": "How long, in seconds, resolved host names are cached by the HTTP pools."
+        },
+    )
+
+    http_timeout: float = field(
+        default=30.0,
+        metadata={
+            "description": "Total timeout, in seconds, for a single HTTP request made by a tool."
+        },
+    )
+
+    http_connect_timeout: float = field(
+        default=10.0,
+        metadata={
+            "description": "Timeout, in seconds, for establishing a new HTTP connection."
+        },
+    )
+
+    pokeapi_cache_ttl: float = field(
+        default=7 * 24 * 3600,
+        metadata={
+            "description": "How long, in seconds, a PokéAPI response is served from cache."
+        },
+    )
+
+    pokeapi_negative_cache_ttl: float = field(
+        default=3600,
+        metadata={
+            "description": "How long, in seconds, a PokéAPI 404 is remembered before retrying."
+        },
+    )
+
+    pokeapi_url: str = field(
+        default="",
+        metadata={
+            "description": "Base URL of PokéAPI (e.g. a local mirror or stub). "
+            "Empty uses the public https://pokeapi.co/api/v2."
+        },
+    )
+
+    quotes_api_url: str = field(
+        default="http://localhost:8001/quotes",
+        metadata={
+            "description": "Base URL of the quotes API used by the appointment and email tools."
+        },
+    )
+
+    pokeapi_cache_dir: str = field(
+        default="~/.cache/react_agent/pokeapi",
+        metadata={
+            "description": "Directory where raw PokéAPI responses are persisted. "
+            "Set to an empty string to keep the cache in memory only."
+        },
+    )
+
+    pokeapi_cache_max_entries: int = field(
+        default=2000,
+        metadata={
+            "description": "The maximum number of PokéAPI responses kept on disk."
+        },
+    )
+
+    pokedex_snapshot_path: str = field(
+        default="",
+        metadata={
+            "description": "Path to an offline Pokédex snapshot built with "
+            "`react-agent-pokedex build`. When set, the Pokémon tools "
+            "answer from it instead of calling PokéAPI and pokemondb."
+        },
+    )
+
+    pokemon_fields: list[str] = field(
+        default_factory=list,
+        metadata={
+            "description": "PokemonSchema fields returned by search_pokemon_by_name, in order. "
+            "Leave empty to return every field. Unknown names are rejected."
+        },
+    )
+
+    pokemon_max_moves: int = field(
+        default=10,
+        metadata={
+            "description": "How many moves search_pokemon_by_name returns (the total count "
+            "is included when truncated). Use a negative value to return every move."
+        },
+    )
+
+    pokemon_stats_as_dict: bool = field(
+        default=True,
+        metadata={
+            "description": "Return Pokémon stats as a single {stat: base_stat} mapping "
+            "instead of a list of one-entry dicts."
+        },
+    )
+
+    compaction_strategy: str = field(
+        default="sliding_window",
+        metadata={
+            "description": "How the conversation history is compacted before each model call: "
+            "'none', 'truncate_tool_results' or 'sliding_window'."
+        },
+    )
+
+    compaction_max_tokens: int = field(
+        default=16000,
+        metadata={
+            "description": "Approximate token budget for the history sent to the model "
+            "by the 'sliding_window' strategy."
+        },
+    )
+
+    compaction_keep_recent: int = field(
+        default=6,
+        metadata={
+            "description": "Number of most recent messages whose tool results are never truncated."
+        },
+    )
+
+    compaction_tool_result_chars: int = field(
+        default=2000,
+        metadata={
+            "description": "Older tool results longer than this many characters are truncated."
+        },
+    )
+
+    system_time_granularity: str = field(
+        default="hour",
+        metadata={
+            "description": "Precision of the system time written into the system prompt: "
+            "'day', 'hour', 'minute' or 'exact'. Coarser values keep the prompt prefix "
+            "identical across calls so providers can serve it from their prompt cache."
+        },
+    )
+
+    prompt_cache_breakpoints: bool = field(
+        default=True,
+        metadata={
+            "description": "Mark the system prompt as a cache breakpoint for providers "
+            "that support explicit prompt caching (Anthropic)."
+        },
+    )
+
+    response_cache: bool = field(
+        default=True,
+        metadata={
+            "description": "Serve nodes wrapped with `response_cache` from the cache. "
+            "Set to False to bypass the cache for a single request."
+        },
+    )
+
+    response_cache_ttl: float = field(
+        default=24 * 3600,
+        metadata={
+            "description": "How long, in seconds, a cached node response is reused."
+        },
+    )
+
+    response_cache_path: str = field(
+        default="",
+        metadata={
+            "description": "Path of a SQLite file where cached node responses are persisted. "
+            "Leave empty to keep them in memory only."
+        },
+    )
+
+    tool_max_concurrency: int = field(
+        default=8,
+        metadata={
+            "description": "The maximum number of tool calls executed at the same time, "
+            "across every tool."
+        },
+    )
+
+    tool_concurrency_limits: dict[str, int] = field(
+        default_factory=lambda: {"check_availability": 4},
+        metadata={
+            "description": "Per-tool limits on concurrent calls, by tool name. "
+            "Tools not listed are only bound by tool_max_concurrency."
+        },
+    )
+
+    tool_timeout: float = field(
+        default=30.0,
+        metadata={
+            "description": "Timeout, in seconds, for a single tool call. A call that times out "
+            "returns an error to the model while the other calls still complete. "
+            "Use 0 to wait indefinitely."
+        },
+    )
+
+    stream_model_output: bool = field(
+        default=True,
+        metadata={
+            "description": "Stream model output token by token. Partial text is sent to the "
+            "graph's 'custom' stream as {'node': ..., 'delta': ...}."
+        },
+    )
+
+    deterministic_routing: bool = field(
+        default=True,
+        metadata={
+            "description": "Let rules answer common appointment requests (availability for "
+            "explicit dates) with a direct tool call instead of a model round-trip."
+        },
+    )
+
+    def model_for(self, route: str) -> str:
+        """Return the model the sub-agent for `route` should use."""
+        return self.route_models.get(route) or self.model
+
     @classmethod
     def from_context(cls) -> Configuration:
         """Create a Configuration instance from a RunnableConfig object."""
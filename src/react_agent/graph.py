@@ -3,21 +3,35 @@
 Works with a chat model with tool calling support.
 """
 
-from datetime import UTC, datetime
-from typing import Dict, List, Literal, cast
+from typing import Any, Dict, List, Literal, Sequence, cast
 
-from langchain_core.messages import AIMessage, ToolMessage, HumanMessage
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, ToolMessage
 from langgraph.graph import StateGraph
-from langgraph.prebuilt import ToolNode
 
 from react_agent.configuration import Configuration
+from react_agent.intent import classify_intent
+from react_agent.prompting import build_prompt
+from react_agent.prompts import APPOINTMENT_PROMPT, FUN_FACTS_PROMPT, POKEMON_PROMPT
+from react_agent.resilience import fallback_model
+from react_agent.response_cache import response_cache
+from react_agent.routing import (
+    QUOTE_TOOLS,
+    match_fast_path,
+    observe_ai_message,
+    observe_user_messages,
+)
 from react_agent.state import InputState, State
+from react_agent.streaming import invoke_model
+from react_agent.tiering import select_model
+from react_agent.tool_execution import limited_tool_node
 from react_agent.tools import TOOLS, POKEMONTOOLS, QUOTETOOLS, EMAILTOOL
-from react_agent.utils import load_chat_model
+from react_agent.tracing import traced_node
+from react_agent.utils import get_chat_model
 
 # Define the function that calls the model
 
 
+@traced_node("call_model")
 async def call_model(state: State) -> Dict[str, List[AIMessage]]:
     """Call the LLM powering our "agent".
 
@@ -32,20 +46,19 @@ async def call_model(state: State) -> Dict[str, List[AIMessage]]:
     """
     configuration = Configuration.from_context()
 
-    # Initialize the model with tool binding. Change the model or add more tools here.
-    model = load_chat_model("fireworks/accounts/fireworks/models/llama-v3p1-405b-instruct").bind_tools(TOOLS) # configuration.model
+    # Get the tool-bound model from the shared registry. Change the model or add more tools here.
+    model_name = select_model("call_model", state.messages, configuration)
+    model = get_chat_model(model_name, tools=TOOLS)
 
     # Format the system prompt. Customize this to change the agent's behavior.
-    system_message = configuration.system_prompt.format(
-        system_time=datetime.now(tz=UTC).isoformat()
+    prompt = build_prompt(
+        configuration.system_prompt, state.messages, configuration, model=model_name
     )
 
     # Get the model's response
-    response = cast(
-        AIMessage,
-        await model.ainvoke(
-            [{"role": "system", "content": system_message}, *state.messages]
-        ),
+    response = await invoke_model(
+        model, prompt, node="call_model", model_name=model_name,
+        fallback=fallback_model(configuration, tools=TOOLS),
     )
 
     # Handle the case when it's the last step and the model still wants to use a tool
@@ -62,18 +75,17 @@ async def call_model(state: State) -> Dict[str, List[AIMessage]]:
     # Return the model's response as a list to be added to existing messages
     return {"messages": [response]}
 
+@traced_node("pokemon_expert")
 async def pokemon_expert(state: State) -> Dict[str, List[AIMessage]]:
     configuration = Configuration.from_context()
-    model = load_chat_model("fireworks/accounts/fireworks/models/llama-v3p1-405b-instruct").bind_tools(POKEMONTOOLS)
-    pokemon_prompt = """You are a helpful AI assistant.
-System time: {system_time}
-
-Your job is to provide responses about Pokémon. When you receive a name such as raichu alola or raichu de alola, or any compound names, they should be written with a hyphen, like raichu-alola.
-Make sure to add a hyphen to compound names."""
-    system_message = pokemon_prompt.format(system_time=datetime.now(tz=UTC).isoformat()) #configuration.system_prompt.format(system_time=datetime.now(tz=UTC).isoformat())
+    model_name = select_model("pokemon_expert", state.messages, configuration)
+    model = get_chat_model(model_name, tools=POKEMONTOOLS)
+    prompt = build_prompt(POKEMON_PROMPT, state.messages, configuration, model=model_name)
 
-    
-    response = cast(AIMessage, await model.ainvoke([{"role": "system", "content": system_message}, *state.messages]))
+    response = await invoke_model(
+        model, prompt, node="pokemon_expert", model_name=model_name,
+        fallback=fallback_model(configuration, tools=POKEMONTOOLS),
+    )
     
     if state.is_last_step and response.tool_calls:
         return {"messages": [AIMessage(id=response.id, content="Sorry, I could not find an answer to your question in the specified number of steps.")]}
@@ -86,7 +98,7 @@ builder = StateGraph(State, input=InputState, config_schema=Configuration)
 
 # Define the two nodes we will cycle between
 builder.add_node(call_model)
-builder.add_node("tools", ToolNode(TOOLS))
+builder.add_node("tools", limited_tool_node(TOOLS))
 
 # Set the entrypoint as `call_model`
 # This means that this node is the first one called
@@ -152,16 +164,57 @@ builder.add_edge("tools", "call_model")
 # Compile the builder into an executable graph
 graph = builder.compile(name="ReAct Agent")
 
-async def fun_facts_pokemon(state: State) -> Dict[str, List[AIMessage]]:
-    configuration = Configuration.from_context()
-    model = load_chat_model("fireworks/accounts/fireworks/models/llama-v3p1-405b-instruct")
+_POKEMON_TOOL_NAMES = {tool.__name__ for tool in POKEMONTOOLS}
+
+
+def fun_facts_key(messages: Sequence[AnyMessage]) -> List[AnyMessage]:
+    """Key fun facts on the Pokémon the conversation is about, plus the question.
 
-    prompt = """You are a Pokémon expert who tells curious facts and interesting facts.
-From the above message, generate 2 or 3 interesting and relevant fun facts about the Pokémon 
-about the Pokémon mentioned."""
+    A follow-up such as "¿y su evolución?" reads the same in every thread, so
+    the key also carries what names the Pokémon: the Pokémon tool result of
+    the current turn or, when the expert answered without tools, its answer.
+    Only messages after the latest question count, so a follow-up about
+    another Pokémon is never keyed on an older tool result.
+    """
+    turn = next(
+        (i for i in range(len(messages) - 1, -1, -1) if isinstance(messages[i], HumanMessage)),
+        None,
+    )
+    question = messages[turn] if turn is not None else None
+    current = messages[turn + 1:] if turn is not None else messages
+    earlier = messages[:turn] if turn is not None else []
+
+    def is_tool_result(m: AnyMessage) -> bool:
+        return isinstance(m, ToolMessage) and m.name in _POKEMON_TOOL_NAMES
+
+    def is_answer(m: AnyMessage) -> bool:
+        return isinstance(m, AIMessage) and bool(m.content)
+
+    subject = (
+        next((m for m in reversed(current) if is_tool_result(m)), None)
+        or next((m for m in reversed(current) if is_answer(m)), None)
+        or next((m for m in reversed(earlier) if is_tool_result(m) or is_answer(m)), None)
+    )
+    return [m for m in (subject, question) if m is not None]
 
-    system_message = prompt + f"\nHora del sistema: {datetime.now(tz=UTC).isoformat()}"
-    response = await model.ainvoke([{"role": "system", "content": system_message}, *state.messages])
+
+# Fun facts only depend on which Pokémon the user asked about.
+@traced_node("fun_facts")
+@response_cache(
+    model=lambda state, c: select_model("fun_facts", state.messages, c),
+    prompt=FUN_FACTS_PROMPT,
+    key_messages=fun_facts_key,
+)
+async def fun_facts_pokemon(state: State, model_name: str) -> Dict[str, List[AIMessage]]:
+    # `model_name` comes from `response_cache`, which already ran `select_model`
+    configuration = Configuration.from_context()
+    model = get_chat_model(model_name)
+    prompt = build_prompt(FUN_FACTS_PROMPT, state.messages, configuration, model=model_name)
+
+    response = await invoke_model(
+        model, prompt, node="fun_facts", model_name=model_name,
+        fallback=fallback_model(configuration),
+    )
     return {"messages": [response]}
 
 def route_output_pokemon(state: State) -> Literal["pokemon_tools", "fun_facts", "__end__"]:
@@ -181,7 +234,7 @@ builder_pokemon = StateGraph(State, input=InputState, config_schema=Configuratio
 
 # Añadimos los nodos necesarios
 builder_pokemon.add_node("pokemon_expert", pokemon_expert)
-builder_pokemon.add_node("pokemon_tools", ToolNode(POKEMONTOOLS))
+builder_pokemon.add_node("pokemon_tools", limited_tool_node(POKEMONTOOLS))
 builder_pokemon.add_node("fun_facts", fun_facts_pokemon)
 
 # Añadimos los edges para definir el flujo
@@ -192,90 +245,85 @@ builder_pokemon.add_edge("fun_facts", "__end__")  # Finalizamos después de most
 
 graph_pokemon = builder_pokemon.compile(name="PokemonExpert")
 
-async def appointment_manager(state: State) -> Dict[str, List[AIMessage]]:
+@traced_node("appointment_manager")
+async def appointment_manager(state: State) -> Dict[str, Any]:
     configuration = Configuration.from_context()
     
     # Vinculamos el modelo a las herramientas
-    model = load_chat_model("fireworks/accounts/fireworks/models/llama-v3p1-405b-instruct").bind_tools(QUOTETOOLS)
-
-    prompt = """You are an appointment manager. You can help with the following tasks:
-- Checking available time slots for appointments.
-- Creating new appointments.
-- Rescheduling appointments.
-- Canceling existing appointments.
-
-If the user wants to schedule or reschedule a quote or appointment, you must use the corresponding tool call: schedule_quote or reschedule_quote. Do not respond directly; always use the tool when appropriate.
-
-IMPORTANT: When using `schedule_quote`, you MUST ask for the user's Gmail address and full name if they are not provided in the conversation. DO NOT make up or assume any values. Only proceed once you have confirmed them.
-
-Please ensure that the date format for all appointments is as follows: YYYY-MM-DDTHH:mm:ss.
-
-You should also answer questions about appointment availability and scheduling.
-
-Do not invent data. If you do not have the necessary information, ask the user for it.
-
-When checking the available time, it returns the list of appointments so that the user knows exactly which appointments are available.
-
-The current system time is: {system_time}"""
-
-    system_message = prompt.format(system_time=datetime.now(tz=UTC).strftime("%Y-%m-%dT%H:%M:%S"))
+    model_name = select_model("appointment_manager", state.messages, configuration)
+    model = get_chat_model(model_name, tools=QUOTETOOLS)
+    prompt = build_prompt(APPOINTMENT_PROMPT, state.messages, configuration, model=model_name)
     
     # El modelo responderá y puede hacer tool_calls
-    response = await model.ainvoke([{"role": "system", "content": system_message}, *state.messages])
+    response = await invoke_model(
+        model, prompt, node="appointment_manager", model_name=model_name,
+        fallback=fallback_model(configuration, tools=QUOTETOOLS),
+    )
     
     # Si estamos en el último paso y aún quiere usar herramientas, termina
     if state.is_last_step and response.tool_calls:
         return {"messages": [AIMessage(id=response.id, content="Sorry, I could not find an answer to your question in the specified number of steps.")]}
 
-    return {"messages": [response]}
+    return {"messages": [response], "slots": observe_ai_message(response)}
 
-def route_appointment_output(state: State) -> Literal["quotetools", "email_sender", "__end__"]:
+@traced_node("appointment_fast_path")
+async def appointment_fast_path(state: State) -> Dict[str, Any]:
+    """Answer the turn with a rule from `react_agent.routing` when one applies.
+
+    Also reads the new user messages into `State.slots`, so later nodes do not
+    have to scan the history again.
+    """
+    configuration = Configuration.from_context()
+    if not configuration.deterministic_routing:
+        return {"slots": observe_user_messages(state.messages, state.slots)}
+    slots, message = match_fast_path(state)
+    if message is None:
+        return {"slots": slots}
+    return {"slots": slots, "messages": [message]}
+
+def route_fast_path(state: State) -> Literal["quotetools", "appointment_manager"]:
+    """Run the tools a fast-path rule asked for, or fall back to the model."""
+    last_message = state.messages[-1]
+    # Una regla generó las tool calls: vamos directo a las herramientas
+    if isinstance(last_message, AIMessage) and last_message.tool_calls:
+        return "quotetools"
+    return "appointment_manager"
+
+def route_appointment_output(state: State) -> Literal["quotetools", "emailtool", "email_sender", "__end__"]:
     last_message = state.messages[-1]
     if not isinstance(last_message, AIMessage):
         raise ValueError(f"Expected AIMessage, but got {type(last_message).__name__}")
-    
-    tool_calls = last_message.tool_calls or []
-
-    if tool_calls:
-        # Verifica si las tool_calls son para QUOTETOOLS o EMAILTOOL
-        for call in tool_calls:
-            name = call["name"] if isinstance(call, dict) else getattr(call, "name", None)
-            if name in {"schedule_quote", "reschedule_quote"}:
-                return "quotetools"
-            elif name == "send_email":
-                return "emailtool"
-        return "quotetools"  # default si no reconocemos las herramientas
-    
-    # Verifica si justo antes hubo una ToolMessage de QUOTETOOLS
-    if len(state.messages) >= 2:
-        prev_tool_result = state.messages[-2]
-        if isinstance(prev_tool_result, ToolMessage):
-            # Busca el AIMessage correspondiente antes de eso
-            for msg in reversed(state.messages[:-2]):
-                if isinstance(msg, AIMessage):
-                    for call in msg.tool_calls or []:
-                        name = call["name"] if isinstance(call, dict) else getattr(call, "name", None)
-                        if name in {"schedule_quote", "reschedule_quote"}:
-                            return "email_sender"
-                    break
+
+    if last_message.tool_calls:
+        # Las herramientas pedidas ya están en los slots, no hace falta recorrer las tool calls
+        names = set(state.slots.last_tool_names)
+        if "send_email" in names and not names & QUOTE_TOOLS:
+            return "emailtool"
+        return "quotetools"
+
+    # Una cita agendada o reagendada con éxito queda pendiente de confirmar por correo
+    if state.slots.pending_confirmation:
+        return "email_sender"
 
     return "__end__"
 
 import uuid
 
-async def email_sender(state: State) -> Dict[str, List[AIMessage]]:
-    # Extraer el correo electrónico
-    gmail = None
-    for msg in state.messages:
-        if isinstance(msg, HumanMessage) and "gmail.com" in msg.content:
-            gmail = msg.content.split("gmail.com")[0].split()[-1] + "gmail.com"
-            break
-    
+@traced_node("email_sender")
+async def email_sender(state: State) -> Dict[str, Any]:
+    # El correo sale de la propia cita agendada; si no, del último que escribió el usuario
+    pending = state.slots.pending_confirmation or {}
+    gmail = pending.get("args", {}).get("gmail") or state.slots.email
+
     if not gmail:
-        return {"messages": [AIMessage(content="No se pudo encontrar la dirección de correo electrónico.")]}
+        return {
+            "slots": {"pending_confirmation": None},
+            "messages": [AIMessage(content="No se pudo encontrar la dirección de correo electrónico.")],
+        }
 
     # Forzamos directamente la creación de la tool call
     return {
+        "slots": {"pending_confirmation": None, "last_tool_names": ["send_email"]},
         "messages": [
             AIMessage(
                 content="",
@@ -300,15 +348,43 @@ def route_email_output(state: State) -> Literal["emailtool", "__end__"]:
 builder_appointment = StateGraph(State, input=InputState, config_schema=Configuration)
 
 # Añadimos los nodos
+builder_appointment.add_node("appointment_fast_path", appointment_fast_path)
 builder_appointment.add_node("appointment_manager", appointment_manager)
-builder_appointment.add_node("quotetools", ToolNode(QUOTETOOLS))
+builder_appointment.add_node("quotetools", limited_tool_node(QUOTETOOLS))
 builder_appointment.add_node("email_sender", email_sender)
-builder_appointment.add_node("emailtool", ToolNode(EMAILTOOL))
+builder_appointment.add_node("emailtool", limited_tool_node(EMAILTOOL))
 
-builder_appointment.add_edge("__start__", "appointment_manager")
+builder_appointment.add_edge("__start__", "appointment_fast_path")
+builder_appointment.add_conditional_edges("appointment_fast_path", route_fast_path)
 builder_appointment.add_conditional_edges("appointment_manager", route_appointment_output)
 builder_appointment.add_edge("quotetools", "appointment_manager")
 builder_appointment.add_edge("email_sender", "emailtool")  # Siempre va a emailtool después de email_sender
 builder_appointment.add_edge("emailtool", "__end__")  # Después de enviar el correo, termina
 
-graph_appointment = builder_appointment.compile(name="AppointmentManager")
\ No newline at end of file
+graph_appointment = builder_appointment.compile(name="AppointmentManager")
+
+@traced_node("route_request")
+async def route_request(state: State) -> Dict[str, Any]:
+    """Classify the latest request so it can be dispatched to a sub-agent."""
+    configuration = Configuration.from_context()
+    return {"route": await classify_intent(state, configuration)}
+
+def dispatch_route(state: State) -> Literal["general", "pokemon", "appointment"]:
+    """Send the request to the sub-agent chosen by `route_request`."""
+    return cast(Literal["general", "pokemon", "appointment"], state.route or "general")
+
+# Grafo principal: clasifica la petición y la manda al subagente correspondiente
+builder_router = StateGraph(State, input=InputState, config_schema=Configuration)
+
+builder_router.add_node("route_request", route_request)
+builder_router.add_node("general", graph)
+builder_router.add_node("pokemon", graph_pokemon)
+builder_router.add_node("appointment", graph_appointment)
+
+builder_router.add_edge("__start__", "route_request")
+builder_router.add_conditional_edges("route_request", dispatch_route)
+builder_router.add_edge("general", "__end__")
+builder_router.add_edge("pokemon", "__end__")
+builder_router.add_edge("appointment", "__end__")
+
+graph_router = builder_router.compile(name="Router")
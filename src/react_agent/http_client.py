@@ -0,0 +1,109 @@
+"""Shared, pooled aiohttp sessions for the HTTP tools.
+
+Opening an `aiohttp.ClientSession` per tool call means a new connector and a
+new TCP (and TLS) handshake every time. Instead, tools ask for a session from
+a named pool; one session is kept per pool and per event loop so keep-alive
+connections and the DNS cache are reused across calls. The quotes API and the
+public APIs (PokéAPI, pokemondb) use separate pools so a burst against one
+cannot starve the other of connections. Every request is traced as an
+`http:<METHOD> <host>` span and carries a `traceparent` header.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import weakref
+from dataclasses import dataclass
+from typing import Literal
+
+import aiohttp
+
+from react_agent.configuration import Configuration
+from react_agent.tracing import http_trace_config
+
+PoolName = Literal["public", "quotes"]
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Connector and timeout settings used when a pool's session is created."""
+
+    limit: int = 100
+    limit_per_host: int = 10
+    dns_cache_ttl: int = 300
+    timeout: float = 30.0
+    connect_timeout: float = 10.0
+
+    @classmethod
+    def from_configuration(
+        cls, pool: PoolName, configuration: Configuration
+    ) -> PoolSettings:
+        """Read the settings for `pool` from the agent configuration."""
+        if pool == "quotes":
+            limit_per_host = configuration.quotes_http_limit_per_host
+        else:
+            limit_per_host = configuration.public_http_limit_per_host
+        return cls(
+            limit=configuration.http_pool_limit,
+            limit_per_host=limit_per_host,
+            dns_cache_ttl=configuration.http_dns_cache_ttl,
+            timeout=configuration.http_timeout,
+            connect_timeout=configuration.http_connect_timeout,
+        )
+
+    def create_session(self) -> aiohttp.ClientSession:
+        """Create a session with a keep-alive connector built from these settings."""
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=self.timeout, sock_connect=self.connect_timeout
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            trace_configs=[http_trace_config()],
+        )
+
+
+# Sessions are bound to the loop they were created on, so they are stored per
+# loop. Weak keys let sessions of loops that are gone be garbage collected.
+_sessions: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, aiohttp.ClientSession]
+] = weakref.WeakKeyDictionary()
+
+
+def get_http_session(
+    pool: PoolName = "public", settings: PoolSettings | None = None
+) -> aiohttp.ClientSession:
+    """Return the shared session for `pool` on the running event loop.
+
+    The session is created on first use with `settings`, or with the pool
+    settings from the current `Configuration` when none are given. Later calls
+    return the same session until it is closed.
+    """
+    loop = asyncio.get_running_loop()
+    pools = _sessions.setdefault(loop, {})
+    session = pools.get(pool)
+    if session is None or session.closed:
+        if settings is None:
+            settings = PoolSettings.from_configuration(
+                pool, Configuration.from_context()
+            )
+        session = pools[pool] = settings.create_session()
+    return session
+
+
+async def close_http_sessions() -> None:
+    """Close every shared session owned by the running event loop.
+
+    Call this on shutdown so keep-alive connections are released cleanly
+    instead of being reported as unclosed. Under the LangGraph server the
+    lifespan in `react_agent.webapp` does it; other callers must do it
+    themselves.
+    """
+    pools = _sessions.pop(asyncio.get_running_loop(), {})
+    await asyncio.gather(*(s.close() for s in pools.values() if not s.closed))
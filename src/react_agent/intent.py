@@ -0,0 +1,145 @@
+"""Cheap classification of a user request into one of the sub-agents.
+
+The router graph needs to know which sub-agent should answer before any large
+model runs. `classify_keywords` scores the latest user message against English
+and Spanish keyword lists (plus email addresses and explicit dates for
+appointments, and known Pokémon names when an offline Pokédex snapshot is
+configured). It costs microseconds and settles most requests.
+
+When the keywords are inconclusive, `classify_intent` keeps the route the
+thread was already on (a follow-up such as "ana@example.org" belongs to the
+ongoing appointment), then asks `Configuration.router_model` if one is set,
+and otherwise falls back to the general agent.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Literal, cast
+
+from langchain_core.messages import HumanMessage
+
+from react_agent.configuration import Configuration
+from react_agent.pokedex import load_snapshot
+from react_agent.prompting import build_prompt
+from react_agent.prompts import ROUTER_PROMPT
+from react_agent.routing import EMAIL_RE, extract_dates
+from react_agent.state import State
+from react_agent.utils import get_chat_model, get_message_text
+
+Route = Literal["general", "pokemon", "appointment"]
+
+ROUTES: tuple[Route, ...] = ("general", "pokemon", "appointment")
+
+_KEYWORDS: dict[Route, frozenset[str]] = {
+    "pokemon": frozenset(
+        {
+            "pokemon",
+            "pokedex",
+            "pikachu",
+            "evolucion",
+            "evolution",
+            "evoluciona",
+            "evolve",
+            "evolves",
+            "tipo",
+            "type",
+            "movimientos",
+            "moves",
+            "habilidad",
+            "ability",
+            "shiny",
+            "legendario",
+            "legendary",
+        }
+    ),
+    "appointment": frozenset(
+        {
+            "cita",
+            "citas",
+            "agendar",
+            "agenda",
+            "reservar",
+            "reserva",
+            "reprogramar",
+            "cancelar",
+            "disponibilidad",
+            "disponible",
+            "disponibles",
+            "horario",
+            "horarios",
+            "appointment",
+            "appointments",
+            "schedule",
+            "reschedule",
+            "cancel",
+            "book",
+            "booking",
+            "availability",
+            "available",
+            "quote",
+            "quotes",
+        }
+    ),
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+_ACCENTS = str.maketrans("áéíóúüñ", "aeiouun")
+
+
+def classify_keywords(
+    text: str, configuration: Configuration
+) -> tuple[Route | None, int]:
+    """Return the best keyword route for `text` and its score.
+
+    The route is `None` when no keyword matched or two routes tie.
+    """
+    words = _WORD_RE.findall(text.lower().translate(_ACCENTS))
+    scores = {
+        route: sum(word in keywords for word in words)
+        for route, keywords in _KEYWORDS.items()
+    }
+    if EMAIL_RE.search(text) or extract_dates(text):
+        scores["appointment"] += 1
+    if configuration.pokedex_snapshot_path:
+        snapshot = load_snapshot(configuration.pokedex_snapshot_path)
+        scores["pokemon"] += sum(word in snapshot for word in words)
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    (best, score), (_, runner_up) = ranked[0], ranked[1]
+    if score == 0 or score == runner_up:
+        return None, score
+    return best, score
+
+
+async def classify_with_model(text: str, configuration: Configuration) -> Route | None:
+    """Ask `configuration.router_model` which route `text` belongs to."""
+    model_name = configuration.router_model
+    model = get_chat_model(model_name, temperature=0, max_tokens=5)
+    prompt = build_prompt(
+        ROUTER_PROMPT, [HumanMessage(content=text)], configuration, model=model_name
+    )
+    answer = get_message_text(await model.ainvoke(prompt)).strip().lower()
+    for route in ROUTES:
+        if route in answer:
+            return route
+    return None
+
+
+async def classify_intent(state: State, configuration: Configuration) -> Route:
+    """Pick the sub-agent that should answer the latest user message."""
+    last = next(
+        (m for m in reversed(state.messages) if isinstance(m, HumanMessage)), None
+    )
+    if last is None:
+        return "general"
+    text = get_message_text(last)
+
+    route, _ = classify_keywords(text, configuration)
+    if route is not None:
+        return route
+    if state.route in ROUTES and state.route != "general":
+        return cast(Route, state.route)
+    if configuration.router_model:
+        return await classify_with_model(text, configuration) or "general"
+    return "general"
@@ -0,0 +1,209 @@
+"""In-process metrics for model calls.
+
+Nodes record the usage metadata of every model response here so it is easy
+to check, per node, how many input tokens were served from the provider's
+prompt cache, along with the time to first token, tail latency, throughput
+and timeout/retry/hedge counts of each call. Tool nodes record the latency and outcome of every tool call.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Iterable
+
+from langchain_core.messages import BaseMessage
+
+
+@dataclass
+class NodeUsage:
+    """Token usage accumulated over every model call made by one node."""
+
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+
+    @property
+    def cached_input_ratio(self) -> float:
+        """Fraction of input tokens that were read from the prompt cache."""
+        return self.cache_read_tokens / self.input_tokens if self.input_tokens else 0.0
+
+
+@dataclass
+class ToolLatency:
+    """Latency and outcome of every call made to one tool."""
+
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        """Average duration of a call."""
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+@dataclass
+class NodeTiming:
+    """Time to first token and throughput of every model call made by one node."""
+
+    calls: int = 0
+    total_ttft: float = 0.0
+    max_ttft: float = 0.0
+    total_seconds: float = 0.0
+    output_tokens: int = 0
+    timeouts: int = 0
+    retries: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+
+    @property
+    def mean_ttft(self) -> float:
+        """Average time, in seconds, until the first token arrived."""
+        return self.total_ttft / self.calls if self.calls else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Output tokens generated per second of model call."""
+        return self.output_tokens / self.total_seconds if self.total_seconds else 0.0
+
+
+_lock = threading.Lock()
+_usage: dict[str, NodeUsage] = {}
+_tools: dict[str, ToolLatency] = {}
+_timings: dict[str, NodeTiming] = {}
+# Recent samples per node for tail-latency percentiles.
+_SAMPLES = 1000
+_ttft_samples: dict[str, deque[float]] = {}
+_duration_samples: dict[str, deque[float]] = {}
+
+
+def percentile(samples: Iterable[float], q: float) -> float:
+    """Return the `q`-th percentile (0-100) of `samples`, nearest-rank method."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def record_usage(node: str, message: BaseMessage) -> None:
+    """Add the usage metadata of a model response to `node`'s totals."""
+    usage: dict[str, Any] = getattr(message, "usage_metadata", None) or {}
+    details: dict[str, Any] = usage.get("input_token_details") or {}
+    with _lock:
+        totals = _usage.setdefault(node, NodeUsage())
+        totals.calls += 1
+        totals.input_tokens += usage.get("input_tokens", 0)
+        totals.output_tokens += usage.get("output_tokens", 0)
+        totals.cache_read_tokens += details.get("cache_read", 0) or 0
+        totals.cache_creation_tokens += details.get("cache_creation", 0) or 0
+
+
+def usage_stats() -> dict[str, dict[str, Any]]:
+    """Return the accumulated token usage per node, with cached vs. uncached input."""
+    with _lock:
+        return {
+            node: {
+                **asdict(u),
+                "uncached_input_tokens": u.input_tokens - u.cache_read_tokens,
+                "cached_input_ratio": u.cached_input_ratio,
+            }
+            for node, u in _usage.items()
+        }
+
+
+def record_timing(node: str, ttft: float, seconds: float, output_tokens: int) -> None:
+    """Add one model call of `node` to its timing totals.
+
+    `ttft` is the time to the first token (the full duration when the call did
+    not stream) and `seconds` the duration of the whole call.
+    """
+    with _lock:
+        totals = _timings.setdefault(node, NodeTiming())
+        totals.calls += 1
+        totals.total_ttft += ttft
+        totals.max_ttft = max(totals.max_ttft, ttft)
+        totals.total_seconds += seconds
+        totals.output_tokens += output_tokens
+        _ttft_samples.setdefault(node, deque(maxlen=_SAMPLES)).append(ttft)
+        _duration_samples.setdefault(node, deque(maxlen=_SAMPLES)).append(seconds)
+
+
+def record_policy_event(node: str, event: str) -> None:
+    """Count a timeout, retry, hedge or hedge win of a model call of `node`.
+
+    `event` is the name of the `NodeTiming` counter: "timeouts", "retries",
+    "hedges" or "hedge_wins".
+    """
+    with _lock:
+        totals = _timings.setdefault(node, NodeTiming())
+        setattr(totals, event, getattr(totals, event) + 1)
+
+
+def ttft_percentile(node: str, q: float, min_samples: int = 1) -> float | None:
+    """Return the `q`-th percentile of `node`'s time to first token.
+
+    Returns `None` until at least `min_samples` calls were recorded.
+    """
+    with _lock:
+        samples = list(_ttft_samples.get(node, ()))
+    if len(samples) < min_samples:
+        return None
+    return percentile(samples, q)
+
+
+def timing_stats() -> dict[str, dict[str, Any]]:
+    """Return time to first token, tail latency and tokens per second per node."""
+    with _lock:
+        return {
+            node: {
+                **asdict(t),
+                "mean_ttft": t.mean_ttft,
+                "tokens_per_second": t.tokens_per_second,
+                "ttft_p95": percentile(_ttft_samples.get(node, ()), 95),
+                "p50": percentile(_duration_samples.get(node, ()), 50),
+                "p95": percentile(_duration_samples.get(node, ()), 95),
+                "p99": percentile(_duration_samples.get(node, ()), 99),
+            }
+            for node, t in _timings.items()
+        }
+
+
+def record_tool_call(tool: str, seconds: float, status: str = "success") -> None:
+    """Add one call to `tool` that took `seconds` and ended with `status`.
+
+    `status` is "success", "error" or "timeout".
+    """
+    with _lock:
+        totals = _tools.setdefault(tool, ToolLatency())
+        totals.calls += 1
+        totals.errors += status == "error"
+        totals.timeouts += status == "timeout"
+        totals.total_seconds += seconds
+        totals.max_seconds = max(totals.max_seconds, seconds)
+
+
+def tool_stats() -> dict[str, dict[str, Any]]:
+    """Return call counts, failures and latency per tool."""
+    with _lock:
+        return {
+            tool: {**asdict(t), "mean_seconds": t.mean_seconds}
+            for tool, t in _tools.items()
+        }
+
+
+def reset_metrics() -> None:
+    """Forget every recorded metric."""
+    with _lock:
+        _usage.clear()
+        _tools.clear()
+        _timings.clear()
+        _ttft_samples.clear()
+        _duration_samples.clear()
@@ -0,0 +1,167 @@
+"""Cached access to PokéAPI.
+
+Pokémon documents are essentially static, so lookups go through two cache
+tiers before touching the network:
+
+1. an in-memory LRU of parsed `PokemonSchema` objects (and of known misses);
+2. an optional on-disk store of the raw PokéAPI responses, keyed by the
+   normalized name, which survives restarts and is shared between workers.
+
+Concurrent lookups of the same name are collapsed into a single request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import asdict
+from typing import Any, cast
+
+import aiohttp
+
+from react_agent.cache import CacheStats, DiskCache, SingleFlight, TTLCache
+from react_agent.configuration import Configuration
+from react_agent.http_client import get_http_session
+from react_agent.pokemon_shcema import PokemonSchema
+
+POKEAPI_URL = "https://pokeapi.co/api/v2"
+
+# Disk cache key of the full name listing; never a valid Pokémon name.
+_NAMES_KEY = "_names"
+
+_memory: TTLCache[str, PokemonSchema | None] = TTLCache(maxsize=512)
+_disk: dict[str, DiskCache] = {}
+_singleflight: SingleFlight[tuple[int, PokemonSchema | None]] = SingleFlight()
+_downloads = 0
+_names: list[str] = []
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a user supplied name into the PokéAPI resource name."""
+    return "-".join(name.strip().lower().split())
+
+
+def _disk_cache(configuration: Configuration) -> DiskCache | None:
+    directory = configuration.pokeapi_cache_dir
+    if not directory:
+        return None
+    if directory not in _disk:
+        _disk[directory] = DiskCache(
+            directory, max_entries=configuration.pokeapi_cache_max_entries
+        )
+    return _disk[directory]
+
+
+def _parse(data: dict[str, Any]) -> PokemonSchema:
+    return PokemonSchema.from_api_json(data)
+
+
+def _base_url(configuration: Configuration) -> str:
+    return configuration.pokeapi_url.rstrip("/") or POKEAPI_URL
+
+
+async def _download(
+    name: str, disk: DiskCache | None, base_url: str
+) -> tuple[int, PokemonSchema | None]:
+    global _downloads
+    _downloads += 1
+    session = get_http_session("public")
+    async with session.get(f"{base_url}/pokemon/{name}") as response:
+        if response.status != 200:
+            return response.status, None
+        data = await response.json()
+    pokemon = _parse(data)
+    if disk is not None:
+        await asyncio.to_thread(disk.set, name, data)
+    return 200, pokemon
+
+
+async def fetch_pokemon(name: str) -> PokemonSchema | None:
+    """Return the flattened Pokémon named `name`, or `None` if it does not exist.
+
+    Successful lookups are cached in memory and, when `pokeapi_cache_dir` is
+    set, on disk. 404s are remembered in memory for the (shorter) negative
+    TTL; any other status is reported as a miss without being cached.
+    """
+    configuration = Configuration.from_context()
+    key = normalize_name(name)
+
+    cached = _memory.get(key, default=...)
+    if cached is not ...:
+        return cast(PokemonSchema | None, cached)
+
+    disk = _disk_cache(configuration)
+    if disk is not None:
+        data = await asyncio.to_thread(disk.get, key, configuration.pokeapi_cache_ttl)
+        if data is not None:
+            parsed = _parse(data)
+            _memory.set(key, parsed, ttl=configuration.pokeapi_cache_ttl)
+            return parsed
+
+    status, pokemon = await _singleflight.do(
+        key, lambda: _download(key, disk, _base_url(configuration))
+    )
+    if pokemon is not None:
+        _memory.set(key, pokemon, ttl=configuration.pokeapi_cache_ttl)
+    elif status == 404:
+        _memory.set(key, None, ttl=configuration.pokeapi_negative_cache_ttl)
+    return pokemon
+
+
+async def fetch_pokemon_names() -> list[str]:
+    """Return every Pokémon and form name known to PokéAPI.
+
+    The listing is fetched once per process and persisted in the disk cache
+    alongside the Pokémon documents. Returns an empty list if PokéAPI cannot
+    be reached.
+    """
+    global _names
+    if _names:
+        return _names
+    configuration = Configuration.from_context()
+    disk = _disk_cache(configuration)
+    if disk is not None:
+        cached = await asyncio.to_thread(
+            disk.get, _NAMES_KEY, configuration.pokeapi_cache_ttl
+        )
+        if cached:
+            _names = cached
+            return _names
+
+    session = get_http_session("public")
+    try:
+        async with session.get(
+            f"{_base_url(configuration)}/pokemon", params={"limit": 100000}
+        ) as response:
+            if response.status != 200:
+                return []
+            listing = await response.json()
+    except aiohttp.ClientError:
+        return []
+    _names = [r["name"] for r in listing["results"]]
+    if disk is not None:
+        await asyncio.to_thread(disk.set, _NAMES_KEY, _names)
+    return _names
+
+
+def cache_stats() -> dict[str, Any]:
+    """Return hit/miss counters for each cache tier and the number of downloads."""
+    disk = CacheStats()
+    for d in _disk.values():
+        disk.hits += d.stats.hits
+        disk.misses += d.stats.misses
+        disk.evictions += d.stats.evictions
+    return {
+        "memory": {**asdict(_memory.stats), "hit_rate": _memory.stats.hit_rate},
+        "disk": {**asdict(disk), "hit_rate": disk.hit_rate},
+        "downloads": _downloads,
+        "deduplicated": _singleflight.shared,
+    }
+
+
+def clear_cache() -> None:
+    """Forget every in-memory entry (the disk store is left untouched)."""
+    global _downloads, _names
+    _memory.clear()
+    _names = []
+    _downloads = 0
+    _singleflight.shared = 0
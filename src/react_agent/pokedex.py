@@ -0,0 +1,183 @@
+"""Offline Pokédex snapshot.
+
+Builds a compact SQLite file holding every Pokémon (including alternate forms)
+flattened to the `PokemonSchema` shape, and serves lookups from it so the
+Pokémon tools never need the network. The file is opened read-only and
+memory-mapped; the name -> species index is loaded into a dict at open time so
+existence checks are O(1) and data reads are a single primary-key lookup.
+
+Build a snapshot with:
+
+    react-agent-pokedex build pokedex.sqlite
+
+and point `pokedex_snapshot_path` in the configuration at the file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable
+
+from react_agent.http_client import PoolSettings, close_http_sessions, get_http_session
+from react_agent.pokeapi import POKEAPI_URL
+from react_agent.pokemon_shcema import PokemonSchema
+
+_SCHEMA = """
+CREATE TABLE pokemon (
+    name TEXT PRIMARY KEY,
+    species TEXT NOT NULL,
+    data TEXT NOT NULL
+) WITHOUT ROWID
+"""
+
+_MMAP_SIZE = 256 * 1024 * 1024
+
+
+def write_snapshot(
+    path: str | os.PathLike[str], entries: Iterable[tuple[PokemonSchema, str]]
+) -> int:
+    """Write `(pokemon, species name)` pairs to a fresh snapshot at `path`.
+
+    The file is written next to `path` and moved into place once complete, so
+    readers never observe a half-built snapshot. Returns the number of rows.
+    """
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.execute(_SCHEMA)
+        rows = [
+            (p.name, species, p.model_dump_json(exclude={"name"}))
+            for p, species in entries
+        ]
+        conn.executemany("INSERT OR REPLACE INTO pokemon VALUES (?, ?, ?)", rows)
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+    return len(rows)
+
+
+class PokedexSnapshot:
+    """Read-only view over a snapshot file built by `write_snapshot`."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """Open the snapshot at `path` and load its name index."""
+        self.path = Path(path)
+        self._conn = sqlite3.connect(
+            f"{self.path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+        )
+        self._conn.execute(f"PRAGMA mmap_size={_MMAP_SIZE}")
+        self._lock = threading.Lock()
+        self._species: dict[str, str] = dict(
+            self._conn.execute("SELECT name, species FROM pokemon")
+        )
+
+    def __contains__(self, name: object) -> bool:
+        """Return whether a Pokémon (or form) called `name` is in the snapshot."""
+        return name in self._species
+
+    def __len__(self) -> int:
+        """Return the number of Pokémon and forms in the snapshot."""
+        return len(self._species)
+
+    def names(self) -> list[str]:
+        """Return every Pokémon and form name in the snapshot."""
+        return list(self._species)
+
+    def species(self, name: str) -> str | None:
+        """Return the species name for the Pokémon or form `name`."""
+        return self._species.get(name)
+
+    def get(self, name: str) -> PokemonSchema | None:
+        """Return the flattened Pokémon called `name`, or `None` if unknown."""
+        if name not in self._species:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM pokemon WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            return None
+        return PokemonSchema.model_validate({"name": name, **json.loads(row[0])})
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+
+@lru_cache(maxsize=4)
+def load_snapshot(path: str) -> PokedexSnapshot:
+    """Return a process-wide, shared snapshot reader for `path`."""
+    return PokedexSnapshot(os.path.expanduser(path))
+
+
+async def _fetch_all(
+    base_url: str, concurrency: int, limit: int | None
+) -> list[tuple[PokemonSchema, str]]:
+    session = get_http_session(
+        "public", PoolSettings(limit=concurrency, limit_per_host=concurrency)
+    )
+    async with session.get(
+        f"{base_url}/pokemon", params={"limit": limit or 100000}
+    ) as response:
+        response.raise_for_status()
+        listing = await response.json()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(url: str) -> tuple[PokemonSchema, str]:
+        async with semaphore:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                data: dict[str, Any] = await response.json()
+        pokemon = PokemonSchema.from_api_json(data)
+        return pokemon, data["species"]["name"]
+
+    return await asyncio.gather(*(fetch(r["url"]) for r in listing["results"]))
+
+
+async def build_snapshot(
+    path: str | os.PathLike[str],
+    *,
+    base_url: str | None = None,
+    concurrency: int = 16,
+    limit: int | None = None,
+) -> int:
+    """Download every Pokémon from PokéAPI and write them to a snapshot at `path`."""
+    try:
+        entries = await _fetch_all(base_url or POKEAPI_URL, concurrency, limit)
+    finally:
+        await close_http_sessions()
+    return write_snapshot(path, entries)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command line entry point: `react-agent-pokedex build PATH`."""
+    parser = argparse.ArgumentParser(prog="react-agent-pokedex")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="download PokéAPI into a snapshot")
+    build.add_argument("path", help="where to write the SQLite snapshot")
+    build.add_argument("--concurrency", type=int, default=16)
+    build.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    count = asyncio.run(
+        build_snapshot(args.path, concurrency=args.concurrency, limit=args.limit)
+    )
+    parser.exit(message=f"Wrote {count} Pokémon to {args.path}\n")
+
+
+if __name__ == "__main__":
+    main()
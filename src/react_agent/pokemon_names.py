@@ -0,0 +1,224 @@
+"""Local resolution of user-typed Pokémon names.
+
+Users (and the model) write names like "Raichu de Alola", "alolan raichu",
+"mr mime" or "pikachu" misspelled as "pikachuu", while PokéAPI only knows
+`raichu-alola`, `mr-mime` and `pikachu`. A wrong guess costs a 404 plus another
+model step, so names are resolved locally first:
+
+1. the query is normalized (accents, case, separators), regional and form
+   qualifiers in English or Spanish are moved after the base name, and the
+   result is looked up in the set of known names;
+2. otherwise the closest known names by edit distance are found with a
+   BK-tree, which only visits a small part of the index per query.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from react_agent.configuration import Configuration
+from react_agent.pokeapi import fetch_pokemon_names
+from react_agent.pokedex import load_snapshot
+
+# Qualifiers that PokéAPI appends after the species name, keyed by the ways
+# users write them in English and Spanish.
+_QUALIFIERS = {
+    "alola": "alola",
+    "alolan": "alola",
+    "galar": "galar",
+    "galarian": "galar",
+    "hisui": "hisui",
+    "hisuian": "hisui",
+    "paldea": "paldea",
+    "paldean": "paldea",
+    "mega": "mega",
+    "gmax": "gmax",
+    "gigamax": "gmax",
+    "gigantamax": "gmax",
+    "primal": "primal",
+    "primigenio": "primal",
+    "primigenia": "primal",
+}
+
+# Words that only glue the qualifier to the name ("raichu de alola",
+# "forma de galar") and never appear in PokéAPI names.
+_FILLER = {"de", "del", "la", "el", "form", "forma", "region", "regional", "of"}
+
+_ALIASES = {
+    "nidoran hembra": "nidoran-f",
+    "nidoran macho": "nidoran-m",
+    "nidoran female": "nidoran-f",
+    "nidoran male": "nidoran-m",
+    "nidoran♀": "nidoran-f",
+    "nidoran♂": "nidoran-m",
+    "farfetch d": "farfetchd",
+    "mr. mime": "mr-mime",
+    "mime jr.": "mime-jr",
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def _fold(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.strip().lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def normalize_query(text: str) -> str:
+    """Turn a free-form name into the hyphenated form PokéAPI uses.
+
+    >>> normalize_query("Raichu de Alola")
+    'raichu-alola'
+    >>> normalize_query("Mega Charizard X")
+    'charizard-mega-x'
+    """
+    folded = text.strip().lower()
+    if folded in _ALIASES:
+        return _ALIASES[folded]
+    folded = _fold(folded)
+    if folded in _ALIASES:
+        return _ALIASES[folded]
+
+    tokens = [t for t in _NON_ALNUM.split(folded) if t and t not in _FILLER]
+    base = [t for t in tokens if t not in _QUALIFIERS]
+    qualifiers = [_QUALIFIERS[t] for t in tokens if t in _QUALIFIERS]
+    if not base:
+        return "-".join(qualifiers)
+    # Qualifiers follow the species name ("mr-mime-galar"), except that a
+    # one-letter variant goes last: "mega charizard x" -> "charizard-mega-x".
+    variant = [base.pop()] if len(base) > 1 and len(base[-1]) == 1 else []
+    return "-".join([*base, *qualifiers, *variant])
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Return the edit distance between `a` and `b`."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            )
+        previous = current
+    return previous[-1]
+
+
+@dataclass
+class _BKNode:
+    word: str
+    children: dict[int, _BKNode] = field(default_factory=dict)
+
+
+class BKTree:
+    """Burkhard-Keller tree over edit distance for fast near-match queries."""
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        """Build a tree containing `words`."""
+        self._root: _BKNode | None = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        """Insert `word` into the tree."""
+        if self._root is None:
+            self._root = _BKNode(word)
+            return
+        node = self._root
+        while True:
+            distance = levenshtein(word, node.word)
+            if distance == 0:
+                return
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _BKNode(word)
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int) -> list[tuple[int, str]]:
+        """Return `(distance, word)` pairs within `max_distance`, closest first."""
+        if self._root is None:
+            return []
+        found: list[tuple[int, str]] = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = levenshtein(word, node.word)
+            if distance <= max_distance:
+                found.append((distance, node.word))
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(c for d, c in node.children.items() if low <= d <= high)
+        return sorted(found)
+
+
+@dataclass(frozen=True)
+class Resolution:
+    """Outcome of resolving a user-typed name against the index."""
+
+    query: str
+    candidates: list[str]
+    exact: bool = False
+
+    @property
+    def name(self) -> str | None:
+        """The name to use, when the query resolves to a single Pokémon."""
+        if self.exact or len(self.candidates) == 1:
+            return self.candidates[0]
+        return None
+
+
+class NameIndex:
+    """Exact and fuzzy lookup over every known Pokémon and form name."""
+
+    def __init__(self, names: Iterable[str]) -> None:
+        """Index `names` (PokéAPI resource names such as `raichu-alola`)."""
+        self.names = frozenset(names)
+        self._tree = BKTree(sorted(self.names))
+
+    def resolve(self, query: str, limit: int = 5) -> Resolution:
+        """Resolve `query` to a known name, or to a ranked list of candidates."""
+        normalized = normalize_query(query)
+        if normalized in self.names:
+            return Resolution(query, [normalized], exact=True)
+
+        # Allow roughly one typo per four characters, at least one.
+        max_distance = max(1, len(normalized) // 4)
+        matches = self._tree.search(normalized, max_distance)
+        if matches:
+            best = matches[0][0]
+            # A unique closest match is unambiguous; ties are left to the user.
+            closest = [w for d, w in matches if d == best]
+            if len(closest) == 1:
+                return Resolution(query, closest)
+            return Resolution(query, [w for _, w in matches[:limit]])
+
+        # Fall back to names sharing the species prefix ("raichu-foo" -> forms).
+        head = normalized.split("-", 1)[0]
+        prefixed = sorted(n for n in self.names if n.split("-", 1)[0] == head)
+        return Resolution(query, prefixed[:limit])
+
+
+# One index per name source: a snapshot path, or "" for the PokéAPI listing.
+_indexes: dict[str, NameIndex] = {}
+
+
+async def get_name_index() -> NameIndex | None:
+    """Return the process-wide name index, building it on first use.
+
+    Names come from the offline Pokédex snapshot when one is configured, and
+    otherwise from the (cached) PokéAPI listing. Returns `None` if neither is
+    available so callers can fall back to asking the API directly.
+    """
+    path = Configuration.from_context().pokedex_snapshot_path
+    index = _indexes.get(path)
+    if index is None:
+        names = load_snapshot(path).names() if path else await fetch_pokemon_names()
+        if not names:
+            return None
+        index = _indexes[path] = await asyncio.to_thread(NameIndex, names)
+    return index
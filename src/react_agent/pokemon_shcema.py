@@ -1,5 +1,5 @@
-from typing import List, Dict
-from pydantic import BaseModel
+from typing import Any, List, Dict
+from pydantic import BaseModel, field_validator
 
 class NameDict(BaseModel):
     name: str
@@ -65,3 +65,70 @@ class PokemonSchema(BaseModel):
             types=flattened_types,
             moves=flattened_moves,
         )
+
+    @classmethod
+    def from_api_json(cls, data: Dict[str, Any]) -> "PokemonSchema":
+        """Flatten a raw PokéAPI document without building the nested API models.
+
+        Equivalent to `from_api(PokemonSchemaAPI(**data))` but only the flattened
+        result is validated, which skips one pydantic model per move, stat,
+        ability and type.
+
+        The projection is deliberately not applied here: the parsed Pokémon is
+        cached per name (in memory and in the Pokédex snapshot) and shared by
+        requests with different `PokemonProjection`s, so it must stay complete.
+        Each document is parsed once per cache lifetime; `project` then trims
+        it per request.
+        """
+        return cls.model_validate(
+            {
+                "id": data["id"],
+                "is_default": data["is_default"],
+                "name": data["name"],
+                "abilities": [
+                    {"name": ab["ability"]["name"], "is_hidden": ab["is_hidden"]}
+                    for ab in data["abilities"]
+                ],
+                "height": data["height"],
+                "weight": data["weight"],
+                "stats": [{s["stat"]["name"]: s["base_stat"]} for s in data["stats"]],
+                "types": [t["type"]["name"] for t in data["types"]],
+                "moves": [m["move"]["name"] for m in data["moves"]],
+            }
+        )
+
+    def project(self, projection: "PokemonProjection") -> Dict[str, Any]:
+        """Return the compact payload sent back to the model for this Pokémon."""
+        payload: Dict[str, Any] = {}
+        for name in projection.fields or type(self).model_fields:
+            if name == "stats" and projection.stats_as_dict:
+                payload["stats"] = {k: v for s in self.stats for k, v in s.items()}
+            elif name == "moves" and projection.max_moves is not None:
+                payload["moves"] = self.moves[: projection.max_moves]
+                if len(self.moves) > projection.max_moves:
+                    payload["move_count"] = len(self.moves)
+            elif name == "abilities":
+                payload["abilities"] = [ab.model_dump() for ab in self.abilities]
+            else:
+                payload[name] = getattr(self, name)
+        return payload
+
+class PokemonProjection(BaseModel):
+    """Which parts of a `PokemonSchema` are returned to the model."""
+    fields: List[str] | None = None
+    """Fields to keep, in order. `None` keeps every field."""
+    max_moves: int | None = 10
+    """Keep only the first N moves (plus the total count). `None` keeps all."""
+    stats_as_dict: bool = True
+    """Return stats as a single `{stat: base_stat}` dict instead of a list."""
+
+    @field_validator("fields")
+    @classmethod
+    def _known_fields(cls, fields: List[str] | None) -> List[str] | None:
+        unknown = [name for name in fields or [] if name not in PokemonSchema.model_fields]
+        if unknown:
+            raise ValueError(
+                f"Unknown Pokémon field(s) {unknown}; "
+                f"expected any of {list(PokemonSchema.model_fields)}"
+            )
+        return fields
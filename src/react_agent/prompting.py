@@ -0,0 +1,84 @@
+"""Assemble the messages sent to the model so the prompt prefix stays cacheable.
+
+Providers cache the longest prefix of a request they have seen recently
+(tool definitions, then the system prompt, then the history). Formatting the
+current time at microsecond precision into the system prompt made that prefix
+different on every call. Here the time is rounded to
+`Configuration.system_time_granularity` and sits at the end of the system
+prompt, the system prompt and bound tools are identical between calls, and
+for Anthropic models an explicit cache breakpoint is placed on the system
+prompt (which also covers the tool definitions that precede it).
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import Sequence
+
+from langchain_core.messages import AnyMessage, BaseMessage, SystemMessage
+
+from react_agent.compaction import compact_messages
+from react_agent.configuration import Configuration
+
+_CACHE_BREAKPOINT_PROVIDERS = ("anthropic/",)
+
+
+def format_system_time(granularity: str, now: datetime | None = None) -> str:
+    """Format the current UTC time, truncated to `granularity`.
+
+    Args:
+        granularity: One of "day", "hour", "minute" or "exact".
+        now: The time to format; defaults to the current time.
+    """
+    now = now or datetime.now(tz=UTC)
+    if granularity == "day":
+        return now.date().isoformat()
+    if granularity == "hour":
+        return now.replace(minute=0, second=0, microsecond=0).isoformat()
+    if granularity == "minute":
+        return now.replace(second=0, microsecond=0).isoformat()
+    if granularity == "exact":
+        return now.isoformat()
+    raise ValueError(
+        f"Unknown system_time_granularity {granularity!r}. "
+        "Expected 'day', 'hour', 'minute' or 'exact'."
+    )
+
+
+def system_message(
+    text: str, model: str, configuration: Configuration
+) -> SystemMessage:
+    """Build the system message, marking a cache breakpoint where supported."""
+    if configuration.prompt_cache_breakpoints and model.startswith(
+        _CACHE_BREAKPOINT_PROVIDERS
+    ):
+        return SystemMessage(
+            content=[
+                {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+            ]
+        )
+    return SystemMessage(content=text)
+
+
+def build_prompt(
+    template: str,
+    messages: Sequence[AnyMessage],
+    configuration: Configuration,
+    *,
+    model: str,
+) -> list[BaseMessage]:
+    """Return `[system, *history]` for a model call.
+
+    Args:
+        template: System prompt with a `{system_time}` placeholder.
+        messages: The conversation history from the state.
+        configuration: The run configuration.
+        model: The fully specified model name ('provider/model').
+    """
+    text = template.format(
+        system_time=format_system_time(configuration.system_time_granularity)
+    )
+    return [
+        system_message(text, model, configuration),
+        *compact_messages(messages, configuration),
+    ]
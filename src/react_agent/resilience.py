@@ -0,0 +1,194 @@
+"""Timeout, retry and hedging policy for model calls.
+
+A model call without a deadline stalls the whole ReAct loop when a provider
+is slow. `run_with_policy` runs one logical call as a series of attempts:
+
+- every attempt (including its hedge) must finish within `model_timeout`;
+- timeouts and transient provider errors (rate limits, 5xx, dropped
+  connections) are retried up to `model_max_retries` times with exponential
+  backoff and jitter;
+- with `model_hedge_after` set, an attempt that has not produced its first
+  token by then gets a second request (to `model_hedge_fallback` if set) and
+  whichever starts answering first wins; the other one is cancelled. Once
+  `MIN_HEDGE_SAMPLES` calls were seen, the delay becomes the node's observed
+  p`model_hedge_percentile` time to first token, so only the slow tail is
+  hedged.
+
+Timeouts, retries and hedges are counted in `react_agent.metrics` next to the
+p50/p95/p99 latencies, which is how the effect on the tail is checked.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from typing import Any, Awaitable, Callable, Sequence, TypeVar
+
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable
+
+from react_agent.configuration import Configuration
+from react_agent.metrics import record_policy_event, ttft_percentile
+from react_agent.utils import get_chat_model
+
+T = TypeVar("T")
+Model = Runnable[LanguageModelInput, BaseMessage]
+# One attempt: call the given model, setting the event on the first token.
+Attempt = Callable[[Model, asyncio.Event], Awaitable[T]]
+
+_TRANSIENT_STATUS = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+_TRANSIENT_NAMES = (
+    "RateLimit",
+    "Timeout",
+    "Connection",
+    "InternalServer",
+    "ServiceUnavailable",
+    "Overloaded",
+)
+_MAX_BACKOFF = 8.0
+
+MIN_HEDGE_SAMPLES = 20
+
+
+def is_transient(error: BaseException) -> bool:
+    """Return whether `error` is worth retrying (timeouts, 429/5xx, network)."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if isinstance(status, int) and status in _TRANSIENT_STATUS:
+        return True
+    return any(name in type(error).__name__ for name in _TRANSIENT_NAMES)
+
+
+def backoff(retry: int, base: float) -> float:
+    """Return the delay before retry number `retry` (0-based), with full jitter."""
+    return random.uniform(0, min(_MAX_BACKOFF, base * 2**retry))
+
+
+def hedge_delay(node: str, configuration: Configuration) -> float | None:
+    """Return how long to wait for a first token before hedging, or `None`."""
+    if configuration.model_hedge_after <= 0:
+        return None
+    observed = ttft_percentile(
+        node, configuration.model_hedge_percentile, min_samples=MIN_HEDGE_SAMPLES
+    )
+    return observed if observed is not None else configuration.model_hedge_after
+
+
+def fallback_model(
+    configuration: Configuration, tools: Sequence[Any] | None = None
+) -> Model | None:
+    """Return the model hedged requests go to, bound to `tools`, if configured."""
+    if not configuration.model_hedge_fallback:
+        return None
+    return get_chat_model(configuration.model_hedge_fallback, tools=tools)
+
+
+async def run_with_policy(
+    attempt: Attempt[T],
+    model: Model,
+    *,
+    node: str,
+    configuration: Configuration,
+    fallback: Model | None = None,
+    on_retry: Callable[[], None] | None = None,
+) -> T:
+    """Run `attempt` on `model` under the configured timeout/retry/hedge policy.
+
+    Args:
+        attempt: Performs one call with the given model and sets the event
+            when the first token arrives.
+        model: The node's model.
+        node: The metrics label of the node.
+        configuration: The run configuration.
+        fallback: The model hedged requests go to; defaults to `model`.
+        on_retry: Called before each retry, e.g. to reset partial output.
+    """
+    retry = 0
+    while True:
+        try:
+            async with asyncio.timeout(configuration.model_timeout or None):
+                return await _hedged(attempt, model, fallback, node, configuration)
+        except Exception as e:
+            if isinstance(e, TimeoutError):
+                record_policy_event(node, "timeouts")
+            if retry >= configuration.model_max_retries or not is_transient(e):
+                raise
+            record_policy_event(node, "retries")
+            if on_retry is not None:
+                on_retry()
+            await asyncio.sleep(backoff(retry, configuration.model_retry_backoff))
+            retry += 1
+
+
+async def _hedged(
+    attempt: Attempt[T],
+    model: Model,
+    fallback: Model | None,
+    node: str,
+    configuration: Configuration,
+) -> T:
+    delay = hedge_delay(node, configuration)
+    primary_started = asyncio.Event()
+    primary = asyncio.ensure_future(attempt(model, primary_started))
+    if delay is None:
+        return await primary
+
+    started = asyncio.ensure_future(primary_started.wait())
+    try:
+        done, _ = await asyncio.wait(
+            {primary, started}, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+        )
+    except BaseException:
+        primary.cancel()
+        raise
+    finally:
+        started.cancel()
+    if done:
+        return await primary
+
+    record_policy_event(node, "hedges")
+    hedge_started = asyncio.Event()
+    hedge = asyncio.ensure_future(attempt(fallback or model, hedge_started))
+    attempts: dict[asyncio.Future[T], asyncio.Event] = {
+        primary: primary_started,
+        hedge: hedge_started,
+    }
+    try:
+        winner = await _first_to_answer(attempts)
+        if winner is hedge:
+            record_policy_event(node, "hedge_wins")
+        return await winner
+    finally:
+        for task in attempts:
+            task.cancel()
+
+
+async def _first_to_answer(
+    attempts: dict[asyncio.Future[T], asyncio.Event],
+) -> asyncio.Future[T]:
+    """Return the attempt that streamed or finished first; skip failed ones."""
+    pending = dict(attempts)
+    error: BaseException | None = None
+    while pending:
+        waiters: dict[asyncio.Future[Any], asyncio.Future[T]] = {
+            asyncio.ensure_future(event.wait()): task for task, event in pending.items()
+        }
+        try:
+            done, _ = await asyncio.wait(
+                {*pending, *waiters}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+        for future in done:
+            task: asyncio.Future[T] = waiters.get(future, future)
+            if task not in pending:
+                continue
+            if not task.done() or task.exception() is None:
+                return task
+            error = task.exception()
+            del pending[task]
+    assert error is not None
+    raise error
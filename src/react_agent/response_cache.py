@@ -0,0 +1,207 @@
+"""Opt-in response cache for deterministic graph nodes.
+
+Some nodes (e.g. `fun_facts_pokemon`) produce an answer that only depends on
+the model, the prompt and the last few messages. Wrapping such a node with
+`response_cache(...)` serves repeated requests from an in-memory LRU and,
+when `Configuration.response_cache_path` is set, from a local SQLite store
+shared between processes.
+
+The key is a hash of the model name (resolved once per call and handed to
+the node, so a downgraded call is never cached as the configured model), the
+prompt *template* (so the system time does not break it) and the normalized
+text of the selected messages
+(case and whitespace are ignored). By default those are the last few
+messages; a node whose answer depends on something earlier in the history
+(such as which Pokémon a follow-up refers to) passes `key_messages` instead.
+A single request can skip the cache by passing
+`{"configurable": {"response_cache": False}}`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Protocol, Sequence, TypeVar, cast
+
+from langchain_core.messages import (
+    AnyMessage,
+    BaseMessage,
+    messages_from_dict,
+    messages_to_dict,
+)
+
+from react_agent.cache import CacheStats, TTLCache
+from react_agent.configuration import Configuration
+from react_agent.state import State
+from react_agent.utils import get_message_text
+
+R = TypeVar("R", bound=dict[str, Any])
+R_co = TypeVar("R_co", bound=dict[str, Any], covariant=True)
+
+
+class CachedNode(Protocol[R_co]):
+    """A node wrapped by `response_cache`: it takes only the state again."""
+
+    def __call__(self, state: State) -> Awaitable[R_co]:
+        """Run the node, or answer from the cache."""
+        ...
+
+
+_memory: TTLCache[str, list[dict[str, Any]]] = TTLCache(maxsize=1024)
+_stores: dict[str, SQLiteResponseStore] = {}
+stats = CacheStats()
+
+
+class SQLiteResponseStore:
+    """Persistent key -> serialized messages store with per-entry expiry."""
+
+    def __init__(self, path: str) -> None:
+        """Open (creating if needed) the store at `path`."""
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> list[dict[str, Any]] | None:
+        """Return the stored messages for `key` if present and not expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM responses WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: list[dict[str, Any]], ttl: float) -> None:
+        """Store `value` under `key` for `ttl` seconds."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (key, time.time() + ttl, json.dumps(value)),
+            )
+            # Opportunistically drop expired rows so the file does not grow forever.
+            self._conn.execute(
+                "DELETE FROM responses WHERE expires_at <= ?", (time.time(),)
+            )
+            self._conn.commit()
+
+
+def _store(configuration: Configuration) -> SQLiteResponseStore | None:
+    path = configuration.response_cache_path
+    if not path:
+        return None
+    if path not in _stores:
+        _stores[path] = SQLiteResponseStore(path)
+    return _stores[path]
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def cache_key(model: str, prompt: str, messages: Sequence[AnyMessage]) -> str:
+    """Return the cache key for a call with `model`, `prompt` and `messages`."""
+    payload = [model, prompt] + [
+        [m.type, _normalize(get_message_text(m)), getattr(m, "tool_calls", None) or []]
+        for m in messages
+    ]
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def _fresh(messages: list[BaseMessage]) -> list[BaseMessage]:
+    # A cached message must not reuse the original id, or `add_messages`
+    # would treat it as an update of a message already in another thread.
+    return [m.model_copy(update={"id": str(uuid.uuid4())}) for m in messages]
+
+
+def response_cache(
+    *,
+    model: str | Callable[[State, Configuration], str],
+    prompt: str,
+    tail: int = 2,
+    message_types: tuple[str, ...] | None = None,
+    key_messages: Callable[[Sequence[AnyMessage]], Sequence[AnyMessage]] | None = None,
+) -> Callable[[Callable[[State, str], Awaitable[R]]], CachedNode[R]]:
+    """Cache the messages returned by a node.
+
+    The decorated node takes the model name to call as its second argument;
+    the wrapper resolves it once, so the key always names the model that
+    actually produced the answer.
+
+    Args:
+        model: The fully specified model name the node calls, or a function
+            returning it from the state and run configuration.
+        prompt: The node's prompt template.
+        tail: How many of the last (selected) messages make up the key.
+        message_types: Only consider messages of these types (e.g. `("human",)`)
+            when selecting the tail. `None` considers every message.
+        key_messages: Select the messages that make up the key from the whole
+            history. Overrides `tail` and `message_types`.
+    """
+
+    def decorator(
+        node: Callable[[State, str], Awaitable[R]],
+    ) -> CachedNode[R]:
+        @functools.wraps(node)
+        async def wrapper(state: State) -> R:
+            configuration = Configuration.from_context()
+            model_name = model(state, configuration) if callable(model) else model
+            if not configuration.response_cache:
+                return await node(state, model_name)
+
+            if key_messages is not None:
+                selected = list(key_messages(state.messages))
+            else:
+                selected = [
+                    m
+                    for m in state.messages
+                    if message_types is None or m.type in message_types
+                ][-tail:]
+            key = cache_key(model_name, prompt, selected)
+            store = _store(configuration)
+
+            cached = _memory.get(key)
+            if cached is None and store is not None:
+                cached = await asyncio.to_thread(store.get, key)
+                if cached is not None:
+                    _memory.set(key, cached, ttl=configuration.response_cache_ttl)
+            if cached is not None:
+                stats.hits += 1
+                return cast(R, {"messages": _fresh(messages_from_dict(cached))})
+
+            stats.misses += 1
+            result = await node(state, model_name)
+            serialized = messages_to_dict(result["messages"])
+            _memory.set(key, serialized, ttl=configuration.response_cache_ttl)
+            if store is not None:
+                await asyncio.to_thread(
+                    store.set, key, serialized, configuration.response_cache_ttl
+                )
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def response_cache_stats() -> dict[str, Any]:
+    """Return hit/miss counters of the response cache."""
+    return {"hits": stats.hits, "misses": stats.misses, "hit_rate": stats.hit_rate}
+
+
+def clear_response_cache() -> None:
+    """Forget every in-memory entry and reset the counters."""
+    global stats
+    _memory.clear()
+    stats = CacheStats()
@@ -0,0 +1,195 @@
+"""Deterministic routing for the appointment graph.
+
+Some turns do not need the model to decide what to do: "¿qué horarios hay
+libres el 2030-05-10?" always means `check_availability` for that date (or
+`check_availability_range` when several days are mentioned), and a
+successful `schedule_quote` is always followed by a confirmation email. This
+module extracts the facts those decisions need (email addresses, explicit
+dates) with precompiled regular expressions, and applies a list of rules that
+can answer a turn with a synthesized tool call instead of a model round-trip.
+
+What is extracted lives in `State.slots`, which is updated incrementally:
+user messages are scanned once from `Slots.cursor` at the start of a turn,
+model responses are observed by the node that produced them
+(`observe_ai_message`) and tool results by the tool node
+(`observe_tool_result`). Routers then read a slot instead of walking the
+history. Rules are plain functions registered with `fast_path_rule`; the first
+one returning a message wins, and when none matches the graph falls through
+to the model.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Sequence
+
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    HumanMessage,
+    ToolCall,
+    ToolMessage,
+)
+
+from react_agent.state import Slots, State, update_slots
+from react_agent.utils import get_message_text
+
+Rule = Callable[[State, Slots], AIMessage | None]
+
+RULES: list[Rule] = []
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+# 2030-05-10, 2030-05-10T10:30, 2030-05-10 10:30
+_ISO_DATE_RE = re.compile(
+    r"\b(\d{4})-(\d{1,2})-(\d{1,2})(?:[T ](\d{1,2}):(\d{2})(?::\d{2})?)?\b"
+)
+# 10/05/2030, 10/05/2030 10:30, 10/05/2030 a las 10:30
+_DMY_DATE_RE = re.compile(
+    r"\b(\d{1,2})/(\d{1,2})/(\d{4})(?:\s*(?:a las\s*)?(\d{1,2}):(\d{2}))?\b"
+)
+
+_AVAILABILITY_RE = re.compile(
+    r"\b(disponib\w*|libres?|huecos?|horarios?|available|availability|free slots?|open slots?)\b",
+    re.IGNORECASE,
+)
+# Any of these means the user wants a change, which needs the model (and
+# usually more data such as a name), so the availability shortcut is skipped.
+_CHANGE_RE = re.compile(
+    r"\b(agend\w*|reserv\w*|program\w*|reprogram\w*|cancel\w*|cambi\w*|mov\w*|"
+    r"book\w*|schedul\w*|reschedul\w*)\b",
+    re.IGNORECASE,
+)
+
+_NAME_RE = re.compile(
+    r"(?i:me llamo|mi nombre es|my name is)\s+"
+    r"([A-ZÁÉÍÓÚÑ][\wáéíóúñ]+(?:\s+[A-ZÁÉÍÓÚÑ][\wáéíóúñ]+)?)"
+)
+
+QUOTE_TOOLS = frozenset({"schedule_quote", "reschedule_quote"})
+
+
+def fast_path_rule(rule: Rule) -> Rule:
+    """Register `rule` in `RULES` (usable as a decorator)."""
+    RULES.append(rule)
+    return rule
+
+
+def extract_dates(text: str) -> list[str]:
+    """Return the valid dates written in `text` as `YYYY-MM-DDTHH:MM:SS`."""
+    found: list[str] = []
+    for match in _ISO_DATE_RE.finditer(text):
+        year, month, day, hour, minute = match.groups()
+        found.extend(_to_iso(year, month, day, hour, minute))
+    for match in _DMY_DATE_RE.finditer(text):
+        day, month, year, hour, minute = match.groups()
+        found.extend(_to_iso(year, month, day, hour, minute))
+    return found
+
+
+def _to_iso(
+    year: str, month: str, day: str, hour: str | None, minute: str | None
+) -> list[str]:
+    try:
+        value = datetime(
+            int(year), int(month), int(day), int(hour or 0), int(minute or 0)
+        )
+    except ValueError:
+        return []
+    return [value.isoformat()]
+
+
+def observe_user_messages(
+    messages: Sequence[AnyMessage], slots: Slots
+) -> dict[str, Any]:
+    """Return the slot updates found in user messages added since `slots.cursor`."""
+    if slots.cursor >= len(messages):
+        return {}
+    update: dict[str, Any] = {"cursor": len(messages)}
+    for message in messages[slots.cursor :]:
+        if not isinstance(message, HumanMessage):
+            continue
+        text = get_message_text(message)
+        emails = EMAIL_RE.findall(text)
+        if emails:
+            update["email"] = emails[-1]
+        name = _NAME_RE.search(text)
+        if name:
+            update["name"] = name.group(1)
+        update["dates"] = extract_dates(text)
+    return update
+
+
+def observe_ai_message(message: AIMessage) -> dict[str, Any]:
+    """Return the slot updates implied by a model (or rule) response."""
+    if not message.tool_calls:
+        return {}
+    return {"last_tool_names": [call["name"] for call in message.tool_calls]}
+
+
+def observe_tool_result(call: ToolCall, result: ToolMessage) -> dict[str, Any]:
+    """Return the slot updates implied by the result of `call`.
+
+    A successful schedule/reschedule becomes the pending confirmation, and the
+    address and name it was booked with become the thread's email and name.
+    """
+    if call["name"] not in QUOTE_TOOLS or not _succeeded(result):
+        return {}
+    args = call["args"]
+    update: dict[str, Any] = {"pending_confirmation": dict(call)}
+    if args.get("gmail"):
+        update["email"] = args["gmail"]
+    if args.get("name"):
+        update["name"] = args["name"]
+    return update
+
+
+def _succeeded(result: ToolMessage) -> bool:
+    # Tools report API errors (including 4xx rejections) as an {"error": ...}
+    # payload rather than raising.
+    if result.status == "error":
+        return False
+    try:
+        payload = json.loads(get_message_text(result))
+    except ValueError:
+        return True
+    return not (isinstance(payload, dict) and "error" in payload)
+
+
+def _tool_call(name: str, args: dict[str, Any]) -> dict[str, Any]:
+    return {"name": name, "args": args, "id": f"call_{uuid.uuid4()}"}
+
+
+@fast_path_rule
+def availability_rule(state: State, slots: Slots) -> AIMessage | None:
+    """Check availability directly when the user asks about explicit dates."""
+    last = state.messages[-1] if state.messages else None
+    if not isinstance(last, HumanMessage) or not slots.dates:
+        return None
+    text = get_message_text(last)
+    if not _AVAILABILITY_RE.search(text) or _CHANGE_RE.search(text):
+        return None
+    days = sorted(dict.fromkeys(d[:10] for d in slots.dates))
+    if len(days) == 1:
+        call = _tool_call("check_availability", {"date": f"{days[0]}T00:00:00"})
+    else:
+        # One range query instead of one call (and one DB query) per day.
+        call = _tool_call(
+            "check_availability_range",
+            {"start": f"{days[0]}T00:00:00", "end": f"{days[-1]}T00:00:00"},
+        )
+    return AIMessage(content="", tool_calls=[call])
+
+
+def match_fast_path(state: State) -> tuple[dict[str, Any], AIMessage | None]:
+    """Return the slot updates for the new user messages and the first rule answer."""
+    update = observe_user_messages(state.messages, state.slots)
+    slots = update_slots(state.slots, update)
+    for rule in RULES:
+        message = rule(state, slots)
+        if message is not None:
+            return {**update, **observe_ai_message(message)}, message
+    return update, None
@@ -2,8 +2,8 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Sequence
+from dataclasses import dataclass, field, replace
+from typing import Any, Sequence
 
 from langchain_core.messages import AnyMessage
 from langgraph.graph import add_messages
@@ -11,6 +11,43 @@ from langgraph.managed import IsLastStep
 from typing_extensions import Annotated
 
 
+@dataclass
+class Slots:
+    """Structured facts about the conversation, kept up to date as messages arrive.
+
+    Nodes return partial updates (a dict with only the fields that changed)
+    alongside the messages they produce, and `update_slots` merges them, so
+    routers read a field instead of walking the history. User messages are
+    the only ones not produced by a node; they are read once, starting at
+    `cursor`, when a graph that needs them starts a turn.
+    """
+
+    email: str | None = None
+    """The last email address the user wrote."""
+
+    name: str | None = None
+    """The name the user gave ("me llamo Ana", "my name is Ana")."""
+
+    dates: list[str] = field(default_factory=list)
+    """Dates (`YYYY-MM-DDTHH:MM:SS`) written in the user's latest message."""
+
+    last_tool_names: list[str] = field(default_factory=list)
+    """Names of the tools requested by the latest AIMessage with tool calls."""
+
+    pending_confirmation: dict[str, Any] | None = None
+    """A successful schedule/reschedule call whose confirmation email is not sent yet."""
+
+    cursor: int = 0
+    """Number of messages already scanned for user-provided slots."""
+
+
+def update_slots(current: Slots, update: Slots | dict[str, Any]) -> Slots:
+    """Reducer for `State.slots`: merge a partial update into the current slots."""
+    if isinstance(update, Slots):
+        return update
+    return replace(current, **update) if update else current
+
+
 @dataclass
 class InputState:
     """Defines the input state for the agent, representing a narrower interface to the outside world.
@@ -53,6 +90,21 @@ class State(InputState):
     It is set to 'True' when the step count reaches recursion_limit - 1.
     """
 
+    slots: Annotated[Slots, update_slots] = field(default_factory=Slots)
+    """
+    Email, name, dates, last tools used and pending confirmations for this thread.
+
+    Maintained incrementally by the nodes (see `react_agent.routing`), so the
+    appointment flow never reparses the transcript to route a step.
+    """
+
+    route: str = field(default="")
+    """
+    The sub-agent the router graph sent the latest request to.
+
+    Follow-ups that the classifier cannot place stay on this route.
+    """
+
     # Additional attributes can be added here as needed.
     # Common examples include:
     # retrieved_documents: List[Document] = field(default_factory=list)
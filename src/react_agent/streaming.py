@@ -0,0 +1,168 @@
+"""Model calls that stream their output while the node is still running.
+
+With `Configuration.stream_model_output` enabled (the default), nodes call the
+model through `invoke_model`, which consumes `model.astream(...)` instead of
+waiting for `ainvoke`. Chunks are added together as they arrive, so tool calls
+are assembled incrementally from their `tool_call_chunks`, and each piece of
+text is forwarded to the graph's `custom` stream as
+
+    {"node": "<node name>", "delta": "<text>"}
+
+so callers using `graph.astream(..., stream_mode="custom")` see partial
+answers (token streaming through `stream_mode="messages"` keeps working as
+well). If the call is retried after it started streaming, a
+`{"node": ..., "restart": True}` event tells the caller to discard the partial
+text. Only one attempt streams when a request is hedged. Every call records its time to first token, duration and tokens per
+second in `react_agent.metrics`, whether it streamed or not, and is traced as
+a `model:<node>` span with its token counts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Sequence
+
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    message_chunk_to_message,
+)
+from langchain_core.runnables import Runnable
+from langgraph.config import get_stream_writer
+
+from react_agent.configuration import Configuration
+from react_agent.metrics import record_timing, record_usage
+from react_agent.resilience import run_with_policy
+from react_agent.tracing import span
+from react_agent.utils import get_message_text
+
+
+def _writer() -> Any:
+    try:
+        return get_stream_writer()
+    except (RuntimeError, KeyError):
+        # Called outside a graph run: nothing to stream to.
+        return None
+
+
+class _Lease:
+    """Lets only one concurrent attempt (primary or hedge) write deltas."""
+
+    def __init__(self) -> None:
+        self.owner: object | None = None
+        self.wrote = False
+
+    def claim(self, attempt: object) -> bool:
+        if self.owner is None:
+            self.owner = attempt
+        return self.owner is attempt
+
+
+async def invoke_model(
+    model: Runnable[LanguageModelInput, BaseMessage],
+    prompt: Sequence[BaseMessage],
+    *,
+    node: str,
+    model_name: str | None = None,
+    fallback: Runnable[LanguageModelInput, BaseMessage] | None = None,
+) -> AIMessage:
+    """Call `model` on `prompt` for `node`, streaming if configured.
+
+    The call runs under the timeout/retry/hedging policy of
+    `react_agent.resilience`; hedged requests go to `fallback` when given.
+    Returns the complete response, with usage and timings recorded under `node`
+    (as `"node@model_name"` when `model_name` is given, to compare model tiers).
+    """
+    configuration = Configuration.from_context()
+    label = f"{node}@{model_name}" if model_name else node
+    writer = _writer() if configuration.stream_model_output else None
+    lease = _Lease()
+    started = time.perf_counter()
+
+    async def attempt(
+        candidate: Runnable[LanguageModelInput, BaseMessage],
+        first_token: asyncio.Event,
+    ) -> tuple[BaseMessage, float | None, int]:
+        if not configuration.stream_model_output:
+            return await candidate.ainvoke(list(prompt)), None, 0
+        full: AIMessageChunk | None = None
+        complete: AIMessage | None = None
+        first: float | None = None
+        chunks = 0
+        async for chunk in candidate.astream(list(prompt)):
+            if not isinstance(chunk, AIMessage):
+                continue
+            text = get_message_text(chunk)
+            partial_tools = getattr(chunk, "tool_call_chunks", chunk.tool_calls)
+            if first is None and (text or partial_tools):
+                first = time.perf_counter()
+                first_token.set()
+            if text:
+                chunks += 1
+                if writer is not None and lease.claim(first_token):
+                    lease.wrote = True
+                    writer({"node": node, "delta": text})
+            if isinstance(chunk, AIMessageChunk):
+                full = chunk if full is None else full + chunk
+            else:
+                # Models without native streaming yield one complete AIMessage.
+                complete = chunk
+        if complete is not None:
+            return complete, first, chunks
+        if full is None:
+            return AIMessage(content=""), first, chunks
+        return message_chunk_to_message(full), first, chunks
+
+    def restart() -> None:
+        # A retried call streams its answer again from the start.
+        if writer is not None and lease.wrote:
+            writer({"node": node, "restart": True})
+        lease.owner, lease.wrote = None, False
+
+    with span(
+        f"model:{node}",
+        "model",
+        model=model_name or "",
+        messages_in=len(prompt),
+        prompt_chars=sum(len(get_message_text(m)) for m in prompt),
+    ) as traced:
+        response, first_token, chunks = await run_with_policy(
+            attempt,
+            model,
+            node=label,
+            configuration=configuration,
+            fallback=fallback,
+            on_retry=restart,
+        )
+        finished = time.perf_counter()
+        message = (
+            response
+            if isinstance(response, AIMessage)
+            else AIMessage(content=response.content)
+        )
+        # Providers that do not report usage while streaming are measured in chunks.
+        output_tokens = (
+            message.usage_metadata["output_tokens"]
+            if message.usage_metadata
+            else chunks
+        )
+        record_usage(label, message)
+        if traced is not None:
+            usage = message.usage_metadata
+            traced.set(
+                ttft_ms=round(((first_token or finished) - started) * 1000, 1),
+                input_tokens=usage["input_tokens"] if usage else None,
+                output_tokens=output_tokens,
+                output_chars=len(get_message_text(message)),
+                tool_calls=len(message.tool_calls),
+            )
+        record_timing(
+            label,
+            ttft=(first_token or finished) - started,
+            seconds=finished - started,
+            output_tokens=output_tokens,
+        )
+        return message
@@ -0,0 +1,63 @@
+"""Per-node model selection.
+
+Each node asks `select_model` which model to call. The name is resolved from
+the most specific setting that is filled in:
+
+1. the node's own field (`model_call`, `model_pokemon`, `model_fun_facts`,
+   `model_appointments`);
+2. the model of the node's route in `route_models`;
+3. `model`.
+
+When `fast_model` is set, turns that look simple (the latest turn, from the
+last user message on, fits in `fast_model_max_tokens`) are downgraded to it,
+except for nodes listed in `fast_model_excluded_nodes`. Metrics are recorded
+per node and model (`"fun_facts@<model>"`), so the latency and token cost of
+each tier can be compared directly.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from langchain_core.messages import AnyMessage, HumanMessage
+
+from react_agent.compaction import count_tokens
+from react_agent.configuration import Configuration
+
+# node name -> (Configuration field, route)
+NODE_MODELS: dict[str, tuple[str, str]] = {
+    "call_model": ("model_call", "general"),
+    "pokemon_expert": ("model_pokemon", "pokemon"),
+    "fun_facts": ("model_fun_facts", "pokemon"),
+    "appointment_manager": ("model_appointments", "appointment"),
+}
+
+
+def configured_model(node: str, configuration: Configuration) -> str:
+    """Return the model configured for `node`, without any downgrade."""
+    field_name, route = NODE_MODELS.get(node, ("", "general"))
+    own: str = getattr(configuration, field_name, "") if field_name else ""
+    return own or configuration.model_for(route)
+
+
+def latest_turn_tokens(messages: Sequence[AnyMessage]) -> int:
+    """Approximate tokens from the last user message to the end of the history."""
+    total = 0
+    for message in reversed(messages):
+        total += count_tokens(message)
+        if isinstance(message, HumanMessage):
+            break
+    return total
+
+
+def select_model(
+    node: str, messages: Sequence[AnyMessage], configuration: Configuration
+) -> str:
+    """Return the model `node` should call for the conversation in `messages`."""
+    if (
+        configuration.fast_model
+        and node not in configuration.fast_model_excluded_nodes
+        and latest_turn_tokens(messages) <= configuration.fast_model_max_tokens
+    ):
+        return configuration.fast_model
+    return configured_model(node, configuration)
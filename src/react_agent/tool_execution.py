@@ -0,0 +1,137 @@
+"""Bounded, fault-tolerant execution of tool calls.
+
+`ToolNode` already runs every tool call of one `AIMessage` concurrently, but
+without any limit: a model asking for ten `check_availability` dates opens ten
+requests to the quotes API at once, and a single hanging or failing call
+blocks or aborts the whole step. `limited_tool_node` builds a `ToolNode` whose
+calls go through `limit_tool_call`, which:
+
+- caps concurrent calls globally (`tool_max_concurrency`) and per tool
+  (`tool_concurrency_limits`);
+- gives each call its own timeout (`tool_timeout`);
+- turns a timeout or an unexpected exception into an error `ToolMessage` for
+  that call only, so the other results still reach the model;
+- records the latency of every call in `response_metadata` and in
+  `react_agent.metrics`, and traces it as a `tool:<name>` span;
+- updates `State.slots` from results that change them (a successful booking
+  becomes the pending confirmation), through a `Command`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Sequence
+
+from langchain_core.messages import ToolMessage
+from langchain_core.tools import BaseTool
+from langgraph.errors import GraphBubbleUp
+from langgraph.prebuilt import ToolNode
+from langgraph.prebuilt.tool_node import ToolCallRequest
+from langgraph.types import Command
+
+from react_agent.configuration import Configuration
+from react_agent.metrics import record_tool_call
+from react_agent.routing import observe_tool_result
+from react_agent.tracing import span
+from react_agent.utils import get_message_text
+
+ToolResult = ToolMessage | Command[Any]
+Execute = Callable[[ToolCallRequest], Awaitable[ToolResult]]
+
+# Semaphores are bound to the loop they are first used on, so they are kept
+# per loop, keyed by (tool name or "*", limit) so a changed limit gets its own.
+_semaphores: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[tuple[str, int], asyncio.Semaphore]
+] = weakref.WeakKeyDictionary()
+
+
+def _semaphore(name: str, limit: int) -> asyncio.Semaphore:
+    per_loop = _semaphores.setdefault(asyncio.get_running_loop(), {})
+    key = (name, limit)
+    if key not in per_loop:
+        per_loop[key] = asyncio.Semaphore(limit)
+    return per_loop[key]
+
+
+def _error(request: ToolCallRequest, content: str) -> ToolMessage:
+    return ToolMessage(
+        content=content,
+        name=request.tool_call["name"],
+        tool_call_id=request.tool_call["id"] or "",
+        status="error",
+    )
+
+
+async def limit_tool_call(request: ToolCallRequest, execute: Execute) -> ToolResult:
+    """Run one tool call under the configured concurrency limits and timeout."""
+    name = request.tool_call["name"]
+    args_bytes = len(json.dumps(request.tool_call["args"], default=str))
+    with span(f"tool:{name}", "tool", args_bytes=args_bytes) as traced:
+        result, status = await _limited(request, execute)
+        if traced is not None:
+            if status != "success":
+                traced.status = "error"
+            traced.set(outcome=status)
+            if isinstance(result, ToolMessage):
+                traced.set(
+                    result_bytes=len(get_message_text(result)),
+                    queued_ms=result.response_metadata.get("queued_ms"),
+                )
+    if isinstance(result, ToolMessage):
+        slots = observe_tool_result(request.tool_call, result)
+        if slots:
+            return Command(update={"messages": [result], "slots": slots})
+    return result
+
+
+async def _limited(
+    request: ToolCallRequest, execute: Execute
+) -> tuple[ToolResult, str]:
+    configuration = Configuration.from_context()
+    name = request.tool_call["name"]
+    per_tool = configuration.tool_concurrency_limits.get(name)
+
+    queued = time.perf_counter()
+    # Take the per-tool slot first so waiting for a busy tool never holds a
+    # global slot that calls to other tools could use.
+    async with _semaphore(name, per_tool) if per_tool else contextlib.nullcontext():
+        async with _semaphore("*", configuration.tool_max_concurrency):
+            started = time.perf_counter()
+            status = "success"
+            try:
+                async with asyncio.timeout(configuration.tool_timeout or None):
+                    result = await execute(request)
+            except TimeoutError:
+                status = "timeout"
+                result = _error(
+                    request,
+                    f"Error: {name} did not answer within {configuration.tool_timeout}s. "
+                    "Try again later or continue without this result.",
+                )
+            except GraphBubbleUp:
+                raise
+            except Exception as e:
+                status = "error"
+                result = _error(request, f"Error: {name} failed: {e!r}")
+            elapsed = time.perf_counter() - started
+
+    if isinstance(result, ToolMessage):
+        if result.status == "error" and status == "success":
+            status = "error"
+        result.response_metadata.update(
+            latency_ms=round(elapsed * 1000, 1),
+            queued_ms=round((started - queued) * 1000, 1),
+        )
+    record_tool_call(name, elapsed, status)
+    return result, status
+
+
+def limited_tool_node(
+    tools: Sequence[BaseTool | Callable[..., object]], *, name: str = "tools"
+) -> ToolNode:
+    """Return a `ToolNode` for `tools` whose calls go through `limit_tool_call`."""
+    return ToolNode(tools, name=name, awrap_tool_call=limit_tool_call)
@@ -6,15 +6,18 @@ These tools are intended as free examples to get started. For production use,
 consider implementing more robust and specialized tools tailored to your needs.
 """
 
-import aiohttp
-
 from typing import Any, Callable, List, Optional, cast
 
+import aiohttp
 from langchain_tavily import TavilySearch  # type: ignore[import-not-found]
 
 from react_agent.configuration import Configuration
+from react_agent.http_client import get_http_session
 
-from react_agent.pokemon_shcema import PokemonSchemaAPI, PokemonSchema
+from react_agent.pokeapi import fetch_pokemon, normalize_name
+from react_agent.pokedex import PokedexSnapshot, load_snapshot
+from react_agent.pokemon_names import get_name_index
+from react_agent.pokemon_shcema import PokemonProjection
 
 from react_agent.state import State
 from langchain_core.messages import AIMessage
@@ -35,99 +38,152 @@ async def search(query: str) -> Optional[dict[str, Any]]:
     wrapped = TavilySearch(max_results=configuration.max_search_results)
     return cast(dict[str, Any], await wrapped.ainvoke({"query": query}))
 
+def _pokedex() -> PokedexSnapshot | None:
+    """Return the offline Pokédex snapshot, if one is configured."""
+    path = Configuration.from_context().pokedex_snapshot_path
+    return load_snapshot(path) if path else None
+
+async def _resolve_pokemon_name(name: str) -> tuple[str | None, List[str]]:
+    """Resolve a user spelling to a known Pokémon name without any API call.
+
+    Returns the resolved name (or None if it is unknown or ambiguous) and the
+    candidate names to suggest back to the model.
+    """
+    index = await get_name_index()
+    if index is None:
+        return normalize_name(name), []
+    resolution = index.resolve(name)
+    return resolution.name, resolution.candidates
+
+def _pokemon_projection() -> PokemonProjection:
+    """Build the payload projection for Pokémon tool results from the configuration."""
+    configuration = Configuration.from_context()
+    return PokemonProjection(
+        fields=configuration.pokemon_fields or None,
+        max_moves=configuration.pokemon_max_moves if configuration.pokemon_max_moves >= 0 else None,
+        stats_as_dict=configuration.pokemon_stats_as_dict,
+    )
+
+def _pokemon_not_found(name: str, candidates: List[str]) -> dict[str, Any]:
+    error: dict[str, Any] = {"error": f"Pokemon '{name}' not found."}
+    if candidates:
+        error["did_you_mean"] = candidates
+    return error
+
 async def search_pokemon_by_name(name: str) -> Optional[dict[str, Any]]:
     """Search for a Pokemon by name"""
 
-    url = f"https://pokeapi.co/api/v2/pokemon/{name.lower()}"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                data = await response.json()
-                api_data = PokemonSchemaAPI(**data)
-                pokemon = PokemonSchema.from_api(api_data)
-                return pokemon
-            else:
-                return {"error": f"Pokemon '{name}' not found."}
-
-async def get_pokemon_wiki(name: str) -> Optional[dict[str, Any]]:
+    resolved, candidates = await _resolve_pokemon_name(name)
+    if resolved is None:
+        return _pokemon_not_found(name, candidates)
+    pokedex = _pokedex()
+    if pokedex is not None:
+        pokemon = pokedex.get(resolved)
+    else:
+        pokemon = await fetch_pokemon(resolved)
+    if pokemon is None:
+        return _pokemon_not_found(name, candidates)
+    return pokemon.project(_pokemon_projection())
+
+async def get_pokemon_wiki(name: str) -> str | dict[str, Any] | None:
     """Get a Pokemon's wiki page."""
-    normalized = name.split("-")[0] if "-" in name else name
-    normalized = normalized.lower()
+    resolved, candidates = await _resolve_pokemon_name(name)
+    if resolved is None:
+        return _pokemon_not_found(name, candidates)
+    pokedex = _pokedex()
+    if pokedex is not None:
+        species = pokedex.species(resolved)
+        if species is None:
+            return _pokemon_not_found(name, candidates)
+        return f"https://pokemondb.net/pokedex/{species}"
+
+    normalized = resolved.split("-")[0]
     url = f"https://pokemondb.net/pokedex/{normalized}"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                return url
-            else:
-                return {"error": f"Pokemon '{name}' not found."}
+    session = get_http_session("public")
+    # HEAD keeps the probe cheap and lets the connection go back to the pool
+    # without draining an HTML body.
+    async with session.head(url, allow_redirects=True) as response:
+        if response.status == 200:
+            return url
+        else:
+            return {"error": f"Pokemon '{name}' not found."}
+
+async def _quotes_api_result(response: aiohttp.ClientResponse) -> Any:
+    """Return the JSON body of a quotes API response, or `{"error": ...}` if it failed.
+
+    The API rejects a request (slot taken, past date, duplicate email...) with a
+    non-2xx status and a `{"detail": ...}` body; the detail becomes the error.
+    """
+    if response.status == 500:
+        return {"error": "Internal server error. Please try again later."}
+    body = await response.json(content_type=None)
+    if 200 <= response.status < 300:
+        return body
+    detail = body.get("detail", body) if isinstance(body, dict) else body
+    return {"error": detail or f"HTTP {response.status}"}
+
 @tool
 async def schedule_quote(name: str, gmail: str, date: datetime) -> Optional[dict]:
     """Schedule a quote for a specific date."""
     print("TOOL schedule_quote fue invocada")
-    url = "http://localhost:8001/quotes/schedule"
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            url, json={"name": name, "gmail": gmail, "date": date.isoformat()},
-        ) as response:
-            if response.status == 200:
-                return await response.json()
-            elif response.status == 500:
-                return {"error": "Internal server error. Please try again later."}
-            else:
-                return await response.json()  # Devuelve el error tal cual si no es 500
+    url = f"{Configuration.from_context().quotes_api_url}/schedule"
+    session = get_http_session("quotes")
+    async with session.post(
+        url, json={"name": name, "gmail": gmail, "date": date.isoformat()},
+    ) as response:
+        return await _quotes_api_result(response)
 
 async def check_availability(date: datetime) -> Optional[dict]:
     """Check availability for a given date."""
-    url = f"http://localhost:8001/quotes/schedule?date={date.isoformat()}"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                return await response.json()
-            elif response.status == 500:
-                return {"error": "Internal server error. Please try again later."}
-            else:
-                return await response.json()  # Devuelve el error tal cual si no es 500
+    url = f"{Configuration.from_context().quotes_api_url}/schedule?date={date.isoformat()}"
+    session = get_http_session("quotes")
+    async with session.get(url) as response:
+        return await _quotes_api_result(response)
+
+async def check_availability_range(
+    start: datetime, end: datetime
+) -> dict[str, Any] | None:
+    """Check availability for every day between start and end (both included) in one call.
+
+    Returns `slots`, the start time of each slot, and `free`, a bitmask per day
+    where bit i set means `slots[i]` is free on that day (0 means the day is full).
+    """
+    url = f"{Configuration.from_context().quotes_api_url}/schedule/range"
+    session = get_http_session("quotes")
+    async with session.get(
+        url, params={"start": start.date().isoformat(), "end": end.date().isoformat()}
+    ) as response:
+        return cast(dict[str, Any], await _quotes_api_result(response))
 
 async def reschedule_quote(gmail: str, new_date: datetime) -> Optional[dict]:
     """Reschedule a quote to a new date."""
-    url = "http://localhost:8001/quotes/reschedule"
-    async with aiohttp.ClientSession() as session:
-        async with session.put(
-            url, json={"gmail": gmail, "new_date": new_date.isoformat()}
-        ) as response:
-            if response.status == 200:
-                return await response.json()
-            elif response.status == 500:
-                return {"error": "Internal server error. Please try again later."}
-            else:
-                return await response.json()  # Devuelve el error tal cual si no es 500
+    url = f"{Configuration.from_context().quotes_api_url}/reschedule"
+    session = get_http_session("quotes")
+    async with session.put(
+        url, json={"gmail": gmail, "new_date": new_date.isoformat()}
+    ) as response:
+        return await _quotes_api_result(response)
 
 async def cancel_quote(gmail: str) -> Optional[dict]:
     """Cancel a scheduled quote."""
-    url = "http://localhost:8001/quotes/cancel"
-    async with aiohttp.ClientSession() as session:
-        async with session.put(
-            url, json={"gmail": gmail}
-        ) as response:
-            if response.status == 200:
-                return await response.json()
-            elif response.status == 500:
-                return {"error": "Internal server error. Please try again later."}
-            else:
-                return await response.json()  # Devuelve el error tal cual si no es 500
+    url = f"{Configuration.from_context().quotes_api_url}/cancel"
+    session = get_http_session("quotes")
+    async with session.put(
+        url, json={"gmail": gmail}
+    ) as response:
+        return await _quotes_api_result(response)
 
 @tool
 async def send_email(gmail: str) -> Optional[dict]:
-    """Send an email to the specified Gmail address."""
-    url = "http://localhost:8001/quotes/send"
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, params={"gmail": gmail}) as response:
-            if response.status == 200:
-                return await response.json()
-            elif response.status == 500:
-                return {"error": "Internal server error. Please try again later."}
-            else:
-                return await response.json()  # Devuelve el error tal cual si no es 500
+    """Send the appointment confirmation email to the specified Gmail address.
+
+    The quotes API queues the email and delivers it in the background, so the
+    answer (`status: pending` and an `id`) means it was accepted, not yet sent.
+    """
+    url = f"{Configuration.from_context().quotes_api_url}/send"
+    session = get_http_session("quotes")
+    async with session.post(url, params={"gmail": gmail}) as response:
+        return await _quotes_api_result(response)
 
 TOOLS: List[Callable[..., Any]] = [search]
 
@@ -136,6 +192,7 @@ POKEMONTOOLS: List[Callable[..., Any]] = [search_pokemon_by_name, get_pokemon_wi
 QUOTETOOLS: List[Callable[..., Any]] = [
     schedule_quote,
     check_availability,
+    check_availability_range,
     reschedule_quote,
     cancel_quote,
 ]
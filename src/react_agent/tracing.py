@@ -0,0 +1,313 @@
+"""Lightweight tracing of graph nodes, model calls, tools and HTTP requests.
+
+Set `Configuration.trace_path` (or the `REACT_AGENT_TRACE_PATH` environment
+variable) and every instrumented operation appends one JSON line to that file:
+
+    {"trace_id": ..., "span_id": ..., "parent_id": ..., "name": "node:pokemon_expert",
+     "kind": "node", "start": 1718000000.123, "duration_ms": 812.4,
+     "status": "ok", "attributes": {...}}
+
+Spans nest through a context variable, so a node span is the parent of the
+model, tool and HTTP spans it causes. HTTP requests carry a W3C `traceparent`
+header, and the quotes API writes its database and SMTP spans in the same
+format, so both files can be reported on together. When
+`Configuration.trace_otel` is set and `opentelemetry` is installed, every
+span is also mirrored to the OpenTelemetry tracer.
+
+Summarize one or more trace files with:
+
+    react-agent-trace report traces.jsonl quotes-traces.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import importlib
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import IO, Any, Awaitable, Callable, Iterable, Iterator, TypeVar
+
+import aiohttp
+
+from react_agent.configuration import Configuration
+from react_agent.metrics import percentile
+from react_agent.state import State
+
+otel_trace: Any
+try:
+    otel_trace = importlib.import_module("opentelemetry.trace")
+except ImportError:  # pragma: no cover - optional dependency
+    otel_trace = None
+
+Node = Callable[[State], Awaitable[dict[str, Any]]]
+N = TypeVar("N", bound=Node)
+
+_current: ContextVar[Span | None] = ContextVar("react_agent_span", default=None)
+_files: dict[str, IO[str]] = {}
+_files_lock = threading.Lock()
+
+
+@dataclass
+class Span:
+    """One timed operation. Attributes can be added until it ends."""
+
+    name: str
+    kind: str
+    path: str
+    trace_id: str
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    parent_id: str | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    start: float = field(default_factory=time.time)
+    status: str = "ok"
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+    _otel: Any = field(default=None, repr=False)
+
+    def set(self, **attributes: Any) -> None:
+        """Attach attributes (token counts, payload sizes, status codes...)."""
+        self.attributes.update(attributes)
+
+    @property
+    def traceparent(self) -> str:
+        """W3C trace context header value pointing at this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def end(self, error: BaseException | None = None) -> None:
+        """Finish the span and write it to the trace file."""
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        if error is not None:
+            self.status = "error"
+            self.attributes["error"] = repr(error)
+        _write(
+            self.path,
+            {
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                "name": self.name,
+                "kind": self.kind,
+                "start": self.start,
+                "duration_ms": round(duration_ms, 3),
+                "status": self.status,
+                "attributes": self.attributes,
+            },
+        )
+        if self._otel is not None:
+            self._otel.set_attributes(_otel_attributes(self.attributes))
+            if error is not None:
+                self._otel.record_exception(error)
+            self._otel.end()
+
+
+def _otel_attributes(attributes: dict[str, Any]) -> dict[str, Any]:
+    allowed = (str, bool, int, float)
+    return {k: v if isinstance(v, allowed) else str(v) for k, v in attributes.items()}
+
+
+def _write(path: str, record: dict[str, Any]) -> None:
+    if not path:
+        return
+    line = json.dumps(record, default=str) + "\n"
+    with _files_lock:
+        handle = _files.get(path)
+        if handle is None:
+            handle = _files[path] = open(
+                os.path.expanduser(path), "a", encoding="utf-8"
+            )
+        handle.write(line)
+        handle.flush()
+
+
+def _settings() -> tuple[str, bool]:
+    configuration = Configuration.from_context()
+    path = configuration.trace_path or os.environ.get("REACT_AGENT_TRACE_PATH", "")
+    return path, configuration.trace_otel and otel_trace is not None
+
+
+def start_span(name: str, kind: str = "internal", **attributes: Any) -> Span | None:
+    """Start a span under the current one, or return `None` if tracing is off.
+
+    The span is not made current; use `span()` for spans that have children.
+    """
+    path, otel = _settings()
+    if not path and not otel:
+        return None
+    parent = _current.get()
+    new = Span(
+        name=name,
+        kind=kind,
+        path=path,
+        trace_id=parent.trace_id if parent else secrets.token_hex(16),
+        parent_id=parent.span_id if parent else None,
+        attributes=attributes,
+    )
+    if otel:
+        # Nest under the parent's OTel span, or every span becomes its own trace.
+        context = (
+            otel_trace.set_span_in_context(parent._otel)
+            if parent is not None and parent._otel is not None
+            else None
+        )
+        new._otel = otel_trace.get_tracer("react_agent").start_span(
+            name, context=context
+        )
+    return new
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Span | None]:
+    """Trace the enclosed block as a child of the current span."""
+    current = start_span(name, kind, **attributes)
+    if current is None:
+        yield None
+        return
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        _current.reset(token)
+        current.end(e)
+        raise
+    _current.reset(token)
+    current.end()
+
+
+def current_span() -> Span | None:
+    """Return the innermost active span, if any."""
+    return _current.get()
+
+
+def traced_node(name: str) -> Callable[[N], N]:
+    """Trace every run of a graph node as `node:<name>`."""
+
+    def decorator(node: N) -> N:
+        @functools.wraps(node)
+        async def wrapper(state: State) -> dict[str, Any]:
+            with span(f"node:{name}", "node", messages_in=len(state.messages)) as s:
+                result = await node(state)
+                if s is not None:
+                    produced = result.get("messages", [])
+                    s.set(
+                        messages_out=len(produced),
+                        payload_chars=sum(len(str(m.content)) for m in produced),
+                    )
+                return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+async def _on_request_start(
+    session: aiohttp.ClientSession,
+    context: Any,
+    params: aiohttp.TraceRequestStartParams,
+) -> None:
+    context.span = start_span(
+        f"http:{params.method} {params.url.host}", "http", url=str(params.url)
+    )
+    parent = context.span or current_span()
+    if parent is not None:
+        params.headers["traceparent"] = parent.traceparent
+
+
+async def _on_request_end(
+    session: aiohttp.ClientSession,
+    context: Any,
+    params: aiohttp.TraceRequestEndParams,
+) -> None:
+    if context.span is not None:
+        context.span.set(
+            status_code=params.response.status,
+            response_bytes=params.response.content_length,
+        )
+        context.span.end()
+
+
+async def _on_request_exception(
+    session: aiohttp.ClientSession,
+    context: Any,
+    params: aiohttp.TraceRequestExceptionParams,
+) -> None:
+    if context.span is not None:
+        context.span.end(params.exception)
+
+
+def http_trace_config() -> aiohttp.TraceConfig:
+    """Return an aiohttp trace config that records a span per request."""
+    config = aiohttp.TraceConfig()
+    config.on_request_start.append(_on_request_start)
+    config.on_request_end.append(_on_request_end)
+    config.on_request_exception.append(_on_request_exception)
+    return config
+
+
+def read_spans(paths: Iterable[str]) -> Iterator[dict[str, Any]]:
+    """Yield the span records stored in the JSONL files at `paths`."""
+    for path in paths:
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def summarize(spans: Iterable[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Aggregate span durations by name: count, errors, p50/p95/p99 and total."""
+    durations: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    for record in spans:
+        durations[record["name"]].append(record["duration_ms"])
+        errors[record["name"]] += record.get("status") == "error"
+    return {
+        name: {
+            "count": len(values),
+            "errors": errors[name],
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+            "total_ms": sum(values),
+        }
+        for name, values in durations.items()
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command line entry point: `react-agent-trace report FILE [FILE ...]`."""
+    parser = argparse.ArgumentParser(prog="react-agent-trace")
+    commands = parser.add_subparsers(dest="command", required=True)
+    report = commands.add_parser("report", help="per-span latency percentiles")
+    report.add_argument("paths", nargs="+", help="JSONL trace files")
+    report.add_argument("--kind", help="only spans of this kind (node, model, ...)")
+    args = parser.parse_args(argv)
+
+    spans = read_spans(args.paths)
+    if args.kind:
+        spans = (s for s in spans if s.get("kind") == args.kind)
+    rows = sorted(
+        summarize(spans).items(), key=lambda r: r[1]["total_ms"], reverse=True
+    )
+    width = max((len(name) for name, _ in rows), default=4)
+    lines = [
+        f"{'span':<{width}}  {'count':>6}  {'errors':>6}  "
+        f"{'p50 ms':>9}  {'p95 ms':>9}  {'p99 ms':>9}  {'total ms':>10}"
+    ]
+    lines.extend(
+        f"{name:<{width}}  {row['count']:>6}  {row['errors']:>6}  "
+        f"{row['p50_ms']:>9.1f}  {row['p95_ms']:>9.1f}  {row['p99_ms']:>9.1f}  "
+        f"{row['total_ms']:>10.1f}"
+        for name, row in rows
+    )
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    main()
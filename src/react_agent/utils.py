@@ -1,8 +1,17 @@
 """Utility & helper functions."""
 
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Hashable, Sequence, cast
+
 from langchain.chat_models import init_chat_model
-from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
 from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable
 
 
 def get_message_text(msg: BaseMessage) -> str:
@@ -17,11 +26,132 @@ def get_message_text(msg: BaseMessage) -> str:
         return "".join(txts).strip()
 
 
-def load_chat_model(fully_specified_name: str) -> BaseChatModel:
+def load_chat_model(fully_specified_name: str, **model_kwargs: Any) -> BaseChatModel:
     """Load a chat model from a fully specified name.
 
     Args:
         fully_specified_name (str): String in the format 'provider/model'.
+        **model_kwargs: Extra keyword arguments forwarded to `init_chat_model`.
     """
     provider, model = fully_specified_name.split("/", maxsplit=1)
-    return init_chat_model(model, model_provider=provider)
+    return cast(
+        BaseChatModel, init_chat_model(model, model_provider=provider, **model_kwargs)
+    )
+
+
+ChatRunnable = Runnable[LanguageModelInput, BaseMessage]
+
+
+@dataclass
+class RegistryStats:
+    """Counters describing how well the model registry is reusing models."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the registry."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def _tool_key(tool: Any) -> Hashable:
+    """Return a stable identity for a tool passed to `bind_tools`."""
+    if isinstance(tool, dict):
+        return json.dumps(tool, sort_keys=True, default=repr)
+    name = getattr(tool, "name", None) or getattr(tool, "__qualname__", None)
+    return (getattr(tool, "__module__", None), name, id(tool))
+
+
+def _kwargs_key(model_kwargs: dict[str, Any]) -> str:
+    return json.dumps(model_kwargs, sort_keys=True, default=repr)
+
+
+class ChatModelRegistry:
+    """Process-wide, bounded registry of initialized (and tool-bound) chat models.
+
+    Building a chat model means provider setup, a fresh HTTP client and, when
+    tools are bound, converting every tool into its JSON schema. The registry
+    keeps the result keyed by model name, bound tool set and model kwargs so
+    every node invocation after the first reuses the same client and its
+    connection pool. Least recently used entries are evicted past `maxsize`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 32,
+        loader: Callable[..., BaseChatModel] = load_chat_model,
+    ) -> None:
+        """Create an empty registry holding at most `maxsize` models."""
+        self.maxsize = maxsize
+        self.loader = loader
+        self._models: OrderedDict[Hashable, ChatRunnable] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = RegistryStats()
+
+    def get(
+        self,
+        fully_specified_name: str,
+        tools: Sequence[Any] | None = None,
+        **model_kwargs: Any,
+    ) -> ChatRunnable:
+        """Return a cached model for the given name, tools and kwargs, building it on a miss."""
+        key = (
+            fully_specified_name,
+            tuple(_tool_key(t) for t in tools) if tools else None,
+            _kwargs_key(model_kwargs),
+        )
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                self._stats.hits += 1
+                return model
+            self._stats.misses += 1
+
+        # Build outside the lock so a slow provider setup does not block lookups
+        # of models that are already warm.
+        built: ChatRunnable = self.loader(fully_specified_name, **model_kwargs)
+        if tools:
+            built = built.bind_tools(tools)  # type: ignore[attr-defined]
+
+        with self._lock:
+            # Another thread may have raced us to build the same model; keep theirs.
+            model = self._models.setdefault(key, built)
+            self._models.move_to_end(key)
+            while len(self._models) > self.maxsize:
+                self._models.popitem(last=False)
+                self._stats.evictions += 1
+            return model
+
+    def stats(self) -> RegistryStats:
+        """Return a snapshot of the registry counters."""
+        with self._lock:
+            return RegistryStats(**{**asdict(self._stats), "size": len(self._models)})
+
+    def clear(self) -> None:
+        """Drop every cached model and reset the counters."""
+        with self._lock:
+            self._models.clear()
+            self._stats = RegistryStats()
+
+
+model_registry = ChatModelRegistry()
+
+
+def get_chat_model(
+    fully_specified_name: str,
+    tools: Sequence[Any] | None = None,
+    **model_kwargs: Any,
+) -> ChatRunnable:
+    """Get a (tool-bound) chat model from the process-wide registry.
+
+    Args:
+        fully_specified_name (str): String in the format 'provider/model'.
+        tools: Tools to bind to the model, if any.
+        **model_kwargs: Extra keyword arguments forwarded to `init_chat_model`.
+    """
+    return model_registry.get(fully_specified_name, tools, **model_kwargs)
@@ -0,0 +1,28 @@
+"""HTTP app mounted by the LangGraph server for its lifespan hooks.
+
+`langgraph.json` points `http.app` here, so the server runs `lifespan` on the
+event loop that executes the graphs. On shutdown it closes the pooled HTTP
+sessions the tools opened (see `react_agent.http_client`). Scripts that run
+the graphs outside the server should call `close_http_sessions()` themselves.
+"""
+
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from starlette.applications import Starlette
+
+from react_agent.http_client import close_http_sessions
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette) -> AsyncIterator[None]:
+    """Close the shared HTTP sessions when the server shuts down."""
+    try:
+        yield
+    finally:
+        await close_http_sessions()
+
+
+app = Starlette(lifespan=lifespan)
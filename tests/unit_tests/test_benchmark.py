@@ -0,0 +1,30 @@
+import asyncio
+
+from react_agent.benchmark import format_results, run_benchmark
+
+
+def test_benchmark_runs_every_graph_offline() -> None:
+    results = asyncio.run(
+        run_benchmark(concurrency=(1, 3), model_latency=0, runs_per_thread=2)
+    )
+
+    assert [(r.scenario, r.concurrency) for r in results] == [
+        ("general", 1),
+        ("general", 3),
+        ("pokemon", 1),
+        ("pokemon", 3),
+        ("appointment", 1),
+        ("appointment", 3),
+    ]
+    assert all(r.errors == 0 and r.runs == 2 * r.concurrency for r in results)
+    assert all(r.memory_per_thread_kb for r in results)
+    steps = {r.scenario: list(r.step_ms) for r in results}
+    assert steps["pokemon"] == ["pokemon_expert", "pokemon_tools", "fun_facts"]
+    assert steps["appointment"] == [
+        "appointment_fast_path",
+        "appointment_manager",
+        "quotetools",
+        "email_sender",
+        "emailtool",
+    ]
+    assert "appointment" in format_results(results)
@@ -0,0 +1,101 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from react_agent.compaction import compact_messages, count_tokens
+from react_agent.configuration import Configuration
+
+
+def _history(turns: int) -> list:
+    messages: list = []
+    for i in range(turns):
+        messages += [
+            HumanMessage(content=f"question {i}", id=f"h{i}"),
+            AIMessage(
+                content="",
+                id=f"a{i}",
+                tool_calls=[{"name": "search", "args": {"q": str(i)}, "id": f"c{i}"}],
+            ),
+            ToolMessage(content="x" * 5000, tool_call_id=f"c{i}", id=f"t{i}"),
+            AIMessage(content=f"answer {i}", id=f"r{i}"),
+        ]
+    return messages
+
+
+def test_none_strategy_keeps_history() -> None:
+    messages = _history(3)
+    config = Configuration(compaction_strategy="none")
+    assert compact_messages(messages, config) == messages
+
+
+def test_old_tool_results_are_truncated() -> None:
+    messages = _history(3)
+    config = Configuration(
+        compaction_strategy="truncate_tool_results",
+        compaction_keep_recent=4,
+        compaction_tool_result_chars=100,
+    )
+
+    compacted = compact_messages(messages, config)
+
+    assert len(compacted) == len(messages)
+    tool_results = [m for m in compacted if isinstance(m, ToolMessage)]
+    assert [len(m.content) < 200 for m in tool_results] == [True, True, False]
+    assert [m.tool_call_id for m in tool_results] == ["c0", "c1", "c2"]
+
+
+def test_sliding_window_respects_budget_and_tool_pairs() -> None:
+    messages = _history(10)
+    config = Configuration(
+        compaction_strategy="sliding_window",
+        compaction_max_tokens=1500,
+        compaction_keep_recent=4,
+        compaction_tool_result_chars=100,
+    )
+
+    compacted = compact_messages(messages, config)
+
+    assert compacted[-1] is messages[-1]
+    assert sum(count_tokens(m) for m in compacted) <= 1500
+    assert not isinstance(compacted[0], ToolMessage)
+    call_ids = {
+        c["id"] for m in compacted if isinstance(m, AIMessage) for c in m.tool_calls
+    }
+    assert all(
+        m.tool_call_id in call_ids for m in compacted if isinstance(m, ToolMessage)
+    )
+
+
+def test_sliding_window_keeps_the_turn_of_an_oversized_tool_result() -> None:
+    calls = [
+        {"name": "search", "args": {"q": q}, "id": f"big-{q}"} for q in ("a", "b")
+    ]
+    current_turn = [
+        HumanMessage(content="compare a and b", id="h-big"),
+        AIMessage(content="", id="a-big", tool_calls=calls),
+        ToolMessage(content="y" * 20000, tool_call_id="big-a", id="t-big-a"),
+        ToolMessage(content="z" * 20000, tool_call_id="big-b", id="t-big-b"),
+    ]
+    messages = _history(3) + current_turn
+    config = Configuration(
+        compaction_strategy="sliding_window",
+        compaction_max_tokens=1500,
+        compaction_keep_recent=4,
+    )
+
+    assert compact_messages(messages, config) == current_turn
+    # A single trailing result over budget also brings its call and question.
+    assert compact_messages(messages[:-1], config) == current_turn[:-1]
+
+
+def test_sliding_window_starts_on_a_question() -> None:
+    messages = _history(10)
+    config = Configuration(
+        compaction_strategy="sliding_window",
+        compaction_max_tokens=1400,
+        compaction_keep_recent=4,
+        compaction_tool_result_chars=100,
+    )
+
+    for end in range(1, len(messages) + 1):
+        compacted = compact_messages(messages[:end], config)
+        assert isinstance(compacted[0], HumanMessage)
+        assert compacted[-1] is messages[end - 1]
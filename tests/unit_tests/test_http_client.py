@@ -0,0 +1,44 @@
+import asyncio
+
+from react_agent.http_client import (
+    PoolSettings,
+    close_http_sessions,
+    get_http_session,
+)
+from react_agent.webapp import app, lifespan
+
+
+def test_sessions_are_shared_per_pool_and_closed_on_shutdown() -> None:
+    async def run() -> None:
+        public = get_http_session("public")
+        assert get_http_session("public") is public
+
+        quotes = get_http_session("quotes", PoolSettings(limit_per_host=3))
+        assert quotes is not public
+        assert quotes.connector is not None
+        assert quotes.connector.limit_per_host == 3
+
+        await close_http_sessions()
+        assert public.closed and quotes.closed
+        assert get_http_session("public") is not public
+        await close_http_sessions()
+
+    asyncio.run(run())
+
+
+def test_sessions_are_not_shared_across_event_loops() -> None:
+    async def grab() -> object:
+        session = get_http_session("public")
+        await close_http_sessions()
+        return session
+
+    assert asyncio.run(grab()) is not asyncio.run(grab())
+
+
+def test_server_lifespan_closes_sessions() -> None:
+    async def run() -> bool:
+        async with lifespan(app):
+            session = get_http_session("quotes")
+        return session.closed
+
+    assert asyncio.run(run())
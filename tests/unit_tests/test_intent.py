@@ -0,0 +1,77 @@
+import asyncio
+from typing import Any
+
+from langchain_core.messages import HumanMessage
+
+from react_agent.benchmark import FAKE_MODEL, StubServices, scripted_models
+from react_agent.configuration import Configuration
+from react_agent.graph import graph_router
+from react_agent.http_client import close_http_sessions
+from react_agent.intent import classify_intent, classify_keywords
+from react_agent.state import State
+
+
+def test_keyword_routes() -> None:
+    config = Configuration()
+    assert classify_keywords("¿Qué tipo es Pikachu?", config)[0] == "pokemon"
+    assert classify_keywords("Quiero agendar una cita", config)[0] == "appointment"
+    assert classify_keywords("hola", config)[0] is None
+
+
+def test_follow_up_stays_on_the_current_route() -> None:
+    config = Configuration()
+    follow_up = [HumanMessage(content="ana@example.org")]
+    assert classify_keywords("mi correo es ana", config)[0] is None
+    state = State(messages=[HumanMessage(content="me llamo Ana")], route="appointment")
+    assert asyncio.run(classify_intent(state, config)) == "appointment"
+    assert (
+        asyncio.run(classify_intent(State(messages=follow_up), config)) == "appointment"
+    )
+    assert (
+        asyncio.run(classify_intent(State(messages=[HumanMessage("hi")]), config))
+        == "general"
+    )
+
+
+def test_router_graph_dispatches_to_sub_agents() -> None:
+    async def answered_by(request: str) -> tuple[str | None, set[str]]:
+        async with StubServices() as stubs:
+            config = {
+                "configurable": {
+                    "model": FAKE_MODEL,
+                    "response_cache": False,
+                    "pokeapi_url": stubs.pokeapi_url,
+                    "pokeapi_cache_dir": "",
+                    "quotes_api_url": stubs.quotes_url,
+                }
+            }
+            route = None
+            sub_agents: set[str] = set()
+            try:
+                async for namespace, update in graph_router.astream(
+                    {"messages": [HumanMessage(content=request)]},
+                    config,
+                    stream_mode="updates",
+                    subgraphs=True,
+                ):
+                    if namespace:
+                        sub_agents.add(namespace[0].split(":")[0])
+                    elif "route_request" in update:
+                        route = update["route_request"]["route"]
+            finally:
+                await close_http_sessions()
+        return route, sub_agents
+
+    def run(request: str) -> Any:
+        with scripted_models():
+            return asyncio.run(answered_by(request))
+
+    assert run("¿Qué tipo es pikachu?") == ("pokemon", {"pokemon"})
+    assert run("Quiero agendar una cita") == ("appointment", {"appointment"})
+    assert run("hola") == ("general", {"general"})
+
+
+def test_route_models_override_the_default_model() -> None:
+    config = Configuration(route_models={"pokemon": "fireworks/small"})
+    assert config.model_for("pokemon") == "fireworks/small"
+    assert config.model_for("appointment") == config.model
@@ -0,0 +1,90 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+
+from react_agent import pokeapi
+from react_agent.http_client import close_http_sessions
+
+PIKACHU = json.loads((Path(__file__).parent / "fixtures" / "pikachu.json").read_text())
+
+
+@pytest.fixture(autouse=True)
+def _reset_cache(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    pokeapi.clear_cache()
+    pokeapi._disk.clear()
+    yield
+    pokeapi.clear_cache()
+    pokeapi._disk.clear()
+
+
+async def _serve(requests: list[str], monkeypatch: pytest.MonkeyPatch) -> web.AppRunner:
+    async def handler(request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        requests.append(name)
+        await asyncio.sleep(0.01)
+        if name == "pikachu":
+            return web.json_response(PIKACHU)
+        return web.Response(status=404)
+
+    app = web.Application()
+    app.router.add_get("/api/v2/pokemon/{name}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    monkeypatch.setattr(pokeapi, "POKEAPI_URL", f"http://127.0.0.1:{port}/api/v2")
+    return runner
+
+
+def test_fetch_pokemon_is_cached_and_deduplicated(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    requests: list[str] = []
+
+    async def run() -> None:
+        runner = await _serve(requests, monkeypatch)
+        try:
+            results = await asyncio.gather(
+                *(pokeapi.fetch_pokemon(" Pikachu ") for _ in range(5))
+            )
+            assert all(r is not None and r.name == "pikachu" for r in results)
+            assert await pokeapi.fetch_pokemon("pikachu") is results[0]
+
+            assert await pokeapi.fetch_pokemon("missingno") is None
+            assert await pokeapi.fetch_pokemon("missingno") is None
+        finally:
+            await close_http_sessions()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+    assert requests == ["pikachu", "missingno"]
+    stats = pokeapi.cache_stats()
+    assert stats["downloads"] == 2
+    assert stats["deduplicated"] == 4
+    assert stats["memory"]["hits"] == 2
+
+
+def test_fetch_pokemon_reads_back_from_disk(monkeypatch: pytest.MonkeyPatch) -> None:
+    requests: list[str] = []
+
+    async def run() -> None:
+        runner = await _serve(requests, monkeypatch)
+        try:
+            await pokeapi.fetch_pokemon("pikachu")
+            pokeapi.clear_cache()
+            pokemon = await pokeapi.fetch_pokemon("pikachu")
+            assert pokemon is not None and pokemon.types == ["electric"]
+        finally:
+            await close_http_sessions()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+    assert requests == ["pikachu"]
+    assert pokeapi.cache_stats()["disk"]["hits"] == 1
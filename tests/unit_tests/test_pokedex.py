@@ -0,0 +1,86 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+from pydantic import ValidationError
+
+from react_agent.pokedex import PokedexSnapshot, write_snapshot
+from react_agent.pokemon_shcema import (
+    PokemonProjection,
+    PokemonSchema,
+    PokemonSchemaAPI,
+)
+from react_agent.tools import get_pokemon_wiki, search_pokemon_by_name
+
+FIXTURE = Path(__file__).parent / "fixtures" / "pikachu.json"
+
+
+def _fixture_snapshot(path: Path) -> Path:
+    data = json.loads(FIXTURE.read_text())
+    pikachu = PokemonSchema.from_api(PokemonSchemaAPI(**data))
+    alola = pikachu.model_copy(update={"id": 10100, "name": "raichu-alola"})
+    write_snapshot(path, [(pikachu, "pikachu"), (alola, "raichu")])
+    return path
+
+
+def test_snapshot_round_trip(tmp_path: Path) -> None:
+    snapshot = PokedexSnapshot(_fixture_snapshot(tmp_path / "pokedex.sqlite"))
+
+    assert len(snapshot) == 2
+    assert "raichu-alola" in snapshot
+    assert snapshot.species("raichu-alola") == "raichu"
+    pikachu = snapshot.get("pikachu")
+    assert pikachu is not None
+    assert pikachu.types == ["electric"]
+    assert {"speed": 90} in pikachu.stats
+    assert snapshot.get("missingno") is None
+
+
+def test_pokemon_tools_answer_from_snapshot(tmp_path: Path) -> None:
+    path = _fixture_snapshot(tmp_path / "pokedex.sqlite")
+    config = {"configurable": {"pokedex_snapshot_path": str(path)}}
+
+    async def run() -> tuple:
+        search = RunnableLambda(search_pokemon_by_name)
+        wiki = RunnableLambda(get_pokemon_wiki)
+        return (
+            await search.ainvoke("Pikachu", config),
+            await search.ainvoke("missingno", config),
+            await wiki.ainvoke("raichu-alola", config),
+        )
+
+    found, missing, url = asyncio.run(run())
+
+    assert found["id"] == 25
+    assert found["stats"]["speed"] == 90
+    assert missing == {"error": "Pokemon 'missingno' not found."}
+    assert url == "https://pokemondb.net/pokedex/raichu"
+
+
+def test_search_pokemon_projects_payload(tmp_path: Path) -> None:
+    path = _fixture_snapshot(tmp_path / "pokedex.sqlite")
+    config = {
+        "configurable": {
+            "pokedex_snapshot_path": str(path),
+            "pokemon_fields": ["name", "types", "moves"],
+            "pokemon_max_moves": 2,
+        }
+    }
+
+    found = asyncio.run(
+        RunnableLambda(search_pokemon_by_name).ainvoke("pikachu", config)
+    )
+
+    assert found == {
+        "name": "pikachu",
+        "types": ["electric"],
+        "moves": ["mega-punch", "pay-day"],
+        "move_count": 7,
+    }
+
+
+def test_projection_rejects_unknown_fields() -> None:
+    with pytest.raises(ValidationError, match=r"Unknown Pokémon field\(s\) \['type'\]"):
+        PokemonProjection(fields=["name", "type"])
@@ -0,0 +1,55 @@
+import pytest
+
+from react_agent.pokemon_names import BKTree, NameIndex, normalize_query
+
+NAMES = [
+    "pikachu",
+    "raichu",
+    "raichu-alola",
+    "charizard",
+    "charizard-mega-x",
+    "charizard-mega-y",
+    "mr-mime",
+    "mr-mime-galar",
+    "nidoran-f",
+    "nidoran-m",
+]
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("Raichu de Alola", "raichu-alola"),
+        ("alolan raichu", "raichu-alola"),
+        ("raichu-alola", "raichu-alola"),
+        ("Mega Charizard X", "charizard-mega-x"),
+        ("Mr. Mime", "mr-mime"),
+        ("mr mime de galar", "mr-mime-galar"),
+        ("Nidoran hembra", "nidoran-f"),
+        ("Pikachú", "pikachu"),
+    ],
+)
+def test_normalize_query(query: str, expected: str) -> None:
+    assert normalize_query(query) == expected
+
+
+def test_bk_tree_finds_near_matches() -> None:
+    tree = BKTree(NAMES)
+    assert tree.search("pikachuu", 1) == [(1, "pikachu")]
+    assert tree.search("zzz", 1) == []
+
+
+def test_index_resolves_exact_fuzzy_and_ambiguous_names() -> None:
+    index = NameIndex(NAMES)
+
+    assert index.resolve("raichu de alola").name == "raichu-alola"
+    assert index.resolve("pikachuu").name == "pikachu"
+
+    ambiguous = index.resolve("nidoran")
+    assert ambiguous.name is None
+    assert ambiguous.candidates == ["nidoran-f", "nidoran-m"]
+
+    assert index.resolve("charizard mega").candidates == [
+        "charizard-mega-x",
+        "charizard-mega-y",
+    ]
@@ -0,0 +1,50 @@
+from datetime import UTC, datetime
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from react_agent import metrics
+from react_agent.configuration import Configuration
+from react_agent.prompting import build_prompt, format_system_time
+
+
+def test_system_time_granularity() -> None:
+    now = datetime(2024, 5, 6, 7, 8, 9, 123456, tzinfo=UTC)
+    assert format_system_time("day", now) == "2024-05-06"
+    assert format_system_time("hour", now) == "2024-05-06T07:00:00+00:00"
+    assert format_system_time("minute", now) == "2024-05-06T07:08:00+00:00"
+
+
+def test_prompt_prefix_is_stable_and_marked_for_anthropic() -> None:
+    config = Configuration(system_time_granularity="day")
+    history = [HumanMessage(content="hi")]
+
+    first = build_prompt(
+        "Be brief. {system_time}", history, config, model="anthropic/x"
+    )
+    second = build_prompt(
+        "Be brief. {system_time}", history, config, model="anthropic/x"
+    )
+    assert first[0] == second[0]
+    assert first[0].content[0]["cache_control"] == {"type": "ephemeral"}
+
+    other = build_prompt("Be brief. {system_time}", history, config, model="openai/x")
+    assert isinstance(other[0].content, str)
+
+
+def test_record_usage_reports_cached_tokens() -> None:
+    metrics.reset_metrics()
+    response = AIMessage(
+        content="",
+        usage_metadata={
+            "input_tokens": 1000,
+            "output_tokens": 10,
+            "total_tokens": 1010,
+            "input_token_details": {"cache_read": 800},
+        },
+    )
+    metrics.record_usage("call_model", response)
+
+    stats = metrics.usage_stats()["call_model"]
+    assert stats["cache_read_tokens"] == 800
+    assert stats["uncached_input_tokens"] == 200
+    assert stats["cached_input_ratio"] == 0.8
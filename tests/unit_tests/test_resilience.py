@@ -0,0 +1,72 @@
+import asyncio
+import time
+from typing import Any
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+from react_agent import metrics
+from react_agent.streaming import invoke_model
+
+
+class SlowChatModel(BaseChatModel):
+    """Fake chat model that sleeps `delays[i]` seconds on its i-th call."""
+
+    delays: list[float]
+    reply: str = "ok"
+    error: str = ""
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def _generate(self, messages: list[BaseMessage], **kwargs: Any) -> ChatResult:
+        raise NotImplementedError
+
+    async def _agenerate(
+        self, messages: list[BaseMessage], **kwargs: Any
+    ) -> ChatResult:
+        delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        self.calls += 1
+        await asyncio.sleep(delay)
+        if self.error:
+            raise ValueError(self.error)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(self.reply))])
+
+
+def _call(model: SlowChatModel, fallback: Any = None, **configurable: Any) -> Any:
+    async def run(_: Any) -> AIMessage:
+        return await invoke_model(model, [], node="n", fallback=fallback)
+
+    config = {"configurable": {"model_retry_backoff": 0.01, **configurable}}
+    return asyncio.run(RunnableLambda(run).ainvoke(None, config))
+
+
+def test_timeout_is_retried() -> None:
+    metrics.reset_metrics()
+    model = SlowChatModel(delays=[5, 0.01])
+    assert _call(model, model_timeout=0.1).content == "ok"
+    stats = metrics.timing_stats()["n"]
+    assert (stats["timeouts"], stats["retries"], model.calls) == (1, 1, 2)
+
+
+def test_non_transient_errors_are_not_retried() -> None:
+    model = SlowChatModel(delays=[0], error="bad request")
+    with pytest.raises(ValueError):
+        _call(model)
+    assert model.calls == 1
+
+
+def test_slow_call_is_hedged_to_the_fallback() -> None:
+    metrics.reset_metrics()
+    slow = SlowChatModel(delays=[5])
+    fast = SlowChatModel(delays=[0.01], reply="hedged")
+    started = time.perf_counter()
+    assert _call(slow, fast, model_hedge_after=0.05).content == "hedged"
+    assert time.perf_counter() - started < 1
+    stats = metrics.timing_stats()["n"]
+    assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
@@ -0,0 +1,158 @@
+import asyncio
+import importlib
+from pathlib import Path
+from typing import Any
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+
+from react_agent import response_cache as rc
+from react_agent.benchmark import scripted_models
+from react_agent.state import State
+from react_agent.tiering import select_model
+
+
+def test_response_cache_hits_memory_and_sqlite(tmp_path: Path) -> None:
+    calls = 0
+
+    @rc.response_cache(model="m", prompt="p", tail=1, message_types=("human",))
+    async def node(state: State, model_name: str) -> dict[str, Any]:
+        nonlocal calls
+        calls += 1
+        return {"messages": [AIMessage(content="fact", id="original")]}
+
+    def run(text: str, **configurable: Any) -> dict[str, Any]:
+        state = State(messages=[HumanMessage(content=text)])
+        config = {
+            "configurable": {
+                "response_cache_path": str(tmp_path / "c.db"),
+                **configurable,
+            }
+        }
+        return asyncio.run(RunnableLambda(node).ainvoke(state, config))
+
+    rc.clear_response_cache()
+    run("Tell me about Pikachu")
+    cached = run("  tell me about   PIKACHU ")
+    assert calls == 1
+    assert cached["messages"][0].content == "fact"
+    assert cached["messages"][0].id != "original"
+
+    run("Tell me about Pikachu", response_cache=False)
+    assert calls == 2
+
+    # A fresh process only has the SQLite store.
+    rc.clear_response_cache()
+    run("Tell me about Pikachu")
+    assert calls == 2
+    assert rc.response_cache_stats()["hits"] == 1
+
+
+def test_fun_facts_key_follows_the_pokemon_not_the_wording() -> None:
+    graph_module = importlib.import_module("react_agent.graph")
+
+    def thread(pokemon: str) -> State:
+        return State(
+            messages=[
+                HumanMessage(content=f"Háblame de {pokemon}"),
+                AIMessage(
+                    content="",
+                    tool_calls=[
+                        {
+                            "name": "search_pokemon_by_name",
+                            "args": {"name": pokemon},
+                            "id": "call_1",
+                        }
+                    ],
+                ),
+                ToolMessage(
+                    content=f'{{"name": "{pokemon}"}}',
+                    name="search_pokemon_by_name",
+                    tool_call_id="call_1",
+                ),
+                AIMessage(content=f"{pokemon} es un Pokémon."),
+                HumanMessage(content="¿y su evolución?"),
+            ]
+        )
+
+    def run(state: State) -> dict[str, Any]:
+        config = {"configurable": {"model": "fake/chat"}}
+        return asyncio.run(
+            RunnableLambda(graph_module.fun_facts_pokemon).ainvoke(state, config)
+        )
+
+    rc.clear_response_cache()
+    with scripted_models():
+        run(thread("pikachu"))
+        run(thread("bulbasaur"))
+        assert rc.response_cache_stats()["misses"] == 2
+        run(thread("pikachu"))
+    assert rc.response_cache_stats()["hits"] == 1
+
+
+def test_fun_facts_key_follows_a_follow_up_answered_without_tools() -> None:
+    graph_module = importlib.import_module("react_agent.graph")
+
+    def thread(answer: str) -> State:
+        return State(
+            messages=[
+                HumanMessage(content="Háblame de pikachu"),
+                AIMessage(
+                    content="",
+                    tool_calls=[
+                        {
+                            "name": "search_pokemon_by_name",
+                            "args": {"name": "pikachu"},
+                            "id": "call_1",
+                        }
+                    ],
+                ),
+                ToolMessage(
+                    content='{"name": "pikachu"}',
+                    name="search_pokemon_by_name",
+                    tool_call_id="call_1",
+                ),
+                AIMessage(content="pikachu es un Pokémon."),
+                HumanMessage(content="¿y el otro?"),
+                AIMessage(content=answer),
+            ]
+        )
+
+    raichu, pichu = thread("Raichu es su evolución."), thread("Pichu es su preevolución.")
+    assert graph_module.fun_facts_key(raichu.messages)[0] is raichu.messages[-1]
+
+    def run(state: State) -> dict[str, Any]:
+        config = {"configurable": {"model": "fake/chat"}}
+        return asyncio.run(
+            RunnableLambda(graph_module.fun_facts_pokemon).ainvoke(state, config)
+        )
+
+    rc.clear_response_cache()
+    with scripted_models():
+        run(raichu)
+        run(pichu)
+    assert rc.response_cache_stats()["misses"] == 2
+    assert rc.response_cache_stats()["hits"] == 0
+
+
+def test_downgraded_calls_are_keyed_on_the_model_that_answered() -> None:
+    models: list[str] = []
+
+    @rc.response_cache(
+        model=lambda state, c: select_model("fun_facts", state.messages, c),
+        prompt="p",
+    )
+    async def node(state: State, model_name: str) -> dict[str, Any]:
+        models.append(model_name)
+        return {"messages": [AIMessage(content=f"fact from {model_name}")]}
+
+    def run(**configurable: Any) -> dict[str, Any]:
+        state = State(messages=[HumanMessage(content="Háblame de pikachu")])
+        config = {"configurable": {"model": "p/big", **configurable}}
+        return asyncio.run(RunnableLambda(node).ainvoke(state, config))
+
+    rc.clear_response_cache()
+    assert run(fast_model="p/fast")["messages"][0].content == "fact from p/fast"
+    # Without the downgrade the fast model's answer must not be served.
+    assert run()["messages"][0].content == "fact from p/big"
+    assert models == ["p/fast", "p/big"]
@@ -0,0 +1,114 @@
+import asyncio
+import json
+from typing import Any
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import StateGraph
+
+from react_agent.benchmark import StubServices
+from react_agent.graph import (
+    appointment_fast_path,
+    email_sender,
+    route_appointment_output,
+    route_fast_path,
+)
+from react_agent.http_client import close_http_sessions
+from react_agent.routing import extract_dates, observe_user_messages
+from react_agent.state import Slots, State, update_slots
+from react_agent.tool_execution import limited_tool_node
+from react_agent.tools import schedule_quote
+
+
+def test_extracts_dates_and_user_slots_incrementally() -> None:
+    assert extract_dates("el 10/05/2030 a las 9:30 o 2030-05-11") == [
+        "2030-05-11T00:00:00",
+        "2030-05-10T09:30:00",
+    ]
+    assert extract_dates("2030-02-30") == []
+
+    messages = [HumanMessage(content="Hola, me llamo Ana Pérez: ana@example.org")]
+    slots = update_slots(Slots(), observe_user_messages(messages, Slots()))
+    assert (slots.email, slots.name, slots.cursor) == (
+        "ana@example.org",
+        "Ana Pérez",
+        1,
+    )
+    assert observe_user_messages(messages, slots) == {}
+
+    messages.append(HumanMessage(content="mejor ana.p@correo.es"))
+    assert observe_user_messages(messages, slots)["email"] == "ana.p@correo.es"
+
+
+def test_availability_question_skips_the_model() -> None:
+    state = State(
+        messages=[HumanMessage(content="¿Qué horarios hay disponibles el 2030-05-10?")]
+    )
+    update = asyncio.run(appointment_fast_path(state))
+    (message,) = update["messages"]
+    assert message.tool_calls[0]["name"] == "check_availability"
+    assert message.tool_calls[0]["args"] == {"date": "2030-05-10T00:00:00"}
+    assert update["slots"]["last_tool_names"] == ["check_availability"]
+    assert route_fast_path(State(messages=[*state.messages, message])) == "quotetools"
+
+    week = State(
+        messages=[
+            HumanMessage(
+                content="¿Hay huecos libres el 2030-05-14, 2030-05-10 o 2030-05-12?"
+            )
+        ]
+    )
+    (message,) = asyncio.run(appointment_fast_path(week))["messages"]
+    assert [call["name"] for call in message.tool_calls] == ["check_availability_range"]
+    assert message.tool_calls[0]["args"] == {
+        "start": "2030-05-10T00:00:00",
+        "end": "2030-05-14T00:00:00",
+    }
+
+    booking = State(
+        messages=[
+            HumanMessage(content="Quiero agendar el 2030-05-10, ¿está disponible?")
+        ]
+    )
+    assert "messages" not in asyncio.run(appointment_fast_path(booking))
+
+
+def test_successful_booking_is_pending_confirmation() -> None:
+    builder = StateGraph(State)
+    builder.add_node("quotetools", limited_tool_node([schedule_quote]))
+    builder.add_edge("__start__", "quotetools")
+    graph = builder.compile()
+
+    def booking(date: str) -> dict[str, Any]:
+        args = {"name": "Ana", "gmail": "ana@example.org", "date": date}
+        call = {"name": "schedule_quote", "args": args, "id": "c1"}
+        return {"messages": [AIMessage(content="", tool_calls=[call])]}
+
+    async def book_twice() -> list[dict[str, Any]]:
+        async with StubServices() as stubs:
+            config = {"configurable": {"quotes_api_url": stubs.quotes_url}}
+            try:
+                # The stub answers the second booking for the same address with
+                # the quotes API's real rejection: HTTP 400 {"detail": ...}.
+                return [
+                    await graph.ainvoke(booking(date), config)
+                    for date in ("2030-05-10T09:00:00", "2030-05-11T09:00:00")
+                ]
+            finally:
+                await close_http_sessions()
+
+    result, rejected = asyncio.run(book_twice())
+    assert result["messages"][-1].content == "Quote scheduled successfully"
+    slots = result["slots"]
+    assert slots.pending_confirmation["args"]["date"] == "2030-05-10T09:00:00"
+    assert slots.email == "ana@example.org"
+
+    assert json.loads(rejected["messages"][-1].content) == {
+        "error": "Ya existe una cita activa para este correo electrónico."
+    }
+    assert rejected["slots"].pending_confirmation is None
+
+    done = State(messages=[AIMessage(content="Listo")], slots=slots)
+    assert route_appointment_output(done) == "email_sender"
+    update = asyncio.run(email_sender(done))
+    assert update["messages"][0].tool_calls[0]["args"] == {"gmail": "ana@example.org"}
+    assert update["slots"]["pending_confirmation"] is None
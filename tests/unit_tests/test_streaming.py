@@ -0,0 +1,60 @@
+import asyncio
+from typing import Any
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import StateGraph
+
+from react_agent import metrics
+from react_agent.state import State
+from react_agent.streaming import invoke_model
+
+
+def _graph(text: str) -> Any:
+    model = GenericFakeChatModel(messages=iter([AIMessage(content=text)]))
+
+    async def node(state: State) -> dict[str, Any]:
+        return {"messages": [await invoke_model(model, state.messages, node="n")]}
+
+    builder = StateGraph(State)
+    builder.add_node("n", node)
+    builder.add_edge("__start__", "n")
+    return builder.compile()
+
+
+def test_streams_partial_text_and_records_ttft() -> None:
+    metrics.reset_metrics()
+    graph = _graph("Pikachu is an Electric type")
+
+    async def run() -> list[Any]:
+        return [
+            chunk
+            async for chunk in graph.astream(
+                {"messages": [HumanMessage(content="hi")]},
+                stream_mode=["custom", "values"],
+            )
+        ]
+
+    chunks = asyncio.run(run())
+    deltas = [c["delta"] for mode, c in chunks if mode == "custom"]
+    final = [c for mode, c in chunks if mode == "values"][-1]
+
+    assert len(deltas) > 1
+    assert "".join(deltas) == "Pikachu is an Electric type"
+    assert isinstance(final["messages"][-1], AIMessage)
+    assert final["messages"][-1].content == "Pikachu is an Electric type"
+    timing = metrics.timing_stats()["n"]
+    assert timing["calls"] == 1
+    assert 0 < timing["max_ttft"] <= timing["total_seconds"]
+
+
+def test_non_streaming_mode_still_records_timing() -> None:
+    metrics.reset_metrics()
+    result = asyncio.run(
+        _graph("hello").ainvoke(
+            {"messages": [HumanMessage(content="hi")]},
+            {"configurable": {"stream_model_output": False}},
+        )
+    )
+    assert result["messages"][-1].content == "hello"
+    assert metrics.timing_stats()["n"]["calls"] == 1
@@ -0,0 +1,26 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from react_agent.configuration import Configuration
+from react_agent.tiering import select_model
+
+
+def test_node_model_falls_back_to_route_then_default() -> None:
+    config = Configuration(
+        model="p/big", route_models={"pokemon": "p/medium"}, model_fun_facts="p/small"
+    )
+    history = [HumanMessage(content="x" * 4000)]
+    assert select_model("fun_facts", history, config) == "p/small"
+    assert select_model("pokemon_expert", history, config) == "p/medium"
+    assert select_model("appointment_manager", history, config) == "p/big"
+
+
+def test_short_turns_are_downgraded_to_the_fast_model() -> None:
+    config = Configuration(
+        model="p/big", fast_model="p/fast", fast_model_excluded_nodes=["call_model"]
+    )
+    long_history = [HumanMessage(content="x" * 4000), AIMessage(content="ok")]
+    short_turn = [*long_history, HumanMessage(content="¿y Raichu?")]
+
+    assert select_model("pokemon_expert", short_turn, config) == "p/fast"
+    assert select_model("pokemon_expert", long_history, config) == "p/big"
+    assert select_model("call_model", short_turn, config) == "p/big"
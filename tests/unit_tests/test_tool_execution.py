@@ -0,0 +1,81 @@
+import asyncio
+from typing import Any
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from langgraph.graph import StateGraph
+
+from react_agent import metrics
+from react_agent.state import State
+from react_agent.tool_execution import limited_tool_node
+
+running = 0
+peak = 0
+
+
+@tool
+async def slow_lookup(n: int) -> int:
+    """Return `n` after a short delay."""
+    global running, peak
+    running += 1
+    peak = max(peak, running)
+    await asyncio.sleep(1 if n == 0 else 0.02)
+    running -= 1
+    return n
+
+
+@tool
+async def broken(n: int) -> int:
+    """Always fail."""
+    raise RuntimeError("boom")
+
+
+def test_limits_concurrency_and_isolates_failures() -> None:
+    metrics.reset_metrics()
+    calls: list[dict[str, Any]] = [
+        {"name": "slow_lookup", "args": {"n": n}, "id": f"c{n}"} for n in range(6)
+    ]
+    calls.append({"name": "broken", "args": {"n": 1}, "id": "bad"})
+    builder = StateGraph(State)
+    builder.add_node("tools", limited_tool_node([slow_lookup, broken]))
+    builder.add_edge("__start__", "tools")
+    graph = builder.compile()
+    config = {
+        "configurable": {
+            "tool_max_concurrency": 3,
+            "tool_concurrency_limits": {"slow_lookup": 2},
+            "tool_timeout": 0.5,
+        }
+    }
+
+    result = asyncio.run(
+        graph.ainvoke({"messages": [AIMessage(content="", tool_calls=calls)]}, config)
+    )
+    by_id = {m.tool_call_id: m for m in result["messages"][1:]}
+
+    assert peak == 2
+    assert by_id["c0"].status == "error" and "did not answer" in by_id["c0"].content
+    assert by_id["bad"].status == "error"
+    assert by_id["c5"].content == "5"
+    assert "latency_ms" in by_id["c5"].response_metadata
+    stats = metrics.tool_stats()
+    assert stats["slow_lookup"]["timeouts"] == 1
+    assert stats["broken"]["errors"] == 1
+
+
+def test_zero_tool_timeout_means_no_deadline() -> None:
+    builder = StateGraph(State)
+    builder.add_node("tools", limited_tool_node([slow_lookup]))
+    builder.add_edge("__start__", "tools")
+    graph = builder.compile()
+    call = {"name": "slow_lookup", "args": {"n": 7}, "id": "c7"}
+
+    result = asyncio.run(
+        graph.ainvoke(
+            {"messages": [AIMessage(content="", tool_calls=[call])]},
+            {"configurable": {"tool_timeout": 0}},
+        )
+    )
+
+    (message,) = result["messages"][1:]
+    assert message.status == "success" and message.content == "7"
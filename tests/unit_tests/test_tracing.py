@@ -0,0 +1,106 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import tool
+from langgraph.graph import StateGraph
+
+from react_agent import tracing
+from react_agent.state import State
+from react_agent.tool_execution import limited_tool_node
+from react_agent.tracing import main, read_spans, span, summarize, traced_node
+
+
+@tool
+async def echo(text: str) -> str:
+    """Return `text`."""
+    return text
+
+
+@traced_node("ask")
+async def ask(state: State) -> dict[str, Any]:
+    return {
+        "messages": [
+            AIMessage(
+                content="",
+                tool_calls=[{"name": "echo", "args": {"text": "hola"}, "id": "c1"}],
+            )
+        ]
+    }
+
+
+def test_nodes_and_tools_are_traced(tmp_path: Path, capsys: Any) -> None:
+    path = str(tmp_path / "trace.jsonl")
+    builder = StateGraph(State)
+    builder.add_node("ask", ask)
+    builder.add_node("tools", limited_tool_node([echo]))
+    builder.add_edge("__start__", "ask")
+    builder.add_edge("ask", "tools")
+    graph = builder.compile()
+
+    asyncio.run(
+        graph.ainvoke(
+            {"messages": [HumanMessage(content="hi")]},
+            {"configurable": {"trace_path": path}},
+        )
+    )
+
+    spans = {s["name"]: s for s in read_spans([path])}
+    assert set(spans) == {"node:ask", "tool:echo"}
+    node, tool_span = spans["node:ask"], spans["tool:echo"]
+    assert node["parent_id"] is None
+    assert node["attributes"] == {
+        "messages_in": 1,
+        "messages_out": 1,
+        "payload_chars": 0,
+    }
+    assert tool_span["attributes"]["outcome"] == "success"
+    assert tool_span["attributes"]["result_bytes"] == 4
+
+    main(["report", path, "--kind", "tool"])
+    report = capsys.readouterr().out
+    assert "tool:echo" in report and "node:ask" not in report
+
+
+def test_summarize_percentiles() -> None:
+    spans = [
+        {"name": "db:find", "duration_ms": float(ms), "status": "ok"}
+        for ms in range(1, 101)
+    ]
+    spans.append({"name": "db:find", "duration_ms": 500.0, "status": "error"})
+    row = summarize(spans)["db:find"]
+    assert row["count"] == 101
+    assert row["errors"] == 1
+    assert row["p50_ms"] == 51.0
+    assert row["p99_ms"] == 100.0
+
+
+def test_otel_spans_are_nested_under_their_parent(monkeypatch: Any) -> None:
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing.otel_trace, "get_tracer", provider.get_tracer)
+
+    def run(_: Any) -> None:
+        with span("node:ask"):
+            with span("model:fake", kind="model"):
+                pass
+
+    RunnableLambda(run).invoke(None, {"configurable": {"trace_otel": True}})
+
+    spans = {s.name: s for s in exporter.get_finished_spans()}
+    node, model = spans["node:ask"], spans["model:fake"]
+    assert node.parent is None
+    assert model.parent is not None
+    assert model.parent.span_id == node.context.span_id
+    assert model.context.trace_id == node.context.trace_id
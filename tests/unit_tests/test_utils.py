@@ -0,0 +1,65 @@
+import threading
+
+from react_agent.utils import ChatModelRegistry
+
+
+class _FakeModel:
+    def __init__(self, name: str, **kwargs: object) -> None:
+        self.name = name
+        self.kwargs = kwargs
+        self.bound: list = []
+
+    def bind_tools(self, tools: list) -> "_FakeModel":
+        bound = _FakeModel(self.name, **self.kwargs)
+        bound.bound = list(tools)
+        return bound
+
+
+def _search(query: str) -> str:
+    """Search."""
+    return query
+
+
+def test_registry_reuses_models_per_key() -> None:
+    calls = []
+
+    def loader(name: str, **kwargs: object) -> _FakeModel:
+        calls.append(name)
+        return _FakeModel(name, **kwargs)
+
+    registry = ChatModelRegistry(loader=loader)  # type: ignore[arg-type]
+    first = registry.get("fake/model", tools=[_search])
+    assert registry.get("fake/model", tools=[_search]) is first
+    assert registry.get("fake/model") is not first
+    assert registry.get("fake/model", temperature=0) is not first
+    assert calls == ["fake/model"] * 3
+
+    stats = registry.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 3, 3)
+
+
+def test_registry_evicts_least_recently_used() -> None:
+    registry = ChatModelRegistry(maxsize=2, loader=_FakeModel)  # type: ignore[arg-type]
+    a = registry.get("fake/a")
+    registry.get("fake/b")
+    registry.get("fake/a")
+    registry.get("fake/c")
+
+    assert registry.get("fake/a") is a
+    assert registry.stats().evictions == 1
+    assert registry.stats().size == 2
+
+
+def test_registry_is_shared_across_threads() -> None:
+    registry = ChatModelRegistry(loader=_FakeModel)  # type: ignore[arg-type]
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get("fake/m")))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(r is results[0] for r in results)